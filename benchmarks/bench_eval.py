@@ -0,0 +1,26 @@
+"""
+Benchmarks of the methods of TensorProductSpace.eval
+"""
+import numpy as np
+from shenfun import Function
+from .common import get_space, random_coefficients, destroy
+
+class Eval:
+    """Evaluate a Function at random points with each method of
+    :meth:`.TensorProductSpace.eval`"""
+    params = (('fourier', 'chebyshev', 'legendre'), (2, 3), (0, 1, 2, 3, 4), (100, 2000))
+    param_names = ('family', 'dim', 'method', 'points')
+    timeout = 120
+
+    def setup(self, family, dim, method, points):
+        self.T = get_space(family, dim, N=32)
+        self.u_hat = random_coefficients(Function(self.T))
+        domains = [base.domain for base in self.T.bases]
+        self.x = np.array([np.random.uniform(float(d[0]), float(d[1]), points) for d in domains])
+        self.output = np.zeros(points, dtype=self.T.forward.input_array.dtype)
+
+    def teardown(self, family, dim, method, points):
+        destroy(self.T)
+
+    def time_eval(self, family, dim, method, points):
+        self.T.eval(self.x, self.u_hat, self.output, method=method)
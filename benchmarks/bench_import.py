@@ -0,0 +1,27 @@
+"""
+Benchmarks of the time it takes to import shenfun
+"""
+import sys
+import subprocess
+from mpi4py import MPI
+
+statements = {
+    'bare': 'import shenfun',
+    'space': 'from shenfun import FunctionSpace; FunctionSpace(8, "C")',
+    'star': 'from shenfun import *',
+}
+
+class Import:
+    """Import shenfun in a new interpreter, including the startup of the
+    interpreter and of MPI"""
+    params = (tuple(statements),)
+    param_names = ('statement',)
+    timeout = 120
+
+    def setup(self, statement):
+        if MPI.COMM_WORLD.Get_size() > 1:
+            raise NotImplementedError # Cannot spawn interpreters under mpirun
+
+    def time_import(self, statement):
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', statements[statement]],
+                       check=True)
@@ -0,0 +1,41 @@
+"""
+Benchmarks of the assembly of common bilinear forms with inner
+"""
+from shenfun import inner, div, grad, TestFunction, TrialFunction
+from .common import get_space, destroy
+
+forms = {
+    'mass': lambda u: u,
+    'laplace': lambda u: div(grad(u)),
+    'biharmonic': lambda u: div(grad(div(grad(u))))
+}
+
+bcs = {
+    'fourier': {'mass': None, 'laplace': None, 'biharmonic': None},
+    'chebyshev': {'mass': (0, 0), 'laplace': (0, 0), 'biharmonic': 'Biharmonic'},
+    'legendre': {'mass': (0, 0), 'laplace': (0, 0), 'biharmonic': 'Biharmonic'},
+    'jacobi': {'mass': (0, 0), 'laplace': (0, 0), 'biharmonic': 'Biharmonic'},
+    'laguerre': {'mass': (0, 0), 'laplace': (0, 0)},
+    'hermite': {'mass': None, 'laplace': None}
+}
+
+class Inner:
+    """Assembly of mass, Laplace and biharmonic matrices in 1D and 2D, with
+    the family along the first axis and Fourier along the second"""
+    params = (tuple(bcs), tuple(forms), (1, 2))
+    param_names = ('family', 'form', 'dim')
+    timeout = 120
+
+    def setup(self, family, form, dim):
+        if form not in bcs[family]:
+            raise NotImplementedError
+        self.T = get_space(family, dim, bc=bcs[family][form], N=64)
+        self.v = TestFunction(self.T)
+        self.u = TrialFunction(self.T)
+        self.form = forms[form]
+
+    def teardown(self, family, form, dim):
+        destroy(self.T)
+
+    def time_inner(self, family, form, dim):
+        inner(self.v, self.form(self.u))
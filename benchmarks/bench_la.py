@@ -0,0 +1,151 @@
+"""
+Benchmarks of the solvers in shenfun.la, shenfun.chebyshev.la and
+shenfun.legendre.la
+"""
+import numpy as np
+from mpi4py import MPI
+from shenfun import inner, div, grad, TestFunction, TrialFunction, Function, \
+    FunctionSpace, TensorProductSpace, SparseMatrix, la
+from shenfun.chebyshev import la as cla
+from shenfun.legendre import la as lla
+from .common import random_coefficients
+
+N = 512 # Size of the matrices of 1D solvers
+M = 64  # Number of right hand sides of 1D solvers
+
+def rhs(shape):
+    return np.random.random(shape)
+
+def mass(family, bc):
+    S = FunctionSpace(N, family, bc=bc)
+    return inner(TestFunction(S), TrialFunction(S))
+
+def tdma(family):
+    B = mass(family, (0, 0))
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: B.solve(b, u)
+
+def pdma(family):
+    B = mass(family, 'Biharmonic')
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: B.solve(b, u)
+
+def la_tdma():
+    B = mass('chebyshev', {'left': ('N', 0), 'right': ('N', 0)})
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: B.solve(b, u)
+
+def la_tdma_o():
+    B = SparseMatrix({-1: -1., 0: 2., 1: -1.}, (N, N))
+    sol = la.TDMA_O(B)
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: sol(b, u)
+
+def la_solve():
+    S = FunctionSpace(N, 'chebyshev', bc=(0, 0))
+    A = inner(TestFunction(S), div(grad(TrialFunction(S))))
+    sol = la.Solve(A, S)
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: sol(b, u)
+
+def la_neumann_solve():
+    S = FunctionSpace(N, 'chebyshev', bc={'left': ('N', 0), 'right': ('N', 0)})
+    A = inner(TestFunction(S), div(grad(TrialFunction(S))))
+    sol = la.NeumannSolve(A, S)
+    b, u = rhs((N, M)), np.zeros((N, M))
+    return lambda: sol(b, u)
+
+def cheb_pdma():
+    S = FunctionSpace(N, 'chebyshev', bc='Biharmonic')
+    v, u = TestFunction(S), TrialFunction(S)
+    A = inner(v, div(grad(u)))
+    B = inner(v, u)
+    sol = cla.PDMA(A, B, A.scale, B.scale)
+    b, x = rhs(N), np.zeros(N)
+    return lambda: sol(x, b)
+
+def tensor_space(family, bc, dims=2):
+    N2 = 128 if dims == 2 else 32
+    bases = [FunctionSpace(N2, family, bc=bc)]
+    bases += [FunctionSpace(N2, 'F', dtype='D') for i in range(dims-2)]
+    bases.append(FunctionSpace(N2, 'F', dtype='d'))
+    return TensorProductSpace(MPI.COMM_SELF, bases)
+
+def helmholtz(mod, family, dims):
+    T = tensor_space(family, (0, 0), dims)
+    v, u = TestFunction(T), TrialFunction(T)
+    if family == 'chebyshev':
+        mats = inner(v, div(grad(u)))
+    else:
+        mats = inner(grad(v), grad(u))
+    sol = mod.Helmholtz(*mats)
+    b, x = random_coefficients(Function(T)), Function(T)
+    return lambda: sol(x, b)
+
+def biharmonic(mod, family, dims):
+    T = tensor_space(family, 'Biharmonic', dims)
+    v, u = TestFunction(T), TrialFunction(T)
+    if family == 'chebyshev':
+        mats = inner(v, div(grad(div(grad(u)))))
+    else:
+        mats = inner(div(grad(v)), div(grad(u)))
+    sol = mod.Biharmonic(*mats)
+    b, x = random_coefficients(Function(T)), Function(T)
+    return lambda: sol(x, b)
+
+def generic_1nd():
+    T = tensor_space('legendre', (0, 0))
+    v, u = TestFunction(T), TrialFunction(T)
+    sol = la.SolverGeneric1ND(inner(v, div(grad(u))))
+    b, x = random_coefficients(Function(T)), Function(T)
+    return lambda: sol(b, x)
+
+def nonperiodic_2d(solver):
+    N2 = 48
+    S0 = FunctionSpace(N2, 'legendre', bc=(0, 0))
+    S1 = FunctionSpace(N2, 'legendre', bc=(0, 0))
+    T = TensorProductSpace(MPI.COMM_SELF, (S0, S1))
+    v, u = TestFunction(T), TrialFunction(T)
+    sol = solver(inner(v, div(grad(u))))
+    b, x = random_coefficients(Function(T)), Function(T)
+    b = b.real.copy()
+    x = x.real.copy()
+    return lambda: sol(b, x)
+
+solvers = {
+    'la.TDMA': la_tdma,
+    'la.PDMA': lambda: pdma('legendre'),
+    'la.TDMA_O': la_tdma_o,
+    'la.Solve': la_solve,
+    'la.NeumannSolve': la_neumann_solve,
+    'la.SolverGeneric1ND': generic_1nd,
+    'la.SolverGeneric2ND': lambda: nonperiodic_2d(la.SolverGeneric2ND),
+    'la.Solver2D': lambda: nonperiodic_2d(la.Solver2D),
+    'chebyshev.la.TDMA': lambda: tdma('chebyshev'),
+    'chebyshev.la.PDMA': cheb_pdma,
+    'chebyshev.la.Helmholtz 2D': lambda: helmholtz(cla, 'chebyshev', 2),
+    'chebyshev.la.Helmholtz 3D': lambda: helmholtz(cla, 'chebyshev', 3),
+    'chebyshev.la.Biharmonic 2D': lambda: biharmonic(cla, 'chebyshev', 2),
+    'chebyshev.la.Biharmonic 3D': lambda: biharmonic(cla, 'chebyshev', 3),
+    'legendre.la.TDMA': lambda: tdma('legendre'),
+    'legendre.la.Helmholtz 2D': lambda: helmholtz(lla, 'legendre', 2),
+    'legendre.la.Helmholtz 3D': lambda: helmholtz(lla, 'legendre', 3),
+    'legendre.la.Biharmonic 2D': lambda: biharmonic(lla, 'legendre', 2),
+    'legendre.la.Biharmonic 3D': lambda: biharmonic(lla, 'legendre', 3),
+    # legendre.la.Helmholtz_2dirichlet is left out, since it relies on the
+    # removed TPMatrix.pmat attribute
+}
+
+class Solvers:
+    """Solve with each solver, after a first call in setup that computes and
+    stores factorizations"""
+    params = (tuple(solvers),)
+    param_names = ('solver',)
+    timeout = 120
+
+    def setup(self, solver):
+        self.solve = solvers[solver]()
+        self.solve()
+
+    def time_solve(self, solver):
+        self.solve()
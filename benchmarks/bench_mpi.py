@@ -0,0 +1,37 @@
+"""
+Benchmarks of parallel transforms
+
+The transforms are distributed over MPI.COMM_WORLD. Run them on several
+processes with the benchmark runner, e.g.::
+
+    mpirun -np 4 python benchmarks/run.py -b bench_mpi
+
+"""
+from mpi4py import MPI
+from shenfun import Function, Array
+from .common import get_space, random_coefficients, destroy
+
+class MPITransforms:
+    """Forward and backward transforms of 3D spaces distributed over all
+    processes, split in time spent in serial transforms and in global
+    redistributions"""
+    params = (('fourier', 'chebyshev'), (1, 1.5))
+    param_names = ('family', 'padding_factor')
+    timeout = 120
+
+    def setup(self, family, padding_factor):
+        self.T = get_space(family, 3, N=64, comm=MPI.COMM_WORLD)
+        self.Tp = self.T if padding_factor == 1 else self.T.get_dealiased(padding_factor)
+        self.u_hat = random_coefficients(Function(self.T))
+        self.u = self.Tp.backward(self.u_hat, Array(self.Tp))
+
+    def teardown(self, family, padding_factor):
+        if self.Tp is not self.T:
+            destroy(self.Tp)
+        destroy(self.T)
+
+    def time_forward(self, family, padding_factor):
+        self.Tp.forward(self.u)
+
+    def time_backward(self, family, padding_factor):
+        self.Tp.backward(self.u_hat)
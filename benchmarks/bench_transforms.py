@@ -0,0 +1,46 @@
+"""
+Benchmarks of forward and backward transforms of all families
+"""
+from shenfun import Function, Array
+from .common import families, get_space, random_coefficients, destroy
+
+class Transforms:
+    """Transforms with the family along the first axis and Fourier along the
+    remaining axes, without and with padding (3/2-rule)"""
+    params = (families, (1, 2, 3), (1, 1.5))
+    param_names = ('family', 'dim', 'padding_factor')
+    timeout = 120
+
+    def setup(self, family, dim, padding_factor):
+        self.T = get_space(family, dim)
+        self.Tp = self.T if padding_factor == 1 else self.T.get_dealiased(padding_factor)
+        self.u_hat = random_coefficients(Function(self.T))
+        self.u = Array(self.Tp)
+        self.u = self.Tp.backward(self.u_hat, self.u)
+
+    def teardown(self, family, dim, padding_factor):
+        destroy(self.Tp)
+        destroy(self.T)
+
+    def time_forward(self, family, dim, padding_factor):
+        self.Tp.forward(self.u)
+
+    def time_backward(self, family, dim, padding_factor):
+        self.Tp.backward(self.u_hat)
+
+class ScalarProduct:
+    """Scalar products with the family along the first axis and Fourier along
+    the remaining axes. Scalar products are not implemented with padding"""
+    params = (families, (1, 2, 3))
+    param_names = ('family', 'dim')
+    timeout = 120
+
+    def setup(self, family, dim):
+        self.T = get_space(family, dim)
+        self.u = self.T.backward(random_coefficients(Function(self.T)), Array(self.T))
+
+    def teardown(self, family, dim):
+        destroy(self.T)
+
+    def time_scalar_product(self, family, dim):
+        self.T.scalar_product(self.u)
@@ -0,0 +1,53 @@
+"""
+Helper functions shared by the benchmarks
+"""
+import numpy as np
+from mpi4py import MPI
+from shenfun import FunctionSpace, TensorProductSpace
+
+families = ('fourier', 'chebyshev', 'legendre', 'jacobi', 'laguerre', 'hermite')
+
+# Number of quadrature points along each axis, for 1, 2 and 3 dimensions
+sizes = {1: 512, 2: 96, 3: 32}
+
+def get_space(family, dim, bc=None, N=None, comm=MPI.COMM_SELF, dtype='d'):
+    """Return function space of given family along the first axis, and
+    Fourier along the remaining axes
+
+    Parameters
+    ----------
+    family : str
+    dim : int
+        Number of dimensions
+    bc : boundary condition of the first axis, optional
+    N : int, optional
+        Number of quadrature points along each axis. Default is sizes[dim]
+    comm : MPI communicator, optional
+        Communicator of the tensor product space
+    dtype : str, optional
+        Type of the physical space
+    """
+    N = sizes[dim] if N is None else N
+    if family == 'fourier':
+        bases = [FunctionSpace(N, 'F', dtype='D') for i in range(dim-1)]
+        bases.append(FunctionSpace(N, 'F', dtype=dtype))
+    else:
+        bases = [FunctionSpace(N, family, bc=bc)]
+        bases += [FunctionSpace(N, 'F', dtype='D') for i in range(dim-2)]
+        if dim > 1:
+            bases.append(FunctionSpace(N, 'F', dtype=dtype))
+    if dim == 1:
+        return bases[0]
+    return TensorProductSpace(comm, bases)
+
+def random_coefficients(u_hat):
+    """Fill the coefficients u_hat with random numbers"""
+    u_hat[:] = np.random.random(u_hat.shape)
+    if u_hat.dtype.char in 'FDG':
+        u_hat.imag[:] = np.random.random(u_hat.shape)
+    return u_hat
+
+def destroy(space):
+    """Free the plans of space"""
+    if isinstance(space, TensorProductSpace):
+        space.destroy()
@@ -0,0 +1,174 @@
+"""
+Run the benchmarks, store baselines and check for regressions
+
+The benchmarks follow the conventions of airspeed velocity (asv), see
+asv.conf.json, and may be run with ``asv run``. This runner needs nothing but
+shenfun, runs under MPI and compares with baselines stored in the directory
+benchmarks/baselines. For example::
+
+    python benchmarks/run.py --save                # Store baseline
+    python benchmarks/run.py --compare             # Compare with baseline
+    python benchmarks/run.py -b Transforms --compare --factor 1.5
+    for n in 1 2 4; do mpirun -np $n python benchmarks/run.py -b bench_mpi --save; done
+
+Baselines are stored per host and number of processes. A benchmark regresses
+if its time exceeds the time of the baseline by more than --factor. The
+process exits with status 1 if any benchmark regresses or fails.
+
+"""
+import os
+import re
+import sys
+import json
+import time
+import socket
+import argparse
+import itertools
+import importlib
+import numpy as np
+from mpi4py import MPI
+
+comm = MPI.COMM_WORLD
+
+def discover(pattern=None):
+    """Yield (name, benchmark class, method name, parameters)"""
+    path = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(path))
+    for filename in sorted(os.listdir(path)):
+        if not (filename.startswith('bench_') and filename.endswith('.py')):
+            continue
+        module = importlib.import_module('benchmarks.'+filename[:-3])
+        for clsname, cls in sorted(vars(module).items()):
+            if not (isinstance(cls, type) and cls.__module__ == module.__name__):
+                continue
+            params = getattr(cls, 'params', ())
+            for method in sorted(m for m in dir(cls) if m.startswith('time_')):
+                for p in itertools.product(*params):
+                    name = '%s.%s.%s(%s)'%(filename[:-3], clsname, method, ', '.join(map(str, p)))
+                    if pattern is None or re.search(pattern, name):
+                        yield name, cls, method, p
+
+def measure(func, repeat, min_time):
+    """Return best time of func over repeat samples, reduced over processes
+
+    func should have been called once as a warm-up.
+    """
+    comm.Barrier()
+    t0 = time.perf_counter()
+    func()
+    t = comm.allreduce(time.perf_counter()-t0, op=MPI.MAX)
+    number = max(1, int(min_time/max(t, 1e-9)))
+    best = np.inf
+    for _ in range(repeat):
+        comm.Barrier()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        t = (time.perf_counter()-t0)/number
+        best = min(best, comm.allreduce(t, op=MPI.MAX))
+    return best
+
+def agree(func):
+    """Call func on all processes and raise on all if it raised on any
+
+    NotImplementedError is raised if func raised only NotImplementedError.
+    Otherwise the exception of this process is raised again, and processes
+    where func did not fail raise RuntimeError.
+    """
+    error, status = None, 0
+    try:
+        func()
+    except NotImplementedError as e:
+        error, status = e, 1
+    except Exception as e: # pylint: disable=broad-except
+        error, status = e, 2
+    status = comm.allreduce(status, op=MPI.MAX)
+    if status == 1:
+        raise NotImplementedError
+    if status == 2:
+        if error is None or isinstance(error, NotImplementedError):
+            raise RuntimeError('failed on another process')
+        raise error
+
+def run(name, cls, method, params, repeat, min_time):
+    """Return time of benchmark, None if skipped, or the exception if failed
+
+    Failures of setup and of the benchmark are agreed on by all processes,
+    such that no process is left waiting in a collective call.
+    """
+    bench = cls()
+    try:
+        agree(lambda: bench.setup(*params) if hasattr(bench, 'setup') else None)
+    except NotImplementedError:
+        return None
+    except Exception as e: # pylint: disable=broad-except
+        return e
+    try:
+        func = getattr(bench, method)
+        agree(lambda: func(*params)) # warm-up
+        return measure(lambda: func(*params), repeat, min_time)
+    except Exception as e: # pylint: disable=broad-except
+        return e
+    finally:
+        if hasattr(bench, 'teardown'):
+            bench.teardown(*params)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('-b', '--bench', default=None,
+                        help='Regular expression selecting benchmarks by name')
+    parser.add_argument('--save', action='store_true', help='Store times as baseline')
+    parser.add_argument('--compare', action='store_true', help='Compare with baseline')
+    parser.add_argument('--factor', type=float, default=1.25,
+                        help='Regression threshold for time relative to baseline')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of samples')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='Minimum duration (s) of each sample')
+    parser.add_argument('--baseline', default=None, help='Baseline file')
+    args = parser.parse_args(args)
+    baseline = args.baseline or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'baselines',
+        '%s-np%d.json'%(socket.gethostname(), comm.Get_size()))
+
+    reference = {}
+    if args.compare:
+        with open(baseline) as f:
+            reference = json.load(f)
+
+    rank0 = comm.Get_rank() == 0
+    results = {}
+    failed = regressed = 0
+    for name, cls, method, params in discover(args.bench):
+        t = run(name, cls, method, params, args.repeat, args.min_time)
+        if t is None:
+            status = 'skipped'
+        elif isinstance(t, Exception):
+            status = 'failed: %s'%repr(t)
+            failed += 1
+        else:
+            results[name] = t
+            status = '%.4e'%t
+            if name in reference:
+                ratio = t/reference[name]
+                status += ' %8.3f'%ratio
+                if ratio > args.factor:
+                    status += ' REGRESSION'
+                    regressed += 1
+        if rank0:
+            print('{:<80} {}'.format(name, status), flush=True)
+
+    if args.save and rank0:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline)), exist_ok=True)
+        saved = {}
+        if os.path.exists(baseline):
+            with open(baseline) as f:
+                saved = json.load(f)
+        saved.update(results)
+        with open(baseline, 'w') as f:
+            json.dump(saved, f, indent=1, sort_keys=True)
+    if rank0 and (failed or regressed):
+        print('%d failed, %d regressed'%(failed, regressed))
+    return int(failed+regressed > 0)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,8 +32,14 @@ class build_ext_subclass(build_ext):
                     if has_flag(self.compiler, c):
                         extra_compile_args.append(c)
 
+        # OpenMP for thread-parallel kernels (see SHENFUN_NUM_THREADS)
+        openmp = []
+        if has_flag(self.compiler, '-fopenmp'):
+            openmp.append('-fopenmp')
+
         for e in self.extensions:
-            e.extra_compile_args += extra_compile_args
+            e.extra_compile_args += extra_compile_args + openmp
+            e.extra_link_args += openmp
             e.include_dirs.extend([get_include()])
         build_ext.build_extensions(self)
 
@@ -45,8 +51,7 @@ def get_extensions():
                              sources=[os.path.join(cdir, '{0}.pyx'.format(s))],
                              language="c++"))  # , define_macros=define_macros
     [e.extra_link_args.extend(["-std=c++11"]) for e in ext]
-    #[e.extra_link_args.extend(["-std=c++11", "-fopenmp"]) for e in ext]
-    for s in ("Cheb", "convolve", "outer", "applymask"):
+    for s in ("Cheb", "convolve", "outer", "applymask", "blas"):
         ext.append(Extension("shenfun.optimization.cython.{0}".format(s),
                              libraries=['m'],
                              sources=[os.path.join(cdir, '{0}.pyx'.format(s))]))
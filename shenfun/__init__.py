@@ -33,21 +33,45 @@ __author__ = 'Mikael Mortensen'
 
 import numpy as np
 from mpi4py import MPI
-from . import chebyshev
-from . import legendre
-from . import laguerre
-from . import hermite
-from . import fourier
-from . import jacobi
 from . import matrixbase
-from . import la
 from .fourier import energy_fourier
-from .io import *
 from .matrixbase import *
 from .spectralbase import inner_product, MixedFunctionSpace
 from .forms import *
 from .tensorproductspace import *
 from .utilities import *
-from .utilities.lagrangian_particles import *
-from .utilities.integrators import *
+from .utilities.probe import *
 comm = MPI.COMM_WORLD
+
+# Modules and attributes that are imported on first access, see __getattr__
+_lazy_modules = ('chebyshev', 'legendre', 'laguerre', 'hermite', 'jacobi',
+                 'la', 'io')
+
+_lazy_attributes = {
+    'io': ('HDF5File', 'NCFile', 'NPYFile', 'NPYDataset', 'ShenfunFile',
+           'Checkpoint', 'AsyncWriter', 'SliceBackward', 'InSituWriter'),
+    'utilities.lagrangian_particles': ('LagrangianParticles',),
+    'utilities.integrators': ('IRK3', 'RK4', 'ETDRK4', 'ETD', 'BS3', 'DOPRI5',
+                              'ARK43', 'SBDF2', 'SBDF3', 'SBDF4', 'CNAB2',
+                              'PhiFunctions')
+}
+
+def __getattr__(name):
+    """Import family packages, linear algebra, I/O and integrators lazily"""
+    import importlib
+    if name in _lazy_modules:
+        return importlib.import_module('.'+name, __name__)
+    for module, names in _lazy_attributes.items():
+        if name in names:
+            value = getattr(importlib.import_module('.'+module, __name__), name)
+            globals()[name] = value
+            return value
+    raise AttributeError("module %r has no attribute %r"%(__name__, name))
+
+def __dir__():
+    names = list(globals())+list(_lazy_modules)
+    for val in _lazy_attributes.values():
+        names += val
+    return sorted(set(names))
+
+__all__ = [name for name in __dir__() if not name.startswith('_')]
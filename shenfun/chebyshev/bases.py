@@ -97,6 +97,12 @@ class ChebyshevBase(SpectralBase):
     def vandermonde(self, x):
         return n_cheb.chebvander(x, self.shape(False)-1)
 
+    def three_term_recurrence(self, N=None):
+        N = self.N if N is None else N
+        a = np.full(N, 2.)
+        a[0] = 1
+        return a, np.zeros(N), np.ones(N)
+
     def weight(self, x=xp):
         return 1/sp.sqrt(1-x**2)
 
@@ -67,12 +67,14 @@ from __future__ import division
 
 import functools
 import numpy as np
-from shenfun.optimization import cython
+from shenfun.optimization import get_module
 from shenfun.matrixbase import SpectralMatrix
 from shenfun.la import TDMA as neumann_TDMA
 from .la import TDMA
 from . import bases
 
+Matvec = get_module('Matvec')
+
 # Short names for instances of bases
 CB = bases.Orthogonal
 SD = bases.ShenDirichlet
@@ -141,15 +143,15 @@ class BDDmat(SpectralMatrix):
 
         if format == 'cython' and v.ndim == 3:
             ld = self[-2]*np.ones(M-2)
-            cython.Matvec.Tridiagonal_matvec3D_ptr(v, c, ld, self[0], ld, axis)
+            Matvec.Tridiagonal_matvec3D_ptr(v, c, ld, self[0], ld, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
             ld = self[-2]*np.ones(M-2)
-            cython.Matvec.Tridiagonal_matvec2D_ptr(v, c, ld, self[0], ld, axis)
+            Matvec.Tridiagonal_matvec2D_ptr(v, c, ld, self[0], ld, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
             ld = self[-2]*np.ones(M-2)
-            cython.Matvec.Tridiagonal_matvec(v, c, ld, self[0], ld)
+            Matvec.Tridiagonal_matvec(v, c, ld, self[0], ld)
             self.scale_array(c)
         elif format == 'self':
             if axis > 0:
@@ -251,13 +253,13 @@ class BDNmat(SpectralMatrix):
         if not M == N:
             format = 'csr'
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.BDN_matvec3D_ptr(v, c, self[-2], self[0], self[2], axis)
+            Matvec.BDN_matvec3D_ptr(v, c, self[-2], self[0], self[2], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.BDN_matvec2D_ptr(v, c, self[-2], self[0], self[2], axis)
+            Matvec.BDN_matvec2D_ptr(v, c, self[-2], self[0], self[2], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.BDN_matvec1D_ptr(v, c, self[-2], self[0], self[2])
+            Matvec.BDN_matvec1D_ptr(v, c, self[-2], self[0], self[2])
             self.scale_array(c)
         else:
             c = super(BDNmat, self).matvec(v, c, format=format, axis=axis)
@@ -570,17 +572,17 @@ class BBBmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.Pentadiagonal_matvec3D_ptr(v, c, self[-4], self[-2], self[0],
+            Matvec.Pentadiagonal_matvec3D_ptr(v, c, self[-4], self[-2], self[0],
                                               self[2], self[4], axis)
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.Pentadiagonal_matvec2D_ptr(v, c, self[-4], self[-2], self[0],
+            Matvec.Pentadiagonal_matvec2D_ptr(v, c, self[-4], self[-2], self[0],
                                               self[2], self[4], axis)
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.Pentadiagonal_matvec(v, c, self[-4], self[-2], self[0],
+            Matvec.Pentadiagonal_matvec(v, c, self[-4], self[-2], self[0],
                                         self[2], self[4])
             self.scale_array(c)
         else:
@@ -639,13 +641,13 @@ class BBDmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.BBD_matvec3D_ptr(v, c, self[-2], self[0], self[2], self[4], axis)
+            Matvec.BBD_matvec3D_ptr(v, c, self[-2], self[0], self[2], self[4], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.BBD_matvec2D_ptr(v, c, self[-2], self[0], self[2], self[4], axis)
+            Matvec.BBD_matvec2D_ptr(v, c, self[-2], self[0], self[2], self[4], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.BBD_matvec1D_ptr(v, c, self[-2], self[0], self[2], self[4])
+            Matvec.BBD_matvec1D_ptr(v, c, self[-2], self[0], self[2], self[4])
             self.scale_array(c)
         else:
             c = super(BBDmat, self).matvec(v, c, format=format, axis=axis)
@@ -685,13 +687,13 @@ class CDNmat(SpectralMatrix):
     def matvec(self, v, c, format='cython', axis=0):
         c.fill(0)
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.CDN_matvec3D_ptr(v, c, self[-1], self[1], axis)
+            Matvec.CDN_matvec3D_ptr(v, c, self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CDN_matvec2D_ptr(v, c, self[-1], self[1], axis)
+            Matvec.CDN_matvec2D_ptr(v, c, self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CDN_matvec1D_ptr(v, c, self[-1], self[1])
+            Matvec.CDN_matvec1D_ptr(v, c, self[-1], self[1])
             self.scale_array(c)
         else:
             c = super(CDNmat, self).matvec(v, c, format=format, axis=axis)
@@ -741,13 +743,13 @@ class CDDmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.CDD_matvec3D_ptr(v, c, self[-1], self[1], axis)
+            Matvec.CDD_matvec3D_ptr(v, c, self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CDD_matvec2D_ptr(v, c, self[-1], self[1], axis)
+            Matvec.CDD_matvec2D_ptr(v, c, self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CDD_matvec1D_ptr(v, c, self[-1], self[1])
+            Matvec.CDD_matvec1D_ptr(v, c, self[-1], self[1])
             self.scale_array(c)
         else:
             c = super(CDDmat, self).matvec(v, c, format=format, axis=axis)
@@ -874,13 +876,13 @@ class CTTmat(SpectralMatrix):
     def matvec(self, v, c, format='cython', axis=0):
         c.fill(0)
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.CTT_matvec3D_ptr(v, c, axis)
+            Matvec.CTT_matvec3D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CTT_matvec2D_ptr(v, c, axis)
+            Matvec.CTT_matvec2D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CTT_matvec(v, c)
+            Matvec.CTT_matvec(v, c)
             self.scale_array(c)
         else:
             c = super(CTTmat, self).matvec(v, c, format=format, axis=axis)
@@ -930,13 +932,13 @@ class CBDmat(SpectralMatrix):
                 v = np.moveaxis(v, 0, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.CBD_matvec3D_ptr(v, c, self[-1], self[1], self[3], axis)
+            Matvec.CBD_matvec3D_ptr(v, c, self[-1], self[1], self[3], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CBD_matvec2D_ptr(v, c, self[-1], self[1], self[3], axis)
+            Matvec.CBD_matvec2D_ptr(v, c, self[-1], self[1], self[3], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CBD_matvec(v, c, self[-1], self[1], self[3])
+            Matvec.CBD_matvec(v, c, self[-1], self[1], self[3])
             self.scale_array(c)
         else:
             c = super(CBDmat, self).matvec(v, c, format=format, axis=axis)
@@ -986,13 +988,13 @@ class CDBmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.CDB_matvec3D_ptr(v, c, self[-3], self[-1], self[1], axis)
+            Matvec.CDB_matvec3D_ptr(v, c, self[-3], self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CDB_matvec2D_ptr(v, c, self[-3], self[-1], self[1], axis)
+            Matvec.CDB_matvec2D_ptr(v, c, self[-3], self[-1], self[1], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CDB_matvec(v, c, self[-3], self[-1], self[1])
+            Matvec.CDB_matvec(v, c, self[-3], self[-1], self[1])
             self.scale_array(c)
         else:
             c = super(CDBmat, self).matvec(v, c, format=format, axis=axis)
@@ -1045,13 +1047,13 @@ class ABBmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.Tridiagonal_matvec3D_ptr(v, c, self[-2], self[0], self[2], axis)
+            Matvec.Tridiagonal_matvec3D_ptr(v, c, self[-2], self[0], self[2], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.Tridiagonal_matvec2D_ptr(v, c, self[-2], self[0], self[2], axis)
+            Matvec.Tridiagonal_matvec2D_ptr(v, c, self[-2], self[0], self[2], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.Tridiagonal_matvec(v, c, self[-2], self[0], self[2])
+            Matvec.Tridiagonal_matvec(v, c, self[-2], self[0], self[2])
             self.scale_array(c)
 
         else:
@@ -1095,13 +1097,13 @@ class ADDmat(SpectralMatrix):
     def matvec(self, v, c, format='cython', axis=0):
         c.fill(0)
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.ADD_matvec3D_ptr(v, c, self[0], axis)
+            Matvec.ADD_matvec3D_ptr(v, c, self[0], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.ADD_matvec2D_ptr(v, c, self[0], axis)
+            Matvec.ADD_matvec2D_ptr(v, c, self[0], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.ADD_matvec(v, c, self[0])
+            Matvec.ADD_matvec(v, c, self[0])
             self.scale_array(c)
         else:
             c = super(ADDmat, self).matvec(v, c, format=format, axis=axis)
@@ -1274,13 +1276,13 @@ class ATTmat(SpectralMatrix):
     def matvec(self, v, c, format='cython', axis=0):
         c.fill(0)
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.ATT_matvec3D_ptr(v, c, axis)
+            Matvec.ATT_matvec3D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.ATT_matvec2D_ptr(v, c, axis)
+            Matvec.ATT_matvec2D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.ATT_matvec(v, c)
+            Matvec.ATT_matvec(v, c)
             self.scale_array(c)
         else:
             c = super(ATTmat, self).matvec(v, c, format=format, axis=axis)
@@ -1320,13 +1322,13 @@ class SBBmat(SpectralMatrix):
     def matvec(self, v, c, format='cython', axis=0):
         c.fill(0)
         if format == 'cython' and v.ndim == 3:
-            cython.Matvec.SBB_matvec3D_ptr(v, c, self[0], axis)
+            Matvec.SBB_matvec3D_ptr(v, c, self[0], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.SBB_matvec2D_ptr(v, c, self[0], axis)
+            Matvec.SBB_matvec2D_ptr(v, c, self[0], axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.SBBmat_matvec(v, c, self[0])
+            Matvec.SBBmat_matvec(v, c, self[0])
             self.scale_array(c)
 
         else:
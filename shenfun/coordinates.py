@@ -38,6 +38,8 @@ class Coordinates:
         self._ct = None
         self._det_g = {True: None, False: None}
         self._sqrt_det_g = {True: None, False: None}
+        self._lambdified = {}
+        self._numeric = {}
 
     @property
     def b(self):
@@ -103,6 +105,100 @@ class Coordinates:
         self._sqrt_det_g[covariant] = sg
         return sg
 
+    def get(self, name):
+        """Return symbolic quantity
+
+        Parameters
+        ----------
+        name : str
+            One of
+
+                - 'sg' - square root of determinant of covariant metric tensor
+                - 'hi' - scaling factors
+                - 'b' - covariant basis vectors
+                - 'bt' - contravariant basis vectors
+                - 'g' - covariant metric tensor
+                - 'gt' - contravariant metric tensor
+                - 'ct' - Christoffel symbol of second kind
+        """
+        return {'sg': self.get_sqrt_det_g,
+                'hi': self.get_scaling_factors,
+                'b': self.get_covariant_basis,
+                'bt': self.get_contravariant_basis,
+                'g': self.get_covariant_metric_tensor,
+                'gt': self.get_contravariant_metric_tensor,
+                'ct': self.get_christoffel_second}[name]()
+
+    def lambdify(self, expr):
+        """Return numerical function of `expr` in the new coordinates
+
+        The returned function takes one argument for each of the new
+        coordinates :attr:`psi`. The functions are cached, such that Sympy's
+        lambdify is only called once for each expression.
+
+        Parameters
+        ----------
+        expr : Sympy expression or number
+        """
+        expr = sp.sympify(expr)
+        if expr not in self._lambdified:
+            self._lambdified[expr] = sp.lambdify(self.psi, expr)
+        return self._lambdified[expr]
+
+    def get_numeric(self, name, x, key=None):
+        """Return quantity evaluated numerically in points `x`
+
+        Parameters
+        ----------
+        name : str or Sympy expression
+            Either the name of a quantity as in :meth:`get`, or an
+            expression of the new coordinates
+        x : sequence of arrays or callable
+            One (broadcastable) array for each of the new coordinates, or a
+            function returning this sequence. A function is only called if
+            the result is not already cached
+        key : hashable, optional
+            If given, then the result is cached with this key, and the cached
+            result is returned on subsequent calls with the same name and key.
+            The key must identify the points `x` uniquely, like the name and
+            shape of a mesh.
+
+        Returns
+        -------
+        A number for constant scalar quantities, or an array broadcastable
+        against the arrays in `x`. For vector or tensor quantities, like 'hi'
+        or 'g', the shape of the quantity is prepended to the shape of the
+        points.
+
+        Note
+        ----
+        Cached results are removed by :meth:`subs`, that modifies the
+        quantities.
+        """
+        if key is not None and (name, key) in self._numeric:
+            return self._numeric[(name, key)]
+        expr = self.get(name) if isinstance(name, str) else name
+        if callable(x):
+            x = x()
+        if isinstance(expr, np.ndarray):
+            fj = [self._evaluate(e, x) for e in expr.ravel()]
+            shape = np.broadcast_shapes(*[np.shape(f) for f in fj])
+            value = np.zeros(expr.shape+shape)
+            for f, v in zip(fj, value.reshape((-1,)+shape)):
+                v[...] = f
+        else:
+            value = self._evaluate(expr, x)
+        if key is not None:
+            self._numeric[(name, key)] = value
+        return value
+
+    def _evaluate(self, expr, x):
+        if not isinstance(expr, sp.Basic):
+            return expr
+        if len(expr.free_symbols) == 0:
+            return complex(expr) if expr.is_real is False else float(expr)
+        return self.lambdify(expr)(*x)
+
     def get_cartesian_basis(self):
         """Return Cartesian basis vectors"""
         return np.eye(len(self.rv), dtype=object)
@@ -219,6 +315,8 @@ class Coordinates:
 
         self._psi = tuple([p.subs(s0, s1) for p in self._psi])
         self._rv = tuple([r.subs(s0, s1) for r in self._rv])
+        self._lambdified.clear()
+        self._numeric.clear()
 
     def latex_basis_vectors(self, symbol_names=None, covariant=True, replace=None):
         if covariant:
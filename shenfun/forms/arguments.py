@@ -3,9 +3,11 @@ import copy
 from scipy.special import sph_harm, erf, airy
 import numpy as np
 import sympy as sp
-from shenfun.optimization.cython import evaluate
+from shenfun.optimization import get_module
 from mpi4py_fft import DistArray
 
+evaluate = get_module('evaluate')
+
 __all__ = ('Expr', 'BasisFunction', 'TestFunction', 'TrialFunction', 'Function',
            'Array', 'FunctionSpace', 'Basis')
 
@@ -725,16 +727,7 @@ class Expr:
                 elif len(x) == 3:
                     work = evaluate.evaluate_3D(work, bv, M, r2c, last_conj_index, sl)
 
-                sc = self.scales()[vec][base_j]
-                if not hasattr(sc, 'free_symbols'):
-                    sc = float(sc)
-                else:
-                    sym0 = sc.free_symbols
-                    m = []
-                    for sym in sym0:
-                        j = 'xyzrs'.index(str(sym))
-                        m.append(x[j])
-                    sc = sp.lambdify(sym0, sc)(*m)
+                sc = test_sp.coors.get_numeric(self.scales()[vec][base_j], x)
                 output_array += sc*work
 
         return output_array
@@ -8,7 +8,7 @@ import sympy as sp
 from shenfun.spectralbase import inner_product, SpectralBase, MixedFunctionSpace
 from shenfun.matrixbase import TPMatrix, Identity
 from shenfun.tensorproductspace import TensorProductSpace, CompositeSpace
-from shenfun.utilities import dx, split
+from shenfun.utilities import dx, split, timing
 from .arguments import Expr, Function, BasisFunction, Array
 
 __all__ = ('inner',)
@@ -16,6 +16,7 @@ __all__ = ('inner',)
 #pylint: disable=line-too-long,inconsistent-return-statements,too-many-return-statements
 
 
+@timing.timed('inner')
 def inner(expr0, expr1, output_array=None, level=0):
     r"""
     Return (weighted or unweighted) discrete inner product of kind
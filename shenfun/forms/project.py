@@ -3,6 +3,7 @@ import types
 import numpy as np
 from shenfun.tensorproductspace import TensorProductSpace
 from shenfun.matrixbase import TPMatrix, BlockMatrix, SpectralMatrix
+from shenfun.utilities import timing
 from .arguments import Expr, TestFunction, TrialFunction, BasisFunction, \
     Function, Array
 from .inner import inner
@@ -10,6 +11,7 @@ from .inner import inner
 __all__ = ('project',)
 
 
+@timing.timed('project')
 def project(uh, T, output_array=None, fill=True, use_to_ortho=True, use_assign=True):
     r"""
     Project ``uh`` to tensor product space ``T``
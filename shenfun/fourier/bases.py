@@ -5,7 +5,9 @@ import sympy as sp
 import numpy as np
 from mpi4py_fft import fftw
 from shenfun.spectralbase import SpectralBase, Transform, islicedict, slicedict
-from shenfun.optimization.cython import convolve
+from shenfun.optimization import get_module
+
+convolve = get_module('convolve')
 
 __all__ = ['FourierBase', 'R2C', 'C2C']
 
@@ -123,6 +123,11 @@ class Orthogonal(SpectralBase):
         V = hermite.hermvander(x, self.shape(False)-1)
         return V
 
+    def three_term_recurrence(self, N=None):
+        N = self.N if N is None else N
+        n = np.arange(N, dtype=float)
+        return np.sqrt(2/(n+1)), np.zeros(N), np.sqrt(n/(n+1))
+
     def sympy_basis(self, i=0, x=sp.symbols('x')):
         return sp.hermite(i, x)*sp.exp(-x**2/2)*self.factor(i)
 
@@ -1,10 +1,12 @@
 import functools
 import numpy as np
 from shenfun.matrixbase import SpectralMatrix
-from shenfun.optimization.cython import Matvec
+from shenfun.optimization import get_module
 from shenfun.la import TDMA
 from . import bases
 
+Matvec = get_module('Matvec')
+
 HB = bases.Orthogonal
 
 
@@ -1,7 +1,12 @@
 import numpy as np
 from mpi4py_fft.io import NCFile, HDF5File
+from .checkpoint import Checkpoint
+from .writer import AsyncWriter
+from .npyfile import NPYFile, NPYDataset
+from .insitu import SliceBackward, InSituWriter
 
-__all__ = ['HDF5File', 'NCFile', 'ShenfunFile']
+__all__ = ['HDF5File', 'NCFile', 'NPYFile', 'NPYDataset', 'ShenfunFile',
+           'Checkpoint', 'AsyncWriter', 'SliceBackward', 'InSituWriter']
 
 
 def ShenfunFile(name, T, backend='hdf5', mode='r', uniform=False, **kw):
@@ -16,7 +21,7 @@ def ShenfunFile(name, T, backend='hdf5', mode='r', uniform=False, **kw):
         :class:`.CompositeSpace` or
         :class:`.VectorSpace`.
     backend : str, optional
-        ``hdf5`` or ``netcdf4``. Default is ``hdf5``.
+        ``hdf5``, ``netcdf4`` or ``npy``. Default is ``hdf5``.
     mode : str, optional
         ``r`` or ``w``. Default is ``r``.
     uniform : bool, optional
@@ -25,9 +30,19 @@ def ShenfunFile(name, T, backend='hdf5', mode='r', uniform=False, **kw):
     Returns
     -------
     Class instance
-        Instance of either :class:`.HDF5File` or :class:`.NCFile`
+        Instance of either :class:`.HDF5File`, :class:`.NCFile` or
+        :class:`.NPYFile`
+
+    Note
+    ----
+    The ``npy`` backend stores data in a directory ``name.npyd``, where
+    each processor writes its own chunks as npy files. It requires neither
+    h5py nor netCDF4, and stored arrays may be memory-mapped lazily for
+    postprocessing, see :class:`.NPYDataset`.
     """
     if backend.lower() == 'hdf5':
         return HDF5File(name+'.h5', domain=[np.squeeze(d) for d in T.mesh(uniform=uniform)], mode=mode, **kw)
+    if backend.lower() == 'npy':
+        return NPYFile(name+'.npyd', domain=[np.squeeze(d) for d in T.mesh(uniform=uniform)], mode=mode, **kw)
     assert kw.get('forward_output', False) is False, "NetCDF4 cannot store complex arrays, use HDF5"
     return NCFile(name+'.nc', domain=[np.squeeze(d) for d in T.mesh(uniform=uniform)], mode=mode, **kw)
@@ -0,0 +1,418 @@
+"""
+Module for checkpointing Functions in spectral space with parallel HDF5
+"""
+import itertools
+import numpy as np
+from mpi4py import MPI
+
+__all__ = ['Checkpoint']
+
+
+def get_spaces(space):
+    """Return list of scalar spaces of possibly composite space"""
+    return space.flatten() if space.is_composite_space else [space]
+
+def get_bases(space):
+    """Return list of bases and local slices in spectral space"""
+    if space.dimensions == 1:
+        return [space], [slice(0, space.shape(True))]
+    return list(space.bases), list(space.local_slice(True))
+
+def get_shape(space):
+    """Return shape of stored dataset for scalar space"""
+    return tuple(base.slice().stop-base.slice().start for base in get_bases(space)[0])
+
+def get_local_slices(space, shape=None):
+    """Return local slices into array and file for scalar space
+
+    Only the expansion coefficients of the function space, given by
+    ``slice()`` of each basis, are stored in file.
+
+    Parameters
+    ----------
+    space : :class:`.TensorProductSpace` or 1D basis
+    shape : sequence of ints, optional
+        Shape of stored dataset. If given, then the slices are truncated
+        to fit within the dataset.
+
+    Returns
+    -------
+    2-tuple
+        Tuples of slices into the local array and into the stored dataset
+    """
+    us, fs = [], []
+    bases, local_slice = get_bases(space)
+    for axis, (base, s) in enumerate(zip(bases, local_slice)):
+        m = base.slice()
+        start = max(s.start, m.start)
+        stop = min(s.stop, m.stop)
+        if shape is not None:
+            stop = min(stop, m.start+shape[axis])
+        stop = max(start, stop)
+        us.append(slice(start-s.start, stop-s.start))
+        fs.append(slice(start-m.start, stop-m.start))
+    return tuple(us), tuple(fs)
+
+def get_axis_map(family, dtype, N0, M0, N1, M1):
+    """Return map of stored coefficients along one axis to a new resolution
+
+    The map is the same as used by :meth:`.Function.assign`. Non-Fourier
+    coefficients are truncated or padded with zeros. Fourier coefficients
+    are mapped by wavenumber, using the symmetric Fourier interpolator for
+    the Nyquist coefficients of even N.
+
+    Parameters
+    ----------
+    family : str
+        Family of basis
+    dtype : str
+        Datatype of Fourier basis, 'D' for complex and 'd' for real
+        transforms
+    N0, M0 : ints
+        Size of stored basis and number of stored coefficients
+    N1, M1 : ints
+        Size of new basis and number of coefficients in new space
+
+    Returns
+    -------
+    list of 4-tuples
+        Each item is (src, dst, factor, real), mapping the range src of
+        stored coefficients to the range dst of the new coefficients, using
+        a scaling factor, and the real part if real is True
+    """
+    if family != 'fourier':
+        n = min(M0, M1)
+        return [((0, n), (0, n), 1, False)]
+    if N0 == N1:
+        return [((0, M0), (0, M0), 1, False)]
+    if dtype in 'fdg': # R2C
+        if N1 > N0:
+            if N0 % 2 == 0:
+                return [((0, M0-1), (0, M0-1), 1, False),
+                        ((M0-1, M0), (M0-1, M0), 0.5, True)]
+            return [((0, M0), (0, M0), 1, False)]
+        if N1 % 2 == 0:
+            return [((0, M1-1), (0, M1-1), 1, False),
+                    ((M1-1, M1), (M1-1, M1), 2, True)]
+        return [((0, M1), (0, M1), 1, False)]
+    if N1 > N0:
+        h = N0//2
+        if N0 % 2 == 0:
+            return [((0, h), (0, h), 1, False),
+                    ((h, h+1), (h, h+1), 0.5, False),
+                    ((h, h+1), (N1-h, N1-h+1), 0.5, False),
+                    ((h+1, N0), (N1-h+1, N1), 1, False)]
+        return [((0, h+1), (0, h+1), 1, False),
+                ((h+1, N0), (N1-h, N1), 1, False)]
+    h = N1//2
+    if N1 % 2 == 0:
+        return [((0, h+1), (0, h+1), 1, False),
+                ((N0-h, N0-h+1), (h, h+1), 1, False),
+                ((N0-h+1, N0), (h+1, N1), 1, False)]
+    return [((0, h+1), (0, h+1), 1, False),
+            ((N0-h, N0), (h+1, N1), 1, False)]
+
+def get_component_arrays(u):
+    """Return list of scalar components of Function u"""
+    space = u.function_space()
+    spaces = get_spaces(space)
+    if len(spaces) == 1:
+        return spaces, [u.__array__()]
+    return spaces, list(u.__array__().reshape((len(spaces),)+u.shape[u.ndim-space.dimensions:]))
+
+
+class Checkpoint:
+    """Class for storing Functions in spectral space with parallel HDF5
+
+    Only the expansion coefficients that belong to the function space,
+    ``slice()`` of each basis, are stored. Each processor writes its own
+    part of the spectral pencil with collective writes, where processors
+    without data make empty selections. Stored Functions may be read back
+    on any number of processors.
+
+    The file contains one group for each name, one subgroup for each step
+    and one dataset for each scalar component of the stored Function::
+
+        /u/{0, 1, ...}/{0, 1, ...}
+
+    Parameters
+    ----------
+    filename : str
+        Name of file, without ending
+    mode : str, optional
+        ``r``, ``w`` or ``a`` for read, write or append. Default is ``a``.
+    chunks : str, tuple or None, optional
+        Chunk shape of the datasets. With ``pencil`` the chunks equal the
+        largest local part of the spectral pencil, such that each processor
+        writes whole chunks. If None, then use contiguous datasets, unless
+        compression is used.
+    compression : str or int, optional
+        Compression filter, like ``gzip`` or ``lzf``. Note that compression
+        with parallel HDF5 requires HDF5 >= 1.10.2.
+    compression_opts : int, optional
+        Options for the compression filter, like the ``gzip`` level
+    precision : str, optional
+        ``single`` or ``double``. Store data with this precision.
+        Default is to use the precision of the stored Functions.
+    comm : MPI communicator, optional
+
+    Example
+    -------
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Function, Checkpoint
+    >>> K0 = FunctionSpace(8, 'C', bc=(0, 0))
+    >>> K1 = FunctionSpace(8, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1))
+    >>> u = Function(T, val=1)
+    >>> f = Checkpoint('checkpoint', mode='w', compression='gzip')
+    >>> f.write(0, {'u': u}, t=0.0)
+    >>> f.read(u, 'u', step=0)
+
+    """
+    def __init__(self, filename, mode='a', chunks='pencil', compression=None,
+                 compression_opts=None, precision=None, comm=MPI.COMM_WORLD):
+        self.filename = filename+'.h5'
+        self.chunks = chunks
+        self.compression = compression
+        self.compression_opts = compression_opts
+        self.precision = precision
+        self.comm = comm
+        self.f = None
+        self.open(mode)
+        self.close()
+
+    @staticmethod
+    def backend():
+        return 'hdf5'
+
+    def open(self, mode='r+'):
+        """Open file
+
+        Parameters
+        ----------
+        mode : str
+            Open file in this mode. Default is 'r+'.
+        """
+        import h5py
+        self.parallel = self.comm.Get_size() > 1 or h5py.get_config().mpi
+        if self.parallel:
+            self.f = h5py.File(self.filename, mode, driver='mpio', comm=self.comm)
+        else:
+            self.f = h5py.File(self.filename, mode)
+
+    def close(self):
+        """Close file"""
+        self.f.close()
+        self.f = None
+
+    def get_dtype(self, dtype):
+        """Return datatype used to store data of type dtype"""
+        dtype = np.dtype(dtype)
+        if self.precision is None:
+            return dtype
+        if self.precision == 'single':
+            return np.dtype(dtype.char.lower() if dtype.kind == 'f' else 'F')
+        return np.dtype(dtype.char.lower() if dtype.kind == 'f' else 'D')
+
+    def get_chunks(self, space, shape):
+        """Return chunk shape of dataset for scalar space
+
+        Parameters
+        ----------
+        space : :class:`.TensorProductSpace` or 1D basis
+        shape : tuple of ints
+            Shape of dataset
+        """
+        if self.chunks is None or isinstance(self.chunks, tuple):
+            return self.chunks
+        assert self.chunks == 'pencil'
+        us = get_local_slices(space)[0]
+        local_shape = np.array([s.stop-s.start for s in us], dtype=int)
+        self.comm.Allreduce(MPI.IN_PLACE, local_shape, op=MPI.MAX)
+        return tuple(int(max(1, min(n, m))) for n, m in zip(local_shape, shape))
+
+    def _transfer(self, dset, data, fs, read=False):
+        """Read or write local part of dataset, collectively if parallel"""
+        if self.parallel:
+            with dset.collective:
+                self._transfer_block(dset, [s.start for s in fs], data, read)
+        elif data.size > 0:
+            if read:
+                data[:] = dset[fs]
+            else:
+                dset[fs] = data
+
+    def write(self, step, fields, t=None):
+        """Write snapshot ``step`` of ``fields`` to file
+
+        Parameters
+        ----------
+        step : int
+            Index of snapshot
+        fields : dict
+            The Functions to be stored. (key, value) pairs are group name
+            and :class:`.Function`
+        t : float, optional
+            Time of snapshot
+        """
+        self.open('r+')
+        for name, u in fields.items():
+            group = self.f.require_group(name).require_group(str(step))
+            if t is not None:
+                group.attrs['time'] = t
+            spaces, arrays = get_component_arrays(u)
+            for k, (space, uk) in enumerate(zip(spaces, arrays)):
+                bases = get_bases(space)[0]
+                shape = get_shape(space)
+                dtype = self.get_dtype(uk.dtype)
+                if str(k) in group:
+                    del group[str(k)]
+                dset = group.create_dataset(str(k), shape=shape, dtype=dtype,
+                                            chunks=self.get_chunks(space, shape),
+                                            compression=self.compression,
+                                            compression_opts=self.compression_opts)
+                dset.attrs['N'] = np.array([base.N for base in bases])
+                dset.attrs['family'] = np.array([base.family() for base in bases], dtype='S')
+                dset.attrs['dtype'] = np.array([np.dtype(base.dtype).char for base in bases], dtype='S')
+                us, fs = get_local_slices(space)
+                data = np.ascontiguousarray(uk[us], dtype=dtype)
+                self._transfer(dset, data, fs)
+        self.close()
+
+    def read(self, u, name, step=None):
+        """Read Function ``name`` into ``u``
+
+        The stored Function may have been written from any number of
+        processors, and also with a different resolution than u. Each
+        processor reads only the parts of the stored coefficients that
+        map to its own part of the spectral pencil of u. Coefficients are
+        padded or truncated along each axis like :meth:`.Function.assign`.
+
+        Parameters
+        ----------
+        u : :class:`.Function`
+            The Function to read into. Must use the same families of bases
+            as the stored Function.
+        name : str
+            Name of stored Function
+        step : int, optional
+            Index of snapshot. Default is the last stored snapshot.
+
+        Returns
+        -------
+        :class:`.Function`
+            u with data read from file
+        """
+        if step is None:
+            step = self.steps(name)[-1]
+        self.open('r')
+        group = self.f[name][str(step)]
+        spaces, arrays = get_component_arrays(u)
+        try:
+            for k, (space, uk) in enumerate(zip(spaces, arrays)):
+                dset = group[str(k)]
+                bases = get_bases(space)[0]
+                N0 = list(dset.attrs['N'])
+                if dset.shape == get_shape(space) and N0 == [base.N for base in bases]:
+                    us, fs = get_local_slices(space)
+                    data = np.zeros([s.stop-s.start for s in us], dtype=dset.dtype)
+                    self._transfer(dset, data, fs, read=True)
+                    uk[:] = 0
+                    uk[us] = data
+                else:
+                    self._read_resampled(dset, space, uk)
+        finally:
+            self.close()
+        return u
+
+    def _read_resampled(self, dset, space, uk):
+        """Read dataset of different resolution into local array uk
+
+        Each processor reads the bounding hyperslab of the stored
+        coefficients that map to its local part of uk, collectively if
+        running in parallel. The coefficients are then padded or truncated
+        in memory.
+        """
+        bases, local_slice = get_bases(space)
+        family = [f.decode() for f in dset.attrs['family']]
+        dtype = [d.decode() for d in dset.attrs['dtype']]
+        if family != [base.family() for base in bases]:
+            raise ValueError('Stored Function uses bases %s'%family)
+        pieces, start, shape = [], [], []
+        for axis, (base, s) in enumerate(zip(bases, local_slice)):
+            m = base.slice()
+            axis_map = get_axis_map(family[axis], dtype[axis], dset.attrs['N'][axis],
+                                    dset.shape[axis], base.N, m.stop-m.start)
+            local = []
+            for (s0, s1), (d0, d1), f, r in axis_map:
+                lo, hi = max(d0+m.start, s.start), min(d1+m.start, s.stop)
+                if lo < hi:
+                    local.append(((s0+lo-m.start-d0, s0+hi-m.start-d0),
+                                  slice(lo-s.start, hi-s.start), f, r))
+            pieces.append(local)
+            start.append(min([src[0] for src, _, _, _ in local], default=0))
+            shape.append(max([src[1] for src, _, _, _ in local], default=0)-start[-1])
+        block = np.zeros(shape, dtype=dset.dtype)
+        if self.parallel:
+            with dset.collective:
+                self._transfer_block(dset, start, block, read=True)
+        else:
+            self._transfer_block(dset, start, block, read=True)
+        uk[:] = 0
+        for piece in itertools.product(*pieces):
+            src = tuple(slice(a-s0, b-s0) for ((a, b), _, _, _), s0 in zip(piece, start))
+            dst = tuple(p[1] for p in piece)
+            factor = np.prod([p[2] for p in piece])
+            real = any(p[3] for p in piece)
+            uk[dst] += factor*(block[src].real if real else block[src])
+
+    @staticmethod
+    def _transfer_block(dset, start, block, read=False):
+        """Read or write hyperslab of dset starting at index start from array block
+
+        Processors with an empty block make the transfer with an empty
+        selection, since all processors must take part in collective I/O.
+        Collective I/O is required for writing filtered datasets in parallel.
+        """
+        from h5py import h5s
+        fspace = dset.id.get_space()
+        if block.size > 0:
+            fspace.select_hyperslab(tuple(start), block.shape)
+            mspace = h5s.create_simple(block.shape)
+        else:
+            fspace.select_none()
+            mspace = h5s.create_simple((1,))
+            mspace.select_none()
+            block = np.zeros(1, dtype=block.dtype)
+        if read:
+            dset.id.read(mspace, fspace, block, dxpl=dset._dxpl)
+        else:
+            dset.id.write(mspace, fspace, block, dxpl=dset._dxpl)
+
+    def steps(self, name):
+        """Return sorted list of stored steps of Function ``name``
+
+        Parameters
+        ----------
+        name : str
+            Name of stored Function
+        """
+        self.open('r')
+        steps = sorted(int(s) for s in self.f[name].keys())
+        self.close()
+        return steps
+
+    def time(self, name, step):
+        """Return time of stored snapshot, or None if not stored
+
+        Parameters
+        ----------
+        name : str
+            Name of stored Function
+        step : int
+            Index of snapshot
+        """
+        self.open('r')
+        t = self.f[name][str(step)].attrs.get('time', None)
+        self.close()
+        return t
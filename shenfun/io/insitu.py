@@ -0,0 +1,226 @@
+"""
+Module for in-situ output of planes and coarsened fields, computed directly
+from spectral coefficients
+"""
+import numpy as np
+from mpi4py import MPI
+from shenfun.fourier.bases import R2C
+from shenfun.forms.arguments import Function, Array
+from shenfun.tensorproductspace import TensorProductSpace
+
+__all__ = ['SliceBackward', 'InSituWriter']
+
+
+class SliceBackward:
+    """Backward transform of a :class:`.Function` onto a mesh plane
+
+    The plane is computed directly from the spectral coefficients. The
+    basis functions along the cut axes are evaluated once, at the mesh
+    points of the plane, and contracted with the locally owned
+    coefficients. The small array of plane coefficients is then summed over
+    all processors, and a backward transform is computed only for the
+    lower-dimensional space of the remaining axes. There is thus no
+    backward transform of the complete array.
+
+    Parameters
+    ----------
+    T : :class:`.TensorProductSpace`
+        The space of the Functions that are to be transformed
+    slices : sequence
+        One item for each axis of T. Either an integer index into the mesh
+        along a cut axis, or ``slice(None)`` for a remaining axis. At least
+        two axes must remain, e.g., ``[slice(None), 4, slice(None)]``.
+
+    Note
+    ----
+    If the real-to-complex Fourier axis of T is cut, then the last
+    remaining Fourier axis becomes real-to-complex, such that the plane is
+    a real array.
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Function, \\
+    ...     SliceBackward
+    >>> K0 = FunctionSpace(8, 'F', dtype='D')
+    >>> K1 = FunctionSpace(8, 'F', dtype='D')
+    >>> K2 = FunctionSpace(8, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1, K2))
+    >>> u = Function(T)
+    >>> u[:] = np.random.random(u.shape)
+    >>> plane = SliceBackward(T, [slice(None), 4, slice(None)])
+    >>> up = plane(u)
+    >>> up.function_space().dimensions
+    2
+
+    """
+    def __init__(self, T, slices):
+        slices = list(slices)
+        assert len(slices) == T.dimensions
+        self.T = T
+        self.slices = slices
+        self.cut = [axis for axis, s in enumerate(slices) if not isinstance(s, slice)]
+        self.keep = [axis for axis, s in enumerate(slices) if isinstance(s, slice)]
+        assert len(self.keep) > 1, 'At least two axes must remain'
+        assert np.all([slices[axis] == slice(None) for axis in self.keep])
+        self.r2c = None
+        self.rows = {}
+        for axis in self.cut:
+            base = T.bases[axis]
+            x = base.mesh(bcast=False, map_true_domain=False)[slices[axis]]
+            self.rows[axis] = base.evaluate_basis_all(x=np.atleast_1d(x), argument=1)[0]
+            if isinstance(base, R2C):
+                self.r2c = axis
+        self.space = self._get_space()
+        self.global_shape = tuple(T.bases[axis].N//2+1 if isinstance(T.bases[axis], R2C)
+                                  else T.bases[axis].N for axis in self.keep)
+        self._u_hat = Function(self.space)
+
+    def _get_space(self):
+        bases = [self.T.bases[axis].get_unplanned() for axis in self.keep]
+        axes = [axis for ax in self.T.axes for axis in ax if axis in self.keep]
+        if self.r2c is not None:
+            fourier = [i for i, base in enumerate(bases) if base.family() == 'fourier']
+            if len(fourier) > 0:
+                # The last Fourier axis becomes real-to-complex
+                i = fourier[-1]
+                base = bases[i]
+                bases[i] = R2C(base.N, padding_factor=base.padding_factor,
+                               domain=base.domain, dealias_direct=base.dealias_direct)
+                axes.remove(self.keep[i])
+                axes.append(self.keep[i])
+        axes = tuple(self.keep.index(axis) for axis in axes)
+        return TensorProductSpace(self.T.comm, bases, axes=axes)
+
+    def function_space(self):
+        return self.space
+
+    def _contract(self, u_hat, rows):
+        ls = u_hat.local_slice()
+        c = np.asarray(u_hat)
+        for axis in reversed(self.cut):
+            c = np.tensordot(c, rows[axis][ls[axis]], (axis, 0))
+        out = np.zeros(self.global_shape, dtype=c.dtype)
+        out[tuple(ls[axis] for axis in self.keep)] = c
+        return out
+
+    def __call__(self, u_hat, output_array=None):
+        """Return Function u_hat evaluated on the plane
+
+        Parameters
+        ----------
+        u_hat : :class:`.Function`
+            Function of space T
+        output_array : :class:`.Array`, optional
+            Return array of space :meth:`function_space`
+
+        Returns
+        -------
+        :class:`.Array`
+            The plane
+        """
+        if output_array is None:
+            output_array = Array(self.space)
+        if self.r2c is None:
+            c = self._contract(u_hat, self.rows)
+            self.T.comm.Allreduce(MPI.IN_PLACE, c, op=MPI.SUM)
+        else:
+            # Add the missing negative wavenumbers of the cut real-to-complex
+            # axis, using Hermitian symmetry
+            base = self.T.bases[self.r2c]
+            rows = dict(self.rows)
+            rows[self.r2c] = self.rows[self.r2c].copy()
+            rows[self.r2c][0] = 0
+            rows[self.r2c][base.N//2+base.N%2:] = 0
+            c = np.array([self._contract(u_hat, self.rows), self._contract(u_hat, rows)])
+            self.T.comm.Allreduce(MPI.IN_PLACE, c, op=MPI.SUM)
+            c1 = c[1]
+            for i, axis in enumerate(self.keep):
+                if self.T.bases[axis].family() == 'fourier':
+                    c1 = np.roll(np.flip(c1, i), 1, i)
+            c = c[0] + np.conj(c1)
+            if self.space.forward.output_array.dtype.char not in 'FDG':
+                c = c.real
+        c = c[tuple(slice(0, base.N//2+1) if isinstance(base, R2C) else slice(None)
+                    for base in self.space.bases)]
+        self._u_hat[:] = c[self._u_hat.local_slice()]
+        return self._u_hat.backward(output_array)
+
+
+class InSituWriter:
+    """In-situ output of planes and coarsened fields
+
+    Planes are computed with :class:`.SliceBackward`, directly from the
+    spectral coefficients. Coarsened fields are computed by spectral
+    truncation, using :meth:`.Function.assign` to a coarser space, followed
+    by a backward transform on the coarse mesh. Neither requires a backward
+    transform of the complete field, and only the planes and the coarse
+    fields are written to file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of files, without ending. Planes are stored in files
+        ``filename_slicename``, with the slice named as in
+        :class:`.HDF5File`, e.g., ``filename_slice_4_slice``. Coarse fields are
+        stored in ``filename_coarse``.
+    T : :class:`.TensorProductSpace`
+        The space of the Functions that are to be stored
+    slices : sequence of sequences, optional
+        The planes to be stored. See :class:`.SliceBackward`
+    N : sequence of ints, optional
+        Number of quadrature points of coarse space. If None, then no coarse
+        fields are stored.
+    kw : dict, optional
+        Keyword arguments to :func:`.ShenfunFile`, like ``backend``
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Function, \\
+    ...     InSituWriter
+    >>> K0 = FunctionSpace(16, 'F', dtype='D')
+    >>> K1 = FunctionSpace(16, 'F', dtype='D')
+    >>> K2 = FunctionSpace(16, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1, K2))
+    >>> u = Function(T, val=1)
+    >>> f = InSituWriter('insitu', T, slices=[[slice(None), 4, slice(None)]],
+    ...                  N=(8, 8, 8), backend='npy')
+    >>> f.write(0, {'u': u})
+
+    """
+    def __init__(self, filename, T, slices=(), N=None, **kw):
+        from shenfun.io import ShenfunFile
+        kw.setdefault('mode', 'w')
+        self.T = T
+        self.planes = []
+        for sl in slices:
+            plane = SliceBackward(T, sl)
+            name = '_'.join([str(s) if not isinstance(s, slice) else 'slice' for s in sl])
+            self.planes.append((plane, Array(plane.function_space()),
+                                ShenfunFile('_'.join((filename, name)), plane.function_space(), **kw)))
+        self.coarse = None
+        if N is not None:
+            Tc = T.get_refined(N)
+            self.coarse = (Function(Tc), Array(Tc),
+                           ShenfunFile('_'.join((filename, 'coarse')), Tc, **kw))
+
+    def write(self, step, fields):
+        """Write snapshot ``step`` of planes and coarse fields
+
+        Parameters
+        ----------
+        step : int
+            Index of snapshot
+        fields : dict
+            The Functions to be stored. (key, value) pairs are group name
+            and :class:`.Function` of space T
+        """
+        for name, u in fields.items():
+            for plane, up, f in self.planes:
+                f.write(step, {name: [plane(u, up)]})
+            if self.coarse is not None:
+                uc_hat, uc, f = self.coarse
+                f.write(step, {name: [u.assign(uc_hat).backward(uc)]})
@@ -0,0 +1,261 @@
+"""
+Module for storing distributed arrays in a chunked directory store of npy files
+"""
+import os
+import json
+import shutil
+import numpy as np
+from mpi4py import MPI
+from mpi4py_fft.io.file_base import FileBase
+
+__all__ = ['NPYFile', 'NPYDataset']
+
+
+def chunk_name(start):
+    """Return name of chunk file starting at global index ``start``"""
+    return '_'.join([str(i) for i in start])+'.npy'
+
+def chunk_start(name):
+    """Return global start index of chunk file ``name``"""
+    return tuple(int(i) for i in name[:-4].split('_'))
+
+
+class NPYDataset:
+    """Lazy view of a dataset stored in a :class:`.NPYFile`
+
+    The dataset is a directory of chunks, one npy file for each processor
+    that stored data, and a json file with the global shape and dtype.
+    Slicing the dataset memory-maps only the chunks that overlap with the
+    requested slice.
+
+    Parameters
+    ----------
+    path : str
+        Path to the directory holding the chunks
+
+    Example
+    -------
+    >>> import numpy as np
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Array, \\
+    ...     ShenfunFile
+    >>> K0 = FunctionSpace(8, 'F', dtype='D')
+    >>> K1 = FunctionSpace(8, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1))
+    >>> u = Array(T, val=1)
+    >>> f = ShenfunFile('npyfile', T, backend='npy', mode='w')
+    >>> f.write(0, {'u': [u]})
+    >>> d = f['u/2D/0']
+    >>> d.shape
+    (8, 8)
+    >>> np.all(d[2:4, 4] == 1)
+    True
+
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.shape = tuple(meta['shape'])
+        self.dtype = np.dtype(meta['dtype'])
+        self._chunks = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def chunks(self):
+        """Return list of (global slices, memory-mapped array) of all chunks"""
+        if self._chunks is None:
+            self._chunks = []
+            for name in sorted(os.listdir(self.path)):
+                if not name.endswith('.npy'):
+                    continue
+                a = np.load(os.path.join(self.path, name), mmap_mode='r')
+                start = chunk_start(name)
+                self._chunks.append((tuple(slice(s, s+n) for s, n in zip(start, a.shape)), a))
+        return self._chunks
+
+    def __array__(self, dtype=None):
+        return np.asarray(self[...], dtype=dtype)
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if Ellipsis in key:
+            i = key.index(Ellipsis)
+            key = key[:i] + (slice(None),)*(self.ndim-len(key)+1) + key[i+1:]
+        key = key + (slice(None),)*(self.ndim-len(key))
+        ranges, squeeze = [], []
+        for axis, (k, n) in enumerate(zip(key, self.shape)):
+            if isinstance(k, slice):
+                start, stop, step = k.indices(n)
+                assert step == 1, 'Only contiguous slices are supported'
+                ranges.append((start, max(start, stop)))
+            else:
+                k = int(k)
+                k = k+n if k < 0 else k
+                if not 0 <= k < n:
+                    raise IndexError('index %d is out of bounds for axis %d with size %d'%(k, axis, n))
+                ranges.append((k, k+1))
+                squeeze.append(axis)
+        out = np.zeros([r1-r0 for r0, r1 in ranges], dtype=self.dtype)
+        for sl, a in self.chunks:
+            src, dst = [], []
+            for s, (r0, r1) in zip(sl, ranges):
+                lo, hi = max(s.start, r0), min(s.stop, r1)
+                if lo >= hi:
+                    break
+                src.append(slice(lo-s.start, hi-s.start))
+                dst.append(slice(lo-r0, hi-r0))
+            else:
+                out[tuple(dst)] = a[tuple(src)]
+        return np.squeeze(out, axis=tuple(squeeze))
+
+
+class NPYFile(FileBase):
+    """Class for reading/writing data to a chunked directory store
+
+    Every processor stores its own part of a distributed array as a
+    separate npy file, without communication and without the need for
+    parallel HDF5. The metadata are stored in json files. The data may be
+    accessed lazily, and in any slice, through memory-mapped
+    :class:`.NPYDataset`.
+
+    Parameters
+    ----------
+    dirname : str
+        Name of directory to be created.
+    domain : sequence, optional
+        An optional spatial mesh or domain to go with the data.
+        Sequence of either
+
+            - 2-tuples, where each 2-tuple contains the (origin, length)
+              of each dimension, e.g., (0, 2*pi).
+            - Arrays of coordinates, e.g., np.linspace(0, 2*pi, N). One
+              array per dimension.
+    mode : str, optional
+        ``r``, ``w`` or ``a`` for read, write or append. Default is ``a``.
+    comm : MPI communicator, optional
+
+    Note
+    ----
+    The layout of the directory store follows the layout of
+    :class:`.HDF5File`, with directories in place of groups and datasets::
+
+        dirname/u/3D/{0, 1}/{meta.json, chunks}
+        dirname/u/2D/slice_4_slice/{0, 1}/{meta.json, chunks}
+        dirname/u/{meta.json, domain/x0.npy, ...}
+
+    Chunks are named by their global start index, e.g., ``0_12_0.npy``.
+    """
+    def __init__(self, dirname, domain=None, mode='a', comm=MPI.COMM_WORLD, **kw):
+        FileBase.__init__(self, dirname, domain=domain)
+        self.comm = comm
+        if mode == 'r':
+            assert os.path.isdir(dirname), 'No such store: %s'%dirname
+        elif comm.Get_rank() == 0:
+            if mode == 'w' and os.path.isdir(dirname):
+                shutil.rmtree(dirname)
+            os.makedirs(dirname, exist_ok=True)
+        comm.Barrier()
+
+    @staticmethod
+    def backend():
+        return 'npy'
+
+    def open(self, mode='r+'):
+        pass
+
+    def close(self):
+        pass
+
+    def __getitem__(self, name):
+        return NPYDataset(os.path.join(self.filename, name))
+
+    def __contains__(self, name):
+        return os.path.isfile(os.path.join(self.filename, name, 'meta.json'))
+
+    def steps(self, name, dimensions):
+        """Return sorted list of snapshots stored for complete field ``name``
+
+        Parameters
+        ----------
+        name : str
+            Name of field
+        dimensions : int
+            Number of dimensions of field
+        """
+        path = os.path.join(self.filename, name, '{}D'.format(dimensions))
+        if not os.path.isdir(path):
+            return []
+        return sorted(int(s) for s in os.listdir(path) if s.isdigit())
+
+    def _write_json(self, path, meta):
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    def _check_domain(self, group, field):
+        if self.domain is None:
+            self.domain = ((0, 2*np.pi),)*field.dimensions
+        assert len(self.domain) == field.dimensions
+        path = os.path.join(self.filename, group)
+        meta = None
+        if self.comm.Get_rank() == 0 and os.path.isfile(os.path.join(path, 'meta.json')):
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+        meta = self.comm.bcast(meta, root=0)
+        if meta is not None:
+            assert field.rank == meta['rank']
+            assert np.all(field.pencil.shape == tuple(meta['shape']))
+            return
+        if self.comm.Get_rank() == 0:
+            kind = 'mesh' if isinstance(self.domain[0], np.ndarray) else 'domain'
+            os.makedirs(os.path.join(path, kind), exist_ok=True)
+            for i in range(field.dimensions):
+                d = self.domain[i]
+                d0 = np.squeeze(d) if kind == 'mesh' else np.array([d[0], d[1]])
+                np.save(os.path.join(path, kind, 'x{}.npy'.format(i)), d0)
+            self._write_json(path, {'shape': [int(n) for n in field.pencil.shape],
+                                    'rank': int(field.rank)})
+        self.comm.Barrier()
+
+    def _create_dataset(self, path, shape, dtype):
+        # Remove chunks of a previous snapshot, possibly from a different
+        # decomposition, before the processors store their chunks
+        if self.comm.Get_rank() == 0:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.makedirs(path)
+            self._write_json(path, {'shape': [int(n) for n in shape],
+                                    'dtype': np.dtype(dtype).str})
+        self.comm.Barrier()
+
+    def _write_chunk(self, path, start, data):
+        if data.size > 0:
+            np.save(os.path.join(path, chunk_name(start)), np.ascontiguousarray(data))
+
+    def read(self, u, name, **kw):
+        step = kw.get('step', 0)
+        d = self['/'.join((name, '{}D'.format(u.dimensions), str(step)))]
+        u[:] = d[u.local_slice()]
+
+    def _write_slice_step(self, name, step, slices, field, **kw):
+        rank = field.rank
+        slices = (slice(None),)*rank + tuple(slices)
+        slices = list(slices)
+        ndims = slices[rank:].count(slice(None))
+        slname = self._get_slice_name(slices[rank:])
+        s = field.local_slice()
+        slices, inside = self._get_local_slices(slices, s)
+        sp = np.nonzero([isinstance(x, slice) for x in slices])[0]
+        path = os.path.join(self.filename, name, '{}D'.format(ndims), slname, str(step))
+        self._create_dataset(path, np.take(field.global_shape, sp), field.dtype)
+        if inside == 1:
+            self._write_chunk(path, [s[i].start for i in sp], field[tuple(slices)])
+
+    def _write_group(self, name, u, step, **kw):
+        path = os.path.join(self.filename, name, '{}D'.format(u.dimensions), str(step))
+        self._create_dataset(path, u.global_shape, u.dtype)
+        self._write_chunk(path, [s.start for s in u.local_slice()], u)
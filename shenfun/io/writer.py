@@ -0,0 +1,167 @@
+"""
+Module for asynchronous (write-behind) output of Functions and Arrays
+"""
+import atexit
+import queue
+import threading
+import warnings
+import numpy as np
+from mpi4py import MPI
+
+__all__ = ['AsyncWriter']
+
+
+def snapshot(fields, buffer=None):
+    """Return copy of all arrays in possibly nested fields
+
+    Parameters
+    ----------
+    fields : array, dict, list or tuple
+        Possibly nested fields to copy
+    buffer : array, dict, list or tuple, optional
+        Previous snapshot. Arrays of the same shape, dtype and type as in
+        fields are reused, and the remaining arrays are allocated.
+    """
+    if isinstance(fields, np.ndarray):
+        if (type(buffer) is type(fields) and buffer.shape == fields.shape
+                and buffer.dtype == fields.dtype):
+            np.copyto(buffer, fields)
+            return buffer
+        return fields.copy()
+    if isinstance(fields, dict):
+        buffer = buffer if isinstance(buffer, dict) else {}
+        return {key: snapshot(val, buffer.get(key)) for key, val in fields.items()}
+    if isinstance(fields, (list, tuple)):
+        if not isinstance(buffer, (list, tuple)) or len(buffer) != len(fields):
+            buffer = [None]*len(fields)
+        return type(fields)(snapshot(val, buf) for val, buf in zip(fields, buffer))
+    return fields
+
+
+class AsyncWriter:
+    """Write-behind wrapper for file handlers
+
+    Snapshots of the fields are copied into one of ``nbuffers`` buffers,
+    that are allocated on the first writes and then reused, and written to file by a background thread, while the solver
+    continues. If all buffers are in use, then :meth:`write` blocks until
+    the oldest snapshot has been written (back-pressure). All pending
+    snapshots are written by :meth:`flush`, :meth:`close` and on exit.
+
+    Parameters
+    ----------
+    writer : file handler
+        Any object with a method ``write(step, fields, **kw)``, like the
+        file handlers returned by :func:`.ShenfunFile`, or
+        :class:`.Checkpoint`
+    nbuffers : int, optional
+        Number of snapshots that may be held in memory at the same time.
+        Default is 2 (double buffer).
+    comm : MPI communicator, optional
+
+    Note
+    ----
+    With more than one processor, parallel file handlers make MPI calls
+    from the background thread. This requires an MPI library initialized
+    with ``MPI.THREAD_MULTIPLE``. Otherwise, snapshots are written
+    synchronously.
+
+    Example
+    -------
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Array, \\
+    ...     ShenfunFile, AsyncWriter
+    >>> K0 = FunctionSpace(8, 'F', dtype='D')
+    >>> K1 = FunctionSpace(8, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1))
+    >>> u = Array(T, val=1)
+    >>> with AsyncWriter(ShenfunFile('myfile', T, mode='w')) as f:
+    ...     for step in range(10):
+    ...         f.write(step, {'u': [u]})
+
+    """
+    def __init__(self, writer, nbuffers=2, comm=MPI.COMM_WORLD):
+        self.writer = writer
+        self.nbuffers = nbuffers
+        self.asynchronous = comm.Get_size() == 1 or MPI.Query_thread() == MPI.THREAD_MULTIPLE
+        if not self.asynchronous:
+            warnings.warn('MPI not initialized with THREAD_MULTIPLE. Writing synchronously')
+        self._buffers = threading.Semaphore(nbuffers)
+        self._free = []
+        self._queue = queue.Queue()
+        self._error = None
+        self._thread = None
+        if self.asynchronous:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            step, fields, kw = item
+            try:
+                self.writer.write(step, fields, **kw)
+            except Exception as e: # pragma: no cover
+                self._error = e
+            finally:
+                self._free.append(fields)
+                self._buffers.release()
+                self._queue.task_done()
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, step, fields, **kw):
+        """Write snapshot ``step`` of ``fields`` to file
+
+        The fields are copied, and may be modified as soon as the method
+        returns. The method blocks only if all buffers are in use.
+
+        Parameters
+        ----------
+        step : int
+            Index of snapshot
+        fields : dict
+            The fields to be stored, see the ``write`` method of the
+            wrapped file handler
+        kw : dict, optional
+            Additional keyword arguments to the ``write`` method of the
+            wrapped file handler
+        """
+        self._check()
+        if not self.asynchronous:
+            self.writer.write(step, fields, **kw)
+            return
+        self._buffers.acquire()
+        buffer = self._free.pop() if self._free else None
+        self._queue.put((step, snapshot(fields, buffer), kw))
+
+    def pending(self):
+        """Return number of snapshots not yet written"""
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """Wait until all snapshots have been written"""
+        if self._thread is not None:
+            self._queue.join()
+        self._check()
+
+    def close(self):
+        """Write all snapshots and stop the background thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -190,6 +190,17 @@ class JacobiBase(SpectralBase):
     def vandermonde(self, x):
         return self.jacobi(x, self.alpha, self.beta, self.shape(False))
 
+    def three_term_recurrence(self, N=None):
+        N = self.N if N is None else N
+        a, b = self.alpha, self.beta
+        n = np.arange(1, N, dtype=float)
+        ab = 2*n+a+b
+        d = 2*(n+1)*(n+a+b+1)*ab
+        an = np.hstack(((a+b+2)/2, (ab+1)*(ab+2)*ab/d))
+        bn = np.hstack(((a-b)/2, (ab+1)*(a**2-b**2)/d))
+        gn = np.hstack((0, 2*(n+a)*(n+b)*(ab+2)/d))
+        return an, bn, gn
+
     def plan(self, shape, axis, dtype, options):
         if shape in (0, (0,)):
             return
@@ -6,6 +6,7 @@ import scipy.sparse as scp
 from scipy.sparse.linalg import spsolve, splu
 from shenfun.optimization import optimizer
 from shenfun.matrixbase import SparseMatrix
+from shenfun.utilities import timing
 
 class TDMA:
     """Tridiagonal matrix solver
@@ -496,8 +497,6 @@ class Solver2D:
         return c
 
     def __call__(self, b, u=None):
-        from codetiming import Timer
-
         if u is None:
             u = b
         else:
@@ -511,9 +510,9 @@ class Solver2D:
                 factor = abs(self.M.real).max()/abs(self.M.imag).max()
             if  factor > 1e12: # If M is basically a real matrix with roundoff numbers in imag
                 Mc = self.M.real.copy()
-                with Timer('LU'):
+                with timing.region('Solver2D LU'):
                     lu = splu(Mc)
-                with Timer('LU solve'):
+                with timing.region('Solver2D LU solve'):
                     u.real[s0] = lu.solve(b.real[s0].flatten()).reshape(self.T.dims())
                     u.imag[s0] = lu.solve(b.imag[s0].flatten()).reshape(self.T.dims())
                 #u.real[s0] = scp.linalg.spsolve(self.M.real.copy(), b.real[s0].flatten()).reshape(self.T.dims())
@@ -521,16 +520,16 @@ class Solver2D:
             elif factor < 1e-12: # if M is basically imaginary with roundoff numbers in real
                 u.real[s0] = 0
                 Mc = self.M.imag.copy()
-                with Timer('LU'):
+                with timing.region('Solver2D LU'):
                     lu = splu(Mc)
-                with Timer('LU solve'):
+                with timing.region('Solver2D LU solve'):
                     u.real[s0] = lu.solve(b.imag[s0].flatten()).reshape(self.T.dims())
                     u.imag[s0] = lu.solve(b.real[s0].flatten()).reshape(self.T.dims())
                 #u.imag[s0] = scp.linalg.spsolve(self.M.imag.copy(), b.imag[s0].flatten()).reshape(self.T.dims())
             else:
-                with Timer('LU'):
+                with timing.region('Solver2D LU'):
                     lu = splu(self.M)
-                with Timer('LU solve'):
+                with timing.region('Solver2D LU solve'):
                     u[s0] = lu.solve(b[s0].flatten()).reshape(self.T.dims())
                 #u[s0] = scp.linalg.spsolve(self.M, b[s0].flatten()).reshape(self.T.dims())
         return u
@@ -84,6 +84,11 @@ class LaguerreBase(SpectralBase):
         V = lag.lagvander(x, int(self.N*self.padding_factor)-1)
         return V
 
+    def three_term_recurrence(self, N=None):
+        N = self.N if N is None else N
+        n = np.arange(N, dtype=float)
+        return -1/(n+1), (2*n+1)/(n+1), n/(n+1)
+
     def evaluate_basis(self, x, i=0, output_array=None):
         x = np.atleast_1d(x)
         if output_array is None:
@@ -117,6 +117,11 @@ class LegendreBase(SpectralBase):
     def vandermonde(self, x):
         return leg.legvander(x, self.shape(False)-1)
 
+    def three_term_recurrence(self, N=None):
+        N = self.N if N is None else N
+        n = np.arange(N, dtype=float)
+        return (2*n+1)/(n+1), np.zeros(N), n/(n+1)
+
     def sympy_basis(self, i=0, x=sympy.symbols('x', real=True)):
         return sympy.legendre(i, x)
 
@@ -2,11 +2,12 @@
 
 import numpy as np
 import scipy.linalg as scipy_la
-from shenfun.optimization import optimizer
-from shenfun.optimization.cython import la
+from shenfun.optimization import optimizer, get_module
 from shenfun.la import TDMA as la_TDMA
 from shenfun.matrixbase import TPMatrix
 
+la = get_module('la')
+
 
 class TDMA(la_TDMA):
     """Tridiagonal matrix solver
@@ -80,31 +80,29 @@ def legendre_gauss_nodes_and_weights(N, tol=1e-16):
 def some_basic_tests():
     """Compare with quadpy"""
     import sys
-    from time import time
     import quadpy
+    from shenfun.utilities import timing
 
+    timing.enable()
     N = int(sys.argv[-1])
-    t0 = time()
-    x, w = legendre_lobatto_nodes_and_weights(N)
-    print("Time mine {}".format(time()-t0))
+    with timing.region('Lobatto mine'):
+        x, w = legendre_lobatto_nodes_and_weights(N)
 
-    t0 = time()
-    s = quadpy.line_segment.GaussLobatto(N)
-    print("Time quadpy {}".format(time()-t0))
+    with timing.region('Lobatto quadpy'):
+        s = quadpy.line_segment.GaussLobatto(N)
 
     assert np.allclose(x, s.points)
     assert np.allclose(w, s.weights)
 
-    t0 = time()
-    x, w = legendre_gauss_nodes_and_weights(N)
-    print("Time mine {}".format(time()-t0))
+    with timing.region('Gauss mine'):
+        x, w = legendre_gauss_nodes_and_weights(N)
 
-    t0 = time()
-    s = quadpy.line_segment.GaussLegendre(N)
-    print("Time quadpy {}".format(time()-t0))
+    with timing.region('Gauss quadpy'):
+        s = quadpy.line_segment.GaussLegendre(N)
 
     assert np.allclose(x, s.points)
     assert np.allclose(w, s.weights)
+    timing.report(comm=None)
 
 if __name__ == '__main__': # pragma: no cover
     some_basic_tests()
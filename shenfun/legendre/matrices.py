@@ -70,10 +70,12 @@ import numpy as np
 import sympy as sp
 from shenfun.matrixbase import SpectralMatrix
 from shenfun.la import TDMA as neumann_TDMA
-from shenfun.optimization import cython
+from shenfun.optimization import get_module
 from .la import TDMA
 from . import bases
 
+Matvec = get_module('Matvec')
+
 # Short names for instances of bases
 LB = bases.Orthogonal
 SD = bases.ShenDirichlet
@@ -166,6 +168,22 @@ class BDDmat(SpectralMatrix):
         d[2] = d[-2]
         SpectralMatrix.__init__(self, d, test, trial, measure=measure)
         self.solve = TDMA(self)
+        self._matvec_methods += ['cython']
+
+    def matvec(self, v, c, format='cython', axis=0):
+        c.fill(0)
+        if format == 'cython' and v.ndim == 3:
+            Matvec.Tridiagonal_matvec3D_ptr(v, c, self[-2], self[0], self[2], axis)
+            self.scale_array(c)
+        elif format == 'cython' and v.ndim == 2:
+            Matvec.Tridiagonal_matvec2D_ptr(v, c, self[-2], self[0], self[2], axis)
+            self.scale_array(c)
+        elif format == 'cython' and v.ndim == 1:
+            Matvec.Tridiagonal_matvec(v, c, self[-2], self[0], self[2])
+            self.scale_array(c)
+        else:
+            c = super(BDDmat, self).matvec(v, c, format=format, axis=axis)
+        return c
 
 
 class BNNmat(SpectralMatrix):
@@ -401,6 +419,23 @@ class ADDmat(SpectralMatrix):
         else:
             d = {0: 1}
         SpectralMatrix.__init__(self, d, test, trial, scale=scale, measure=measure)
+        self._matvec_methods += ['self']
+
+    def matvec(self, v, c, format='self', axis=0):
+        if format == 'self':
+            N = self.shape[0]
+            c.fill(0)
+            s = [slice(None)]*v.ndim
+            s[axis] = slice(0, N)
+            s = tuple(s)
+            d = self[0]
+            if np.ndim(d):
+                d = d[(slice(None),)+(np.newaxis,)*(v.ndim-1-axis)]
+            np.multiply(v[s], d, out=c[s])
+            self.scale_array(c)
+        else:
+            c = super(ADDmat, self).matvec(v, c, format=format, axis=axis)
+        return c
 
     def solve(self, b, u=None, axis=0):
         N = self.shape[0] + 2
@@ -677,13 +712,13 @@ class GLLmat(SpectralMatrix):
         c.fill(0)
         trial = self.trialfunction[1]
         if format == 'cython' and v.ndim == 3 and trial:
-            cython.Matvec.GLL_matvec3D_ptr(v, c, axis)
+            Matvec.GLL_matvec3D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2 and trial:
-            cython.Matvec.GLL_matvec2D_ptr(v, c, axis)
+            Matvec.GLL_matvec2D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1 and trial:
-            cython.Matvec.GLL_matvec(v, c)
+            Matvec.GLL_matvec(v, c)
             self.scale_array(c)
         else:
             c = super(GLLmat, self).matvec(v, c, format=format, axis=axis)
@@ -756,13 +791,13 @@ class CLLmat(SpectralMatrix):
             self.scale_array(c)
 
         elif format == 'cython' and v.ndim == 3:
-            cython.Matvec.CLL_matvec3D_ptr(v, c, axis)
+            Matvec.CLL_matvec3D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 2:
-            cython.Matvec.CLL_matvec2D_ptr(v, c, axis)
+            Matvec.CLL_matvec2D_ptr(v, c, axis)
             self.scale_array(c)
         elif format == 'cython' and v.ndim == 1:
-            cython.Matvec.CLL_matvec(v, c)
+            Matvec.CLL_matvec(v, c)
             self.scale_array(c)
         else:
             c = super(CLLmat, self).matvec(v, c, format=format, axis=axis)
@@ -3,6 +3,7 @@ This module contains classes for working with sparse matrices.
 
 """
 from __future__ import division
+import functools
 from copy import deepcopy
 from numbers import Number, Integral
 import numpy as np
@@ -10,7 +11,8 @@ import sympy as sp
 from scipy.sparse import bmat, dia_matrix, kron, diags as sp_diags
 from scipy.sparse.linalg import spsolve
 from mpi4py import MPI
-from .utilities import integrate_sympy
+from .utilities import integrate_sympy, memory_report, timing, axpy
+from .optimization import autotune
 
 __all__ = ['SparseMatrix', 'SpectralMatrix', 'extract_diagonal_matrix',
            'check_sanity', 'get_dense_matrix', 'TPMatrix', 'BlockMatrix',
@@ -18,6 +20,18 @@ __all__ = ['SparseMatrix', 'SpectralMatrix', 'extract_diagonal_matrix',
 
 comm = MPI.COMM_WORLD
 
+def autotuned_matvec(matvec):
+    """Decorator for matvec methods that use the fastest format if format
+    is not given and autotuning is enabled"""
+    @functools.wraps(matvec)
+    def wrapped_matvec(self, v, c, format=None, axis=0):
+        if format is None:
+            if not autotune.enabled:
+                return matvec(self, v, c, axis=axis)
+            format = self.get_matvec_format(v, c, axis)
+        return matvec(self, v, c, format=format, axis=axis)
+    return wrapped_matvec
+
 class SparseMatrix(dict):
     r"""Base class for sparse matrices.
 
@@ -63,6 +77,13 @@ class SparseMatrix(dict):
         self.scale = scale
         self._matvec_methods = []
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'matvec' in cls.__dict__:
+            cls.matvec = autotuned_matvec(cls.__dict__['matvec'])
+        timing.instrument_matrix(cls)
+
+    @autotuned_matvec
     def matvec(self, v, c, format='dia', axis=0):
         """Matrix vector product
 
@@ -82,6 +103,10 @@ class SparseMatrix(dict):
              - python - Use numpy and vectorization
              - self - To be implemented in subclass
              - cython - Cython implementation that may be implemented in subclass
+
+             If not given, then the fastest format is chosen if autotuning is
+             enabled (see :mod:`.optimization.autotune`). Otherwise the
+             default of the class is used.
         axis : int, optional
             The axis over which to take the matrix vector product
 
@@ -120,6 +145,44 @@ class SparseMatrix(dict):
 
         return c
 
+    def get_matvec_format(self, v, c, axis=0):
+        """Return the fastest format of :meth:`matvec` for given arrays
+
+        The formats are benchmarked the first time a signature (class, shape,
+        dtype, axis) is seen on this machine, see :mod:`.optimization.autotune`.
+
+        Parameters
+        ----------
+        v : array
+            Input array of :meth:`matvec`
+        c : array
+            Output array of :meth:`matvec`
+        axis : int, optional
+            The axis over which to take the matrix vector product
+        """
+        formats = ['csr', 'dia', 'python']
+        formats += [f for f in self._matvec_methods if f not in formats]
+        key = ('matvec', type(self).__module__+'.'+type(self).__name__,
+               self.shape, v.shape, v.dtype.str, axis)
+        def run(format):
+            self.matvec(v, np.zeros_like(c), format=format, axis=axis)
+        return autotune.select(key, formats, run)
+
+    def memory_report(self, file=None, comm=MPI.COMM_WORLD):
+        """Print and return memory used by the arrays of this matrix
+
+        Parameters
+        ----------
+        file : file-like object, optional
+            Where to print. Default is sys.stdout
+        comm : MPI communicator or None, optional
+            Communicator to sum the memory over. If None, then report only
+            the memory of this process
+
+        See :func:`.utilities.memory_report`
+        """
+        return memory_report(self, comm, file)
+
     def diags(self, format='dia'):
         """Return a regular sparse matrix of specified format
 
@@ -834,6 +897,21 @@ class BlockMatrix:
     def get_offset(self, i, axis=0):
         return self.offset[i][axis]
 
+    def memory_report(self, file=None, comm=MPI.COMM_WORLD):
+        """Print and return memory used by the arrays of this matrix
+
+        Parameters
+        ----------
+        file : file-like object, optional
+            Where to print. Default is sys.stdout
+        comm : MPI communicator or None, optional
+            Communicator to sum the memory over. If None, then report only
+            the memory of this process
+
+        See :func:`.utilities.memory_report`
+        """
+        return memory_report(self, comm, file)
+
     def diags(self, it=(0,), format='csr'):
         """Return global block matrix in scipy sparse format
 
@@ -1199,7 +1277,7 @@ class TPMatrix:
     def matvec(self, v, c):
         c.fill(0)
         if len(self.naxes) == 0:
-            c[:] = self.scale*v
+            c = axpy(self.scale, v, c)
         elif len(self.naxes) == 1:
             axis = self.naxes[0]
             rank = v.rank if hasattr(v, 'rank') else 0
@@ -1208,7 +1286,7 @@ class TPMatrix:
                 c = self.pmat.matvec(v, c, axis=axis)
             else:
                 c = self.pmat.matvec(v[self.global_index[1]], c, axis=axis)
-            c = c*self.scale
+            c *= self.scale
         elif len(self.naxes) == 2:
             # 2 non-periodic directions (may be non-aligned in second axis, hence transfers)
             npaxes = deepcopy(self.naxes)
@@ -1354,6 +1432,21 @@ class TPMatrix:
         self.scale = self.scale - a.scale
         return self
 
+    def memory_report(self, file=None, comm=MPI.COMM_WORLD):
+        """Print and return memory used by the arrays of this matrix
+
+        Parameters
+        ----------
+        file : file-like object, optional
+            Where to print. Default is sys.stdout
+        comm : MPI communicator or None, optional
+            Communicator to sum the memory over. If None, then report only
+            the memory of this process
+
+        See :func:`.utilities.memory_report`
+        """
+        return memory_report(self, comm, file)
+
     def diags(self, format='csr'):
         if self.dimensions == 2:
             return kron(self.mats[0].diags(format=format), self.mats[1].diags(format=format))
@@ -1458,7 +1551,8 @@ def get_denser_matrix(test, trial, measure=1):
     K1 = trial[0].slice().stop - trial[0].slice().start
     N = test2.N
     x = test2.mpmath_points_and_weights(N, map_true_domain=False)[0]
-    ws = test2.get_measured_weights(N, measure)
+    # Weights cached on the original basis, since test2 is new for each call
+    ws = test[0].get_measured_weights(N, measure)
     v = test[0].evaluate_basis_derivative_all(x=x, k=test[1])[:, :K0]
     u = trial[0].evaluate_basis_derivative_all(x=x, k=trial[1])[:, :K1]
     return np.dot(np.conj(v.T)*ws[np.newaxis, :], u)
@@ -5,27 +5,260 @@ module we place optimized functions that are to be used instead of default
 Python methods. Some methods are implemented solely in Cython and only called
 from within the regular Python modules.
 
+The optimized functions are implemented both in Cython and Numba. The backend
+is chosen with the environment variable ``SHENFUN_OPTIMIZATION``, which may
+be ``cython`` (default), ``numba`` or ``python``.
+
 """
 import os
+import sys
+import time
 import importlib
 from functools import wraps
+import numpy as np
+from . import autotune
+
+#: Registry of all functions wrapped by :func:`optimizer`, with the qualified
+#: name of the Python function as key.
+registry = {}
+
+#: Whether calls of all functions wrapped by :func:`optimizer` are counted and
+#: timed. Otherwise only calls of Python fallbacks are. Set with
+#: :func:`enable_profiling` or the environment variable ``SHENFUN_PROFILE=1``.
+profiling = os.environ.get('SHENFUN_PROFILE', '0').lower() in ('1', 'true', 'yes', 'on')
+
+def enable_profiling(flag=True):
+    """Count and time calls of all functions wrapped by :func:`optimizer`
+
+    Parameters
+    ----------
+    flag : bool, optional
+    """
+    global profiling
+    profiling = flag
+
+class Dispatch:
+    """Record of the implementation chosen for a function wrapped by
+    :func:`optimizer`
+
+    Parameters
+    ----------
+    func : Python function
+        The pure Python implementation
+    backend : str
+        The requested backend ('cython', 'numba' or 'python')
+
+    Attributes
+    ----------
+    requested : str
+        The requested backend
+    backend : str
+        The backend actually used. Is 'python' if the requested backend does
+        not implement the function.
+    fallback : bool
+        Whether the Python function is used instead of the requested
+        optimized version
+    calls : int
+        Number of calls. Only counted for fallbacks, or if :data:`profiling`
+        is enabled.
+    time : float
+        Cumulative time spent in the function. Only measured for fallbacks,
+        or if :data:`profiling` is enabled.
+    tune : bool
+        Whether the backend may be chosen by autotuning. Set to False when
+        the backend is chosen with :func:`set_backend`.
+    """
+    def __init__(self, func, backend):
+        self.func = func
+        self.calls = 0
+        self.time = 0.0
+        self.tune = True
+        self._implementations = None
+        self._tuned = {}
+        self.set_backend(backend)
+
+    def set_backend(self, backend):
+        """Choose implementation from backend ('cython', 'numba' or 'python')"""
+        self.requested = backend.lower()
+        self.backend = 'python'
+        self.fun = self.func
+        if self.requested in ('cython', 'numba'):
+            mod = importlib.import_module('shenfun.optimization.'+self.requested)
+            fun = getattr(mod, self.func.__name__, None)
+            if fun is not None:
+                self.fun = fun
+                self.backend = self.requested
+        self.fallback = self.backend != self.requested
+
+    def implementations(self):
+        """Return dictionary of all available implementations"""
+        if self._implementations is None:
+            self._implementations = {'python': self.func}
+            for backend in ('cython', 'numba'):
+                try:
+                    mod = importlib.import_module('shenfun.optimization.'+backend)
+                except ImportError: # pragma: no cover
+                    continue
+                fun = getattr(mod, self.func.__name__, None)
+                if fun is not None:
+                    self._implementations[backend] = fun
+        return self._implementations
+
+    def autotuned(self, args, kwargs):
+        """Return fastest implementation for given arguments
+
+        The candidates are benchmarked on copies of the array arguments, since
+        the implementations may modify arrays in place.
+        """
+        impl = self.implementations()
+        if len(impl) == 1:
+            return self.fun
+        sig = lambda a: (a.shape, a.dtype.str) if isinstance(a, np.ndarray) else type(a).__name__
+        key = ('optimizer', self.func.__module__+'.'+self.func.__qualname__,
+               tuple(sig(a) for a in args), tuple((k, sig(v)) for k, v in sorted(kwargs.items())))
+        if key not in self._tuned:
+            cp = lambda a: np.array(a) if isinstance(a, np.ndarray) else a
+            def run(name):
+                impl[name](*[cp(a) for a in args], **{k: cp(v) for k, v in kwargs.items()})
+            self._tuned[key] = impl[autotune.select(key, impl.keys(), run)]
+        return self._tuned[key]
 
 def optimizer(func):
-    """Decorator used to wrap calls to optimized versions of functions."""
+    """Decorator used to wrap calls to optimized versions of functions.
 
-    mod = os.environ.get('SHENFUN_OPTIMIZATION', 'cython')
-    if mod.lower() not in ('cython', 'numba'):
-        # Use python function
-        #print(func.__name__ + ' not optimized')
-        return func
-    mod = importlib.import_module('shenfun.optimization.'+mod.lower())
-    fun = getattr(mod, func.__name__, func)
-    #if fun is func:
-    #    print(fun.__name__ + ' not optimized')
+    The implementation is chosen from the environment variable
+    ``SHENFUN_OPTIMIZATION``, and falls back on the Python function if the
+    chosen backend does not implement it. The choice is recorded in
+    :data:`registry` and may be changed for each function with
+    :func:`set_backend`. If autotuning is enabled (see
+    :mod:`.optimization.autotune`), then the fastest available backend is
+    chosen for each signature of the arguments.
+
+    Calls are counted and timed for Python fallbacks, and for all functions
+    if :data:`profiling` is enabled. Other calls only add a lookup of the
+    chosen implementation.
+    """
+    d = Dispatch(func, os.environ.get('SHENFUN_OPTIMIZATION', 'cython'))
+    registry[func.__module__+'.'+func.__qualname__] = d
 
     @wraps(func)
     def wrapped_function(*args, **kwargs):
+        fun = d.autotuned(args, kwargs) if autotune.enabled and d.tune else d.fun
+        if not (d.fallback or profiling):
+            return fun(*args, **kwargs)
+        t0 = time.perf_counter()
         u0 = fun(*args, **kwargs)
+        d.time += time.perf_counter()-t0
+        d.calls += 1
         return u0
 
     return wrapped_function
+
+def set_backend(name, backend):
+    """Set backend of functions wrapped by :func:`optimizer`
+
+    Parameters
+    ----------
+    name : str
+        Name of function, either qualified, like
+        ``'shenfun.utilities.apply_mask'``, or the function name only, in
+        which case all registered functions with this name are changed.
+    backend : str
+        'cython', 'numba' or 'python'
+
+    Note
+    ----
+    Functions with a backend set here are not autotuned.
+    """
+    found = False
+    for key, d in registry.items():
+        if name in (key, d.func.__name__):
+            d.set_backend(backend)
+            d.tune = False
+            found = True
+    if not found:
+        raise KeyError('No optimized function named %s'%name)
+
+def report(all=False, file=None):
+    """Print functions that fall back on the Python implementation
+
+    Only functions called at least once are listed, with call counts and
+    cumulative time. Calls of optimized functions are only counted if
+    :data:`profiling` is enabled.
+
+    Parameters
+    ----------
+    all : bool, optional
+        List all called functions, not only Python fallbacks
+    file : file-like object, optional
+        Where to print. Default is sys.stdout
+
+    Returns
+    -------
+    List of tuples (name, requested, backend, calls, time) for the listed
+    functions
+    """
+    rows = [(key, d.requested, d.backend, d.calls, d.time)
+            for key, d in registry.items() if d.calls > 0 and (all or d.fallback)]
+    rows.sort(key=lambda r: r[-1], reverse=True)
+    file = sys.stdout if file is None else file
+    print('{:<60} {:>9} {:>9} {:>9} {:>12}'.format('function', 'requested',
+                                                    'backend', 'calls', 'time (s)'),
+          file=file)
+    for row in rows:
+        print('{:<60} {:>9} {:>9} {:>9d} {:>12.4e}'.format(*row), file=file)
+    return rows
+
+def get_module(name):
+    """Return module of optimized functions called directly from Python
+
+    Some optimized functions, like the matrix-vector products, are not
+    wrapped by :func:`optimizer`, but called directly from the module
+    returned here. The Numba module is returned if ``SHENFUN_OPTIMIZATION``
+    is ``numba``, and the Cython module otherwise.
+
+    Parameters
+    ----------
+    name : str
+        Name of Cython module, e.g., ``'Matvec'``. The Numba module has the
+        same name in lower case.
+    """
+    mod = os.environ.get('SHENFUN_OPTIMIZATION', 'cython')
+    if mod.lower() == 'numba':
+        return importlib.import_module('shenfun.optimization.numba.'+name.lower())
+    return importlib.import_module('shenfun.optimization.cython.'+name)
+
+def set_num_threads(n):
+    """Set number of threads used by the thread-parallel kernels
+
+    The 2D and 3D solvers and matrix-vector products loop over independent
+    lines of the arrays. These lines are shared between threads (OpenMP for
+    Cython and ``prange`` for Numba), with identical results for any number
+    of threads. The initial number of threads is set by the environment
+    variable ``SHENFUN_NUM_THREADS``, with default 1.
+
+    Parameters
+    ----------
+    n : int
+        Number of threads
+    """
+    if os.environ.get('SHENFUN_OPTIMIZATION', 'cython').lower() == 'numba':
+        import numba
+        numba.set_num_threads(min(n, numba.config.NUMBA_NUM_THREADS))
+    try:
+        from .cython import la, Matvec
+    except ImportError: # pragma: no cover
+        return
+    la.set_num_threads(n)
+    Matvec.set_num_threads(n)
+
+def get_num_threads():
+    """Return number of threads used by the thread-parallel kernels"""
+    if os.environ.get('SHENFUN_OPTIMIZATION', 'cython').lower() == 'numba':
+        import numba
+        return numba.get_num_threads()
+    try:
+        from .cython import la
+    except ImportError: # pragma: no cover
+        return 1
+    return la.get_num_threads()
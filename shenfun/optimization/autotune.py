@@ -0,0 +1,160 @@
+"""
+Module for autotuning the choice between alternative implementations
+
+Several hot paths in shenfun have more than one implementation, like the
+backends of functions wrapped by :func:`.optimizer`, the formats of
+:meth:`.SparseMatrix.matvec`, fast versus Vandermonde type transforms and the
+methods of :meth:`.TensorProductSpace.eval`. With autotuning enabled, the
+candidates are benchmarked the first time a hot path is called with a new
+signature (space, shape, dtype, ...), and the fastest is used from then on.
+
+The decisions are stored in a cache file that is specific to the host, such
+that the benchmarks are only run once per machine. Autotuning is enabled with
+the environment variable ``SHENFUN_AUTOTUNE=1``, or with :func:`enable`. The
+cache file is ``~/.cache/shenfun/autotune-<hostname>.json``, unless set by the
+environment variable ``SHENFUN_AUTOTUNE_CACHE``.
+
+"""
+import os
+import json
+import time
+import socket
+import numpy as np
+
+__all__ = ['enable', 'cache_file', 'decisions', 'select', 'clear']
+
+enabled = os.environ.get('SHENFUN_AUTOTUNE', '0').lower() in ('1', 'true', 'yes', 'on')
+
+_decisions = None
+
+def enable(flag=True):
+    """Enable or disable autotuning
+
+    Parameters
+    ----------
+    flag : bool, optional
+    """
+    global enabled
+    enabled = flag
+
+def cache_file():
+    """Return name of host specific cache file of autotuning decisions"""
+    default = os.path.join(os.path.expanduser('~'), '.cache', 'shenfun',
+                           'autotune-%s.json'%socket.gethostname())
+    return os.environ.get('SHENFUN_AUTOTUNE_CACHE', default)
+
+def _read():
+    try:
+        with open(cache_file()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def decisions():
+    """Return dictionary of autotuning decisions, with the signature of the
+    hot path as key and the name of the chosen candidate as value"""
+    global _decisions
+    if _decisions is None:
+        _decisions = _read()
+    return _decisions
+
+def _store(key, name, write=True):
+    decisions()[key] = name
+    if not write:
+        return
+    filename = cache_file()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        # Merge with decisions stored by other processes in the meantime
+        d = _read()
+        d[key] = name
+        tmp = '%s.%d'%(filename, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump(d, f, indent=0, sort_keys=True)
+        os.replace(tmp, filename)
+    except OSError: # pragma: no cover
+        pass
+
+def clear():
+    """Remove all autotuning decisions, both in memory and on disk"""
+    global _decisions
+    _decisions = {}
+    try:
+        os.remove(cache_file())
+    except OSError:
+        pass
+
+def select(key, names, run, repeats=3, comm=None):
+    """Return the fastest candidate for a hot path
+
+    Parameters
+    ----------
+    key : tuple
+        Signature of the hot path, like name, shape and dtype
+    names : sequence
+        Names of the candidates. Must be JSON serializable (str, int or bool)
+    run : callable
+        run(name) executes candidate name. Candidates that raise an exception
+        are never chosen
+    repeats : int, optional
+        The best time of this many calls is used for each candidate, after
+        one warm-up call (that may, e.g., compile a Numba function)
+    comm : MPI communicator, optional
+        If the candidates are collective operations over comm, then all
+        processes in comm must call select together. The processes benchmark
+        together and agree on the choice. A candidate that raises an
+        exception on any process is dropped on all processes. Only the
+        process with rank 0 writes the cache file.
+
+    Returns
+    -------
+    The chosen name
+    """
+    key = repr(key)
+    names = list(names)
+    d = decisions()
+    if comm is None:
+        if d.get(key) in names:
+            return d[key]
+    else:
+        choice = d.get(key) if d.get(key) in names else None
+        choices = comm.allgather(choice)
+        if choice is not None and choices.count(choice) == len(choices):
+            return choice
+
+    def call(name):
+        # Return time of call, or inf if the call failed on any process in
+        # comm. A candidate that fails on one process is then abandoned on
+        # all, such that all processes make the same collective calls.
+        try:
+            t0 = time.perf_counter()
+            run(name)
+            t = time.perf_counter()-t0
+        except Exception: # pylint: disable=broad-except
+            t = float('inf')
+        if comm is not None:
+            from mpi4py import MPI
+            if not comm.allreduce(t < float('inf'), op=MPI.LAND):
+                t = float('inf')
+        return t
+
+    times = []
+    for name in names:
+        t = call(name)
+        if t < float('inf'):
+            t = float('inf')
+            for _ in range(repeats):
+                ti = call(name)
+                if ti == float('inf'):
+                    t = ti
+                    break
+                t = min(t, ti)
+        times.append(t)
+    if comm is not None:
+        from mpi4py import MPI
+        times = np.array(times)
+        comm.Allreduce(MPI.IN_PLACE, times, op=MPI.MAX)
+        times = list(times)
+    best = names[times.index(min(times))]
+    _store(key, best, write=comm is None or comm.Get_rank() == 0)
+    return best
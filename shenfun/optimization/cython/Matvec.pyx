@@ -6,6 +6,7 @@ cimport numpy as np
 from libcpp.vector cimport vector
 from libc.math cimport M_PI, M_PI_2
 from cython.parallel import prange
+import os
 
 ctypedef np.complex128_t complex_t
 ctypedef np.float64_t real_t
@@ -15,11 +16,21 @@ ctypedef fused T:
     real_t
     complex_t
 
+cdef int num_threads = int(os.environ.get('SHENFUN_NUM_THREADS', 1))
+
+def set_num_threads(int n):
+    """Set number of threads used by the 2D and 3D kernels"""
+    global num_threads
+    num_threads = max(n, 1)
+
+def get_num_threads():
+    """Return number of threads used by the 2D and 3D kernels"""
+    return num_threads
+
 def imult(T[:, :, ::1] array, real_t scale):
     cdef int i, j, k
 
-    #for i in prange(array.shape[0], nogil=True, num_threads=1):
-    for i in range(array.shape[0]):
+    for i in prange(array.shape[0], nogil=True, schedule='static', num_threads=num_threads):
         for j in range(array.shape[1]):
             for k in range(array.shape[2]):
                 array[i, j, k] *= scale
@@ -40,7 +51,7 @@ cdef void CDN_matvec_ptr(T* v,
                          real_t* ld,
                          real_t* ud,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i
 
@@ -62,12 +73,12 @@ def CDN_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
@@ -85,19 +96,19 @@ def CDN_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -109,7 +120,7 @@ cdef void BDN_matvec_ptr(T* v,
                          real_t* dd,
                          real_t ud,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
 
@@ -145,19 +156,19 @@ def BDN_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 BDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], ud, N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 BDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], ud, N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -177,12 +188,12 @@ def BDN_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             BDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], ud, N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             BDN_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], ud, N, strides)
@@ -192,7 +203,7 @@ cdef void CDDmat_matvec_ptr(T* v,
                             real_t* ld,
                             real_t* ud,
                             int N,
-                            int st):
+                            int st) nogil:
     cdef:
         int i
 
@@ -214,19 +225,19 @@ def CDD_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CDDmat_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CDDmat_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -245,12 +256,12 @@ def CDD_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CDDmat_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CDDmat_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], N, strides)
@@ -277,19 +288,19 @@ def SBB_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 SBB_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 SBB_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -307,12 +318,12 @@ def SBB_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             SBB_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             SBB_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
@@ -321,7 +332,7 @@ cdef void SBB_matvec_ptr(T* v,
                          T* b,
                          real_t* dd,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p, r
@@ -415,7 +426,7 @@ cdef void ADD_matvec_ptr(T* v,
                          T* b,
                          real_t* dd,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p
@@ -448,20 +459,20 @@ def ADD_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 ADD_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 ADD_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -479,13 +490,13 @@ def ADD_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             ADD_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             ADD_matvec_ptr(v_ptr, b_ptr, &dd[0], N, strides)
@@ -493,7 +504,7 @@ def ADD_matvec2D_ptr(T[:, ::1] v,
 cdef void ATT_matvec_ptr(T* v,
                          T* b,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p0, p1
@@ -537,21 +548,21 @@ def ATT_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 ATT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 ATT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -568,13 +579,13 @@ def ATT_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             ATT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             ATT_matvec_ptr(v_ptr, b_ptr, N, strides)
@@ -582,7 +593,7 @@ def ATT_matvec2D_ptr(T[:, ::1] v,
 cdef void GLL_matvec_ptr(T* v,
                          T* b,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p0, p1
@@ -626,21 +637,21 @@ def GLL_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 GLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 GLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -657,13 +668,13 @@ def GLL_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             GLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             GLL_matvec_ptr(v_ptr, b_ptr, N, strides)
@@ -672,7 +683,7 @@ def GLL_matvec2D_ptr(T[:, ::1] v,
 cdef void CLL_matvec_ptr(T* v,
                          T* b,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p
@@ -707,13 +718,13 @@ def CLL_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CLL_matvec_ptr(v_ptr, b_ptr, N, strides)
@@ -729,21 +740,21 @@ def CLL_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CLL_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -752,7 +763,7 @@ def CLL_matvec3D_ptr(T[:, :, ::1] v,
 cdef void CTT_matvec_ptr(T* v,
                          T* b,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
         double p
@@ -787,13 +798,13 @@ def CTT_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CTT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CTT_matvec_ptr(v_ptr, b_ptr, N, strides)
@@ -809,21 +820,21 @@ def CTT_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CTT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CTT_matvec_ptr(v_ptr, b_ptr, N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -835,7 +846,7 @@ cdef void Tridiagonal_matvec_ptr(T* v,
                                  real_t* dd,
                                  real_t* ud,
                                  int N,
-                                 int st):
+                                 int st) nogil:
     cdef:
         int i
 
@@ -862,12 +873,12 @@ def Tridiagonal_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             Tridiagonal_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             Tridiagonal_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], &ud[0], N, strides)
@@ -886,19 +897,19 @@ def Tridiagonal_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 Tridiagonal_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 Tridiagonal_matvec_ptr(v_ptr, b_ptr, &ld[0], &dd[0], &ud[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -956,7 +967,7 @@ cdef void Pentadiagonal_matvec_ptr(T* v,
                                    real_t* ud,
                                    real_t* udd,
                                    int N,
-                                   int st):
+                                   int st) nogil:
     cdef:
         int i
 
@@ -991,7 +1002,7 @@ def Pentadiagonal_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
@@ -999,7 +1010,7 @@ def Pentadiagonal_matvec3D_ptr(T[:, :, ::1] v,
                                          &ud[0], &udd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
@@ -1007,7 +1018,7 @@ def Pentadiagonal_matvec3D_ptr(T[:, :, ::1] v,
                                          &ud[0], &udd[0], N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1030,14 +1041,14 @@ def Pentadiagonal_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             Pentadiagonal_matvec_ptr(v_ptr, b_ptr, &ldd[0], &ld[0], &dd[0],
                                      &ud[0], &udd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             Pentadiagonal_matvec_ptr(v_ptr, b_ptr, &ldd[0], &ld[0], &dd[0],
@@ -1064,7 +1075,7 @@ cdef void CBD_matvec_ptr(T* v,
                          real_t* ud,
                          real_t* udd,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i
 
@@ -1088,12 +1099,12 @@ def CBD_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CBD_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], &udd[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CBD_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], &udd[0], N, strides)
@@ -1112,19 +1123,19 @@ def CBD_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CBD_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], &udd[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CBD_matvec_ptr(v_ptr, b_ptr, &ld[0], &ud[0], &udd[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1136,7 +1147,7 @@ cdef void CDB_matvec_ptr(T* v,
                          real_t* ld,
                          real_t* ud,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
         int i, j, k
 
@@ -1174,12 +1185,12 @@ def CDB_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             CDB_matvec_ptr(v_ptr, b_ptr, &lld[0], &ld[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             CDB_matvec_ptr(v_ptr, b_ptr, &lld[0], &ld[0], &ud[0], N, strides)
@@ -1198,19 +1209,19 @@ def CDB_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 CDB_matvec_ptr(v_ptr, b_ptr, &lld[0], &ld[0], &ud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 CDB_matvec_ptr(v_ptr, b_ptr, &lld[0], &ld[0], &ud[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1223,9 +1234,9 @@ cdef void BBD_matvec_ptr(T* v,
                          real_t* ud,
                          real_t* uud,
                          int N,
-                         int st):
+                         int st) nogil:
     cdef:
-        int i
+        int k
 
     b[0] = dd[0]*v[0] + ud[0]*v[2*st] + uud[0]*v[4*st]
     b[st] = dd[1]*v[st] + ud[1]*v[3*st] + uud[1]*v[5*st]
@@ -1251,19 +1262,19 @@ def BBD_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
                 BBD_matvec_ptr(v_ptr, b_ptr, ld, &dd[0], &ud[0], &uud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
                 BBD_matvec_ptr(v_ptr, b_ptr, ld, &dd[0], &ud[0], &uud[0], N, strides)
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1284,12 +1295,12 @@ def BBD_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             BBD_matvec_ptr(v_ptr, b_ptr, ld, &dd[0], &ud[0], &uud[0], N, strides)
     elif axis == 1:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             BBD_matvec_ptr(v_ptr, b_ptr, ld, &dd[0], &ud[0], &uud[0], N, strides)
@@ -1350,7 +1361,7 @@ cdef void Helmholtz_matvec_ptr(T* v,
                                real_t* ud,
                                real_t* bd,
                                int N,
-                               int st):
+                               int st) nogil:
     # b = (alfa*A + beta*B)*v
     # For B matrix ld = ud = -pi/2
     cdef:
@@ -1395,7 +1406,7 @@ def Helmholtz_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
@@ -1403,7 +1414,7 @@ def Helmholtz_matvec3D_ptr(T[:, :, ::1] v,
                                      beta[0, j, k], &dd[0], &ud[0], &bd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
@@ -1411,7 +1422,7 @@ def Helmholtz_matvec3D_ptr(T[:, :, ::1] v,
                                      beta[i, 0, k], &dd[0], &ud[0], &bd[0], N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1435,14 +1446,14 @@ def Helmholtz_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             Helmholtz_matvec_ptr(v_ptr, b_ptr, alfa[0, j],
                                  beta[0, j], &dd[0], &ud[0], &bd[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             Helmholtz_matvec_ptr(v_ptr, b_ptr, alfa[i, 0],
@@ -1476,7 +1487,7 @@ cdef void Biharmonic_matvec_ptr(T* v,
                                 real_t* biu,
                                 real_t* biuu,
                                 int N,
-                                int st):
+                                int st) nogil:
     cdef:
         int i, j, k
         vector[double] ldd, ld, dd, ud, udd
@@ -1570,7 +1581,7 @@ def Biharmonic_matvec3D_ptr(T[:, :, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[0, j, k]
                 b_ptr = &b[0, j, k]
@@ -1579,7 +1590,7 @@ def Biharmonic_matvec3D_ptr(T[:, :, ::1] v,
                                       &aiu[0], &bill[0], &bil[0], &bii[0], &biu[0], &biuu[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(v.shape[2]):
                 v_ptr = &v[i, 0, k]
                 b_ptr = &b[i, 0, k]
@@ -1588,7 +1599,7 @@ def Biharmonic_matvec3D_ptr(T[:, :, ::1] v,
                                       &aiu[0], &bill[0], &bil[0], &bii[0], &biu[0], &biuu[0], N, strides)
 
     elif axis == 2:
-        for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(v.shape[1]):
                 v_ptr = &v[i, j, 0]
                 b_ptr = &b[i, j, 0]
@@ -1624,7 +1635,7 @@ def Biharmonic_matvec2D_ptr(T[:, ::1] v,
 
     strides = v.strides[axis]/v.itemsize
     if axis == 0:
-        for j in range(v.shape[1]):
+        for j in prange(v.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[0, j]
             b_ptr = &b[0, j]
             Biharmonic_matvec_ptr(v_ptr, b_ptr, a0, alfa[0, j],
@@ -1632,7 +1643,7 @@ def Biharmonic_matvec2D_ptr(T[:, ::1] v,
                                   &aiu[0], &bill[0], &bil[0], &bii[0], &biu[0], &biuu[0], N, strides)
 
     elif axis == 1:
-       for i in range(v.shape[0]):
+        for i in prange(v.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             v_ptr = &v[i, 0]
             b_ptr = &b[i, 0]
             Biharmonic_matvec_ptr(v_ptr, b_ptr, a0, alfa[i, 0],
@@ -6,3 +6,5 @@ from .Matvec import Helmholtz_matvec, Biharmonic_matvec
 from .outer import outer2D, outer3D
 from .applymask import apply_mask
 from .Cheb import chebval
+from .evaluate import clenshaw, nufft_interp
+from .blas import axpy, axpby
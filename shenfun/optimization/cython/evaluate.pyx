@@ -1016,3 +1016,163 @@ def _evaluate_lm_3D_ccr1(np.ndarray[real_t, ndim=1] b,
                     if ii > 0 & ii < M:
                         b[i] += p
     return b
+
+def clenshaw(real_t[::1] x, T[:, :, :] c, real_t[::1] a, real_t[::1] b,
+             real_t[::1] g, T[:, ::1] output_array):
+    cdef:
+        int i, n, j, q
+        int P = output_array.shape[0]
+        int N = c.shape[1]
+        int R = output_array.shape[1]
+        int shared = c.shape[0] == 1
+        real_t alpha
+        T b0
+        T[::1] b1 = np.zeros(R, dtype=np.asarray(output_array).dtype)
+        T[::1] b2 = np.zeros(R, dtype=np.asarray(output_array).dtype)
+
+    for i in range(P):
+        q = 0 if shared else i
+        for j in range(R):
+            b1[j] = 0
+            b2[j] = 0
+        for n in range(N-1, -1, -1):
+            alpha = a[n]*x[i] + b[n]
+            if n < N-1:
+                for j in range(R):
+                    b0 = c[q, n, j] + alpha*b1[j] - g[n+1]*b2[j]
+                    b2[j] = b1[j]
+                    b1[j] = b0
+            else:
+                for j in range(R):
+                    b2[j] = b1[j]
+                    b1[j] = c[q, n, j]
+        for j in range(R):
+            output_array[i, j] = b1[j]
+    return output_array
+
+cdef extern from "math.h" nogil:
+    double exp_real "exp" (double)
+    double floor(double)
+    double M_PI
+
+cdef void _gaussian_stencil(real_t x, int_t M, int_t offset, int_t n, real_t tau,
+                            int msp, int_t[::1] idx, real_t[::1] w) nogil:
+    # Indices into the local grid, and Gaussian weights, of the stencil of x.
+    # Indices outside the local grid are set to -1.
+    cdef:
+        int s
+        int_t m, ii
+        real_t h = 2*M_PI/M
+        int_t m0 = <int_t>floor(x/h)-msp+1
+    for s in range(2*msp):
+        m = m0+s
+        ii = ((m % M)+M) % M - offset
+        if ii >= 0 and ii < n:
+            idx[s] = ii
+            w[s] = exp_real(-(x-m*h)*(x-m*h)/(4*tau))
+        else:
+            idx[s] = -1
+
+def nufft_interp(h, real_t[:, ::1] x, int_t[::1] M, int_t[::1] offset,
+                 real_t[::1] tau, int msp, complex_t[:, ::1] output_array):
+    d = x.shape[0]
+    if d == 1:
+        _nufft_interp_1D(h, x, M, offset, tau, msp, output_array)
+    elif d == 2:
+        _nufft_interp_2D(h, x, M, offset, tau, msp, output_array)
+    else:
+        _nufft_interp_3D(h, x, M, offset, tau, msp, output_array)
+    return np.asarray(output_array)
+
+def _nufft_interp_1D(complex_t[:, ::1] h, real_t[:, ::1] x, int_t[::1] M,
+                     int_t[::1] offset, real_t[::1] tau, int msp,
+                     complex_t[:, ::1] output_array):
+    cdef:
+        int p, s, j
+        int P = output_array.shape[0]
+        int R = output_array.shape[1]
+        int S = 2*msp
+        int_t ii
+        real_t ws
+        int_t[::1] i0 = np.zeros(S, dtype=np.int64)
+        real_t[::1] w0 = np.zeros(S)
+
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for j in range(R):
+                output_array[p, j] = output_array[p, j] + ws*h[ii, j]
+
+def _nufft_interp_2D(complex_t[:, :, ::1] h, real_t[:, ::1] x, int_t[::1] M,
+                     int_t[::1] offset, real_t[::1] tau, int msp,
+                     complex_t[:, ::1] output_array):
+    cdef:
+        int p, s, t, j
+        int P = output_array.shape[0]
+        int R = output_array.shape[1]
+        int S = 2*msp
+        int_t ii, jj
+        real_t ws, wt
+        int_t[::1] i0 = np.zeros(S, dtype=np.int64)
+        int_t[::1] i1 = np.zeros(S, dtype=np.int64)
+        real_t[::1] w0 = np.zeros(S)
+        real_t[::1] w1 = np.zeros(S)
+
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        _gaussian_stencil(x[1, p], M[1], offset[1], h.shape[1], tau[1], msp, i1, w1)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for t in range(S):
+                jj = i1[t]
+                if jj < 0:
+                    continue
+                wt = ws*w1[t]
+                for j in range(R):
+                    output_array[p, j] = output_array[p, j] + wt*h[ii, jj, j]
+
+def _nufft_interp_3D(complex_t[:, :, :, ::1] h, real_t[:, ::1] x, int_t[::1] M,
+                     int_t[::1] offset, real_t[::1] tau, int msp,
+                     complex_t[:, ::1] output_array):
+    cdef:
+        int p, s, t, u, j
+        int P = output_array.shape[0]
+        int R = output_array.shape[1]
+        int S = 2*msp
+        int_t ii, jj, kk
+        real_t ws, wt, wu
+        int_t[::1] i0 = np.zeros(S, dtype=np.int64)
+        int_t[::1] i1 = np.zeros(S, dtype=np.int64)
+        int_t[::1] i2 = np.zeros(S, dtype=np.int64)
+        real_t[::1] w0 = np.zeros(S)
+        real_t[::1] w1 = np.zeros(S)
+        real_t[::1] w2 = np.zeros(S)
+
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        _gaussian_stencil(x[1, p], M[1], offset[1], h.shape[1], tau[1], msp, i1, w1)
+        _gaussian_stencil(x[2, p], M[2], offset[2], h.shape[2], tau[2], msp, i2, w2)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for t in range(S):
+                jj = i1[t]
+                if jj < 0:
+                    continue
+                wt = ws*w1[t]
+                for u in range(S):
+                    kk = i2[u]
+                    if kk < 0:
+                        continue
+                    wu = wt*w2[u]
+                    for j in range(R):
+                        output_array[p, j] = output_array[p, j] + wu*h[ii, jj, kk, j]
@@ -7,6 +7,8 @@ cimport cython
 cimport numpy as np
 from libcpp.vector cimport vector
 from libcpp.algorithm cimport copy
+from cython.parallel import prange, threadid
+import os
 
 ctypedef fused T:
     np.float64_t
@@ -17,6 +19,17 @@ ctypedef np.float64_t real_t
 ctypedef np.int64_t int_t
 ctypedef double real
 
+cdef int num_threads = int(os.environ.get('SHENFUN_NUM_THREADS', 1))
+
+def set_num_threads(int n):
+    """Set number of threads used by the 2D and 3D solvers"""
+    global num_threads
+    num_threads = max(n, 1)
+
+def get_num_threads():
+    """Return number of threads used by the 2D and 3D solvers"""
+    return num_threads
+
 
 #def PDMA_SymLU(np.ndarray[np.float64_t, ndim=1, mode='c'] d,
                #np.ndarray[np.float64_t, ndim=1, mode='c'] e,
@@ -294,17 +307,17 @@ def PDMA_Symsolve3D_ptr(real_t[::1] d,
 
     strides = x.strides[axis]/x.itemsize
     if axis == 0:
-        for j in range(x.shape[1]):
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(x.shape[2]):
                 PDMA_SymSolve_ptr(&d[0], &e[0], &f[0], &x[0,j,k], n, strides)
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(x.shape[2]):
                 PDMA_SymSolve_ptr(&d[0], &e[0], &f[0], &x[i,0,k], n, strides)
 
     elif axis == 2:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(x.shape[1]):
                 PDMA_SymSolve_ptr(&d[0], &e[0], &f[0], &x[i,j,0], n, strides)
 
@@ -319,11 +332,11 @@ def PDMA_Symsolve2D_ptr(real_t[::1] d,
 
     strides = x.strides[axis]/x.itemsize
     if axis == 0:
-        for j in range(x.shape[1]):
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             PDMA_SymSolve_ptr(&d[0], &e[0], &f[0], &x[0,j], n, strides)
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             PDMA_SymSolve_ptr(&d[0], &e[0], &f[0], &x[i,0], n, strides)
 
 def TDMA_O_SymLU(real_t[::1] d,
@@ -433,7 +446,7 @@ cdef void TDMA_SymSolve_ptr(real_t* d,
                             real_t* l,
                             T* x,
                             int n,
-                            int st):
+                            int st) nogil:
     cdef:
         int i
 
@@ -460,11 +473,11 @@ def TDMA_SymSolve2D_ptr(real_t[::1] d,
 
     strides = x.strides[axis]/x.itemsize
     if axis == 0:
-        for j in range(x.shape[1]):
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             TDMA_SymSolve_ptr(&d[0], &a[0], &l[0], &x[0,j], n, strides)
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             TDMA_SymSolve_ptr(&d[0], &a[0], &l[0], &x[i,0], n, strides)
 
 def TDMA_SymSolve3D_ptr(real_t[::1] d,
@@ -482,17 +495,17 @@ def TDMA_SymSolve3D_ptr(real_t[::1] d,
 
     strides = x.strides[axis]/x.itemsize
     if axis == 0:
-        for j in range(x.shape[1]):
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(x.shape[2]):
                 TDMA_SymSolve_ptr(&d[0], &a[0], &l[0], &x[0,j,k], n, strides)
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(x.shape[2]):
                 TDMA_SymSolve_ptr(&d[0], &a[0], &l[0], &x[i,0,k], n, strides)
 
     elif axis == 2:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(x.shape[1]):
                 TDMA_SymSolve_ptr(&d[0], &a[0], &l[0], &x[i,j,0], n, strides)
 
@@ -586,23 +599,22 @@ def TDMA_O_SymSolve3D(real_t[::1] d,
         real_t d1
 
     if axis == 0:
-        for i in range(1, n):
-            for j in range(x.shape[1]):
+        # One parallel region, where each thread sweeps its own lines j
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
+            for i in range(1, n):
                 for k in range(x.shape[2]):
                     x[i, j, k] -= l[i-1]*x[i-1, j, k]
 
-        for j in range(x.shape[1]):
             for k in range(x.shape[2]):
                 x[n-1, j, k] = x[n-1, j, k]/d[n-1]
 
-        for i in range(n - 2, -1, -1):
-            d1 = 1./d[i]
-            for j in range(x.shape[1]):
+            for i in range(n - 2, -1, -1):
+                d1 = 1./d[i]
                 for k in range(x.shape[2]):
                     x[i, j, k] = (x[i, j, k] - a[i]*x[i+1, j, k])*d1
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(1, n):
                 for k in range(x.shape[2]):
                     x[i, j, k] -= l[j-1]*x[i, j-1, k]
@@ -615,7 +627,7 @@ def TDMA_O_SymSolve3D(real_t[::1] d,
                     x[i, j, k] = (x[i, j, k] - a[j]*x[i, j+1, k])/d[j]
 
     elif axis == 2:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(x.shape[1]):
                 for k in range(1, n):
                     x[i, j, k] -= l[k-1]*x[i, j, k-1]
@@ -635,24 +647,23 @@ def TDMA_SymSolve3D(real_t[::1] d,
         real_t d1
 
     if axis == 0:
-        for i in range(2, n):
-            for j in range(x.shape[1]):
+        # One parallel region, where each thread sweeps its own lines j
+        for j in prange(x.shape[1], nogil=True, schedule='static', num_threads=num_threads):
+            for i in range(2, n):
                 for k in range(x.shape[2]):
                     x[i, j, k] -= l[i-2]*x[i-2, j, k]
 
-        for j in range(x.shape[1]):
             for k in range(x.shape[2]):
                 x[n-1, j, k] = x[n-1, j, k]/d[n-1]
                 x[n-2, j, k] = x[n-2, j, k]/d[n-2]
 
-        for i in range(n - 3, -1, -1):
-            d1 = 1./d[i]
-            for j in range(x.shape[1]):
+            for i in range(n - 3, -1, -1):
+                d1 = 1./d[i]
                 for k in range(x.shape[2]):
                     x[i, j, k] = (x[i, j, k] - a[i]*x[i+2, j, k])*d1
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(2, n):
                 for k in range(x.shape[2]):
                     x[i, j, k] -= l[j-2]*x[i, j-2, k]
@@ -666,7 +677,7 @@ def TDMA_SymSolve3D(real_t[::1] d,
                     x[i, j, k] = (x[i, j, k] - a[j]*x[i, j+2, k])/d[j]
 
     elif axis == 2:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(x.shape[1]):
                 for k in range(2, n):
                     x[i, j, k] -= l[k-2]*x[i, j, k-2]
@@ -700,7 +711,7 @@ def TDMA_O_SymSolve2D(real_t[::1] d,
                 x[i, j] = (x[i, j] - a[i]*x[i+1, j])*d1
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(1, n):
                 x[i, j] -= l[j-1]*x[i, j-1]
             x[i, n-1] = x[i, n-1]/d[n-1]
@@ -733,7 +744,7 @@ def TDMA_SymSolve2D(real_t[::1] d,
                 x[i, j] = (x[i, j] - a[i]*x[i+2, j])*d1
 
     elif axis == 1:
-        for i in range(x.shape[0]):
+        for i in prange(x.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(2, n):
                 x[i, j] -= l[j-2]*x[i, j-2]
 
@@ -1117,9 +1128,9 @@ def Solve_Helmholtz_3D_ptr(np.int64_t axis,
 
     strides = fk.strides[axis]/fk.itemsize
     N = d0.shape[axis] - 2
-    y.resize(N)
+    y.resize(N*num_threads)
     if axis == 0:
-        for j in range(d0.shape[1]):
+        for j in prange(d0.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(d0.shape[2]):
                 fk_ptr = &fk[0,j,k]
                 u_hat_ptr = &u_hat[0,j,k]
@@ -1128,10 +1139,10 @@ def Solve_Helmholtz_3D_ptr(np.int64_t axis,
                 d2_ptr = &d2[0,j,k]
                 L_ptr = &L[0,j,k]
                 Solve_Helmholtz_1D_ptr(fk_ptr, u_hat_ptr, neumann, d0_ptr,
-                                       d1_ptr, d2_ptr, L_ptr, &y[0], N,
+                                       d1_ptr, d2_ptr, L_ptr, &y[threadid()*N], N,
                                        strides)
     elif axis == 1:
-        for i in range(d0.shape[0]):
+        for i in prange(d0.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(d0.shape[2]):
                 fk_ptr = &fk[i,0,k]
                 u_hat_ptr = &u_hat[i,0,k]
@@ -1140,11 +1151,11 @@ def Solve_Helmholtz_3D_ptr(np.int64_t axis,
                 d2_ptr = &d2[i,0,k]
                 L_ptr = &L[i,0,k]
                 Solve_Helmholtz_1D_ptr(fk_ptr, u_hat_ptr, neumann, d0_ptr,
-                                       d1_ptr, d2_ptr, L_ptr, &y[0], N,
+                                       d1_ptr, d2_ptr, L_ptr, &y[threadid()*N], N,
                                        strides)
 
     elif axis == 2:
-        for i in range(d0.shape[0]):
+        for i in prange(d0.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for j in range(d0.shape[1]):
                 fk_ptr = &fk[i,j,0]
                 u_hat_ptr = &u_hat[i,j,0]
@@ -1153,7 +1164,7 @@ def Solve_Helmholtz_3D_ptr(np.int64_t axis,
                 d2_ptr = &d2[i,j,0]
                 L_ptr = &L[i,j,0]
                 Solve_Helmholtz_1D_ptr(fk_ptr, u_hat_ptr, neumann, d0_ptr,
-                                       d1_ptr, d2_ptr, L_ptr, &y[0], N,
+                                       d1_ptr, d2_ptr, L_ptr, &y[threadid()*N], N,
                                        strides)
 
 def Solve_Helmholtz_2D_ptr(np.int64_t axis,
@@ -1176,9 +1187,9 @@ def Solve_Helmholtz_2D_ptr(np.int64_t axis,
 
     strides = fk.strides[axis]/fk.itemsize
     N = d0.shape[axis] - 2
-    y.resize(N)
+    y.resize(N*num_threads)
     if axis == 0:
-        for j in range(d0.shape[1]):
+        for j in prange(d0.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             fk_ptr = &fk[0,j]
             u_hat_ptr = &u_hat[0,j]
             d0_ptr = &d0[0,j]
@@ -1186,10 +1197,10 @@ def Solve_Helmholtz_2D_ptr(np.int64_t axis,
             d2_ptr = &d2[0,j]
             L_ptr = &L[0,j]
             Solve_Helmholtz_1D_ptr(fk_ptr, u_hat_ptr, neumann, d0_ptr,
-                                    d1_ptr, d2_ptr, L_ptr, &y[0], N,
+                                    d1_ptr, d2_ptr, L_ptr, &y[threadid()*N], N,
                                     strides)
     elif axis == 1:
-        for i in range(d0.shape[0]):
+        for i in prange(d0.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             fk_ptr = &fk[i,0]
             u_hat_ptr = &u_hat[i,0]
             d0_ptr = &d0[i,0]
@@ -1197,7 +1208,7 @@ def Solve_Helmholtz_2D_ptr(np.int64_t axis,
             d2_ptr = &d2[i,0]
             L_ptr = &L[i,0]
             Solve_Helmholtz_1D_ptr(fk_ptr, u_hat_ptr, neumann, d0_ptr,
-                                    d1_ptr, d2_ptr, L_ptr, &y[0], N,
+                                    d1_ptr, d2_ptr, L_ptr, &y[threadid()*N], N,
                                     strides)
 
 def LU_Biharmonic(a0, alfa, beta, sii, siu, siuu, ail, aii, aiu,
@@ -1538,75 +1549,71 @@ def Solve_oe_Biharmonic_1D(bint odd,
 # This one is fastest by far
 @cython.cdivision(True)
 def Solve_Biharmonic_3D_n(np.int64_t axis,
-                          np.ndarray[T, ndim=3, mode='c'] fk,
-                          np.ndarray[T, ndim=3, mode='c'] uk,
-                          np.ndarray[real_t, ndim=4, mode='c'] u0,
-                          np.ndarray[real_t, ndim=4, mode='c'] u1,
-                          np.ndarray[real_t, ndim=4, mode='c'] u2,
-                          np.ndarray[real_t, ndim=4, mode='c'] l0,
-                          np.ndarray[real_t, ndim=4, mode='c'] l1,
-                          np.ndarray[real_t, ndim=4, mode='c'] a,
-                          np.ndarray[real_t, ndim=4, mode='c'] b,
+                          T[:, :, ::1] fk,
+                          T[:, :, ::1] uk,
+                          real_t[:, :, :, ::1] u0,
+                          real_t[:, :, :, ::1] u1,
+                          real_t[:, :, :, ::1] u2,
+                          real_t[:, :, :, ::1] l0,
+                          real_t[:, :, :, ::1] l1,
+                          real_t[:, :, :, ::1] a,
+                          real_t[:, :, :, ::1] b,
                           real_t a0):
 
     cdef:
         int i, j, k, kk, m, M, ke, ko, jj, je, jo
-        np.float_t ac
-        np.ndarray[T, ndim=2, mode='c'] s1
-        np.ndarray[T, ndim=2, mode='c'] s2
-        np.ndarray[T, ndim=2, mode='c'] o1
-        np.ndarray[T, ndim=2, mode='c'] o2
-        np.ndarray[T, ndim=3, mode='c'] y = np.zeros((fk.shape[0], fk.shape[1], fk.shape[2]), dtype=fk.dtype)
+        real_t ac
+        T[:, ::1] s1
+        T[:, ::1] s2
+        T[:, ::1] o1
+        T[:, ::1] o2
+        T[:, :, ::1] y = np.zeros((fk.shape[0], fk.shape[1], fk.shape[2]), dtype=np.asarray(fk).dtype)
 
     if axis == 0:
-        s1 = np.zeros((fk.shape[1], fk.shape[2]), dtype=fk.dtype)
-        s2 = np.zeros((fk.shape[1], fk.shape[2]), dtype=fk.dtype)
-        o1 = np.zeros((fk.shape[1], fk.shape[2]), dtype=fk.dtype)
-        o2 = np.zeros((fk.shape[1], fk.shape[2]), dtype=fk.dtype)
+        s1 = np.zeros((fk.shape[1], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        s2 = np.zeros((fk.shape[1], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        o1 = np.zeros((fk.shape[1], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        o2 = np.zeros((fk.shape[1], fk.shape[2]), dtype=np.asarray(fk).dtype)
 
         M = u0.shape[1]
-        for j in range(fk.shape[1]):
+        # One parallel region, where each thread sweeps its own lines j
+        for j in prange(fk.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(fk.shape[2]):
                 y[0, j, k] = fk[0, j, k]
                 y[1, j, k] = fk[1, j, k]
                 y[2, j, k] = fk[2, j, k] - l0[0, 0, j, k]*y[0, j, k]
                 y[3, j, k] = fk[3, j, k] - l0[1, 0, j, k]*y[1, j, k]
 
-        for i in xrange(2, M):
-            ke = 2*i
-            ko = ke+1
-            for j in range(fk.shape[1]):
+            for i in xrange(2, M):
+                ke = 2*i
+                ko = ke+1
                 for k in range(fk.shape[2]):
                     y[ko, j, k] = fk[ko, j, k] - l0[1, i-1, j, k]*y[ko-2, j, k] - l1[1, i-2, j, k]*y[ko-4, j, k]
                     y[ke, j, k] = fk[ke, j, k] - l0[0, i-1, j, k]*y[ke-2, j, k] - l1[0, i-2, j, k]*y[ke-4, j, k]
 
-        ke = 2*(M-1)
-        ko = ke+1
-        for j in range(fk.shape[1]):
+            ke = 2*(M-1)
+            ko = ke+1
             for k in range(fk.shape[2]):
                 uk[ke, j, k] = y[ke, j, k] / u0[0, M-1, j, k]
                 uk[ko, j, k] = y[ko, j, k] / u0[1, M-1, j, k]
 
-        ke = 2*(M-2)
-        ko = ke+1
-        for j in range(fk.shape[1]):
+            ke = 2*(M-2)
+            ko = ke+1
             for k in range(fk.shape[2]):
                 uk[ke, j, k] = (y[ke, j, k] - u1[0, M-2, j, k]*uk[ke+2, j, k]) / u0[0, M-2, j, k]
                 uk[ko, j, k] = (y[ko, j, k] - u1[1, M-2, j, k]*uk[ko+2, j, k]) / u0[1, M-2, j, k]
 
-        ke = 2*(M-3)
-        ko = ke+1
-        for j in range(fk.shape[1]):
+            ke = 2*(M-3)
+            ko = ke+1
             for k in range(fk.shape[2]):
                 uk[ke, j, k] = (y[ke, j, k] - u1[0, M-3, j, k]*uk[ke+2, j, k] - u2[0, M-3, j, k]*uk[ke+4, j, k]) / u0[0, M-3, j, k]
                 uk[ko, j, k] = (y[ko, j, k] - u1[1, M-3, j, k]*uk[ko+2, j, k] - u2[1, M-3, j, k]*uk[ko+4, j, k]) / u0[1, M-3, j, k]
 
-        for kk in xrange(M-4, -1, -1):
-            ke = 2*kk
-            ko = ke+1
-            je = ke+6
-            jo = ko+6
-            for j in range(fk.shape[1]):
+            for kk in xrange(M-4, -1, -1):
+                ke = 2*kk
+                ko = ke+1
+                je = ke+6
+                jo = ko+6
                 for k in range(fk.shape[2]):
                     ac = a0
                     s1[j, k] += uk[je, j, k]/(je+3.)
@@ -1617,13 +1624,13 @@ def Solve_Biharmonic_3D_n(np.int64_t axis,
                     uk[ko, j, k] = (y[ko, j, k] - u1[1, kk, j, k]*uk[ko+2, j, k] - u2[1, kk, j, k]*uk[ko+4, j, k] - a[1, kk, j, k]*ac*o1[j, k] - b[1, kk, j, k]*ac*o2[j, k]) / u0[1, kk, j, k]
 
     elif axis == 1:
-        s1 = np.zeros((fk.shape[0], fk.shape[2]), dtype=fk.dtype)
-        s2 = np.zeros((fk.shape[0], fk.shape[2]), dtype=fk.dtype)
-        o1 = np.zeros((fk.shape[0], fk.shape[2]), dtype=fk.dtype)
-        o2 = np.zeros((fk.shape[0], fk.shape[2]), dtype=fk.dtype)
+        s1 = np.zeros((fk.shape[0], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        s2 = np.zeros((fk.shape[0], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        o1 = np.zeros((fk.shape[0], fk.shape[2]), dtype=np.asarray(fk).dtype)
+        o2 = np.zeros((fk.shape[0], fk.shape[2]), dtype=np.asarray(fk).dtype)
 
         M = u0.shape[2]
-        for j in range(fk.shape[0]):
+        for j in prange(fk.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(fk.shape[2]):
                 y[j, 0, k] = fk[j, 0, k]
                 y[j, 1, k] = fk[j, 1, k]
@@ -1671,13 +1678,13 @@ def Solve_Biharmonic_3D_n(np.int64_t axis,
 
 
     elif axis == 2:
-        s1 = np.zeros((fk.shape[0], fk.shape[1]), dtype=fk.dtype)
-        s2 = np.zeros((fk.shape[0], fk.shape[1]), dtype=fk.dtype)
-        o1 = np.zeros((fk.shape[0], fk.shape[1]), dtype=fk.dtype)
-        o2 = np.zeros((fk.shape[0], fk.shape[1]), dtype=fk.dtype)
+        s1 = np.zeros((fk.shape[0], fk.shape[1]), dtype=np.asarray(fk).dtype)
+        s2 = np.zeros((fk.shape[0], fk.shape[1]), dtype=np.asarray(fk).dtype)
+        o1 = np.zeros((fk.shape[0], fk.shape[1]), dtype=np.asarray(fk).dtype)
+        o2 = np.zeros((fk.shape[0], fk.shape[1]), dtype=np.asarray(fk).dtype)
 
         M = u0.shape[3]
-        for j in range(fk.shape[0]):
+        for j in prange(fk.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for k in range(fk.shape[1]):
                 y[j, k, 0] = fk[j, k, 0]
                 y[j, k, 1] = fk[j, k, 1]
@@ -2458,7 +2465,7 @@ def Solve_Helmholtz_Biharmonic_3D_ptr(np.int64_t axis,
 
     strides = fk.strides[axis]/fk.itemsize
     if axis == 0:
-        for ii in range(d.shape[1]):
+        for ii in prange(d.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             for jj in range(d.shape[2]):
                 fk_ptr = &fk[0,ii,jj]
                 u_hat_ptr = &u_hat[0,ii,jj]
@@ -2472,7 +2479,7 @@ def Solve_Helmholtz_Biharmonic_3D_ptr(np.int64_t axis,
                                                   strides)
 
     elif axis == 1:
-        for ii in range(d.shape[0]):
+        for ii in prange(d.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for jj in range(d.shape[2]):
                 fk_ptr = &fk[ii,0,jj]
                 u_hat_ptr = &u_hat[ii,0,jj]
@@ -2486,7 +2493,7 @@ def Solve_Helmholtz_Biharmonic_3D_ptr(np.int64_t axis,
                                                   strides)
 
     elif axis == 2:
-        for ii in range(d.shape[0]):
+        for ii in prange(d.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             for jj in range(d.shape[1]):
                 fk_ptr = &fk[ii,jj,0]
                 u_hat_ptr = &u_hat[ii,jj,0]
@@ -2519,7 +2526,7 @@ def Solve_Helmholtz_Biharmonic_2D_ptr(np.int64_t axis,
 
     strides = fk.strides[axis]/fk.itemsize
     if axis == 0:
-        for ii in range(d.shape[1]):
+        for ii in prange(d.shape[1], nogil=True, schedule='static', num_threads=num_threads):
             fk_ptr = &fk[0,ii]
             u_hat_ptr = &u_hat[0,ii]
             d_ptr = &d[0,ii]
@@ -2532,7 +2539,7 @@ def Solve_Helmholtz_Biharmonic_2D_ptr(np.int64_t axis,
                                               strides)
 
     elif axis == 1:
-        for ii in range(d.shape[0]):
+        for ii in prange(d.shape[0], nogil=True, schedule='static', num_threads=num_threads):
             fk_ptr = &fk[ii,0]
             u_hat_ptr = &u_hat[ii,0]
             d_ptr = &d[ii,0]
@@ -1,3 +1,4 @@
+import os
 import numpy as np
 import numba as nb
 from .tdma import *
@@ -5,6 +6,11 @@ from .pdma import *
 from .helmholtz import *
 from .biharmonic import *
 from .chebyshev import *
+from .evaluate import *
+from .blas import *
+
+nb.set_num_threads(min(int(os.environ.get('SHENFUN_NUM_THREADS', 1)),
+                       nb.config.NUMBA_NUM_THREADS))
 
 @nb.jit(nopython=True, fastmath=True, cache=True)
 def outer2D(a, b, c, symmetric):
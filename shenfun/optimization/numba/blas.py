@@ -0,0 +1,53 @@
+import numpy as np
+import numba as nb
+
+__all__ = ['axpy', 'axpby']
+
+def _flat(a, x, y):
+    """Return coefficient a as flat array of the same size as x
+
+    Return None if the compiled kernels cannot be used, that is, if the
+    coefficient does not have the shape of x, if the arrays are not
+    contiguous, or if the datatypes are not supported.
+    """
+    if not (x.flags.c_contiguous and y.flags.c_contiguous):
+        return None
+    if x.dtype != y.dtype or x.dtype.char not in 'dD':
+        return None
+    a = np.asarray(a)
+    if a.dtype.char not in 'dD':
+        a = a.astype(complex if a.dtype.kind == 'c' else float)
+    if a.dtype.char == 'D' and y.dtype.char == 'd':
+        return None
+    if a.size == 1:
+        return np.lib.stride_tricks.as_strided(a.reshape(1), (x.size,), (0,))
+    if a.shape == x.shape and a.flags.c_contiguous:
+        return a.reshape(-1)
+    return None
+
+def axpy(a, x, y):
+    a0 = _flat(a, x, y)
+    if a0 is None:
+        y += a*x
+        return y
+    _axpy(a0, x.reshape(-1), y.reshape(-1))
+    return y
+
+def axpby(a, x, b, y, z):
+    a0 = _flat(a, x, z)
+    b0 = _flat(b, y, z)
+    if a0 is None or b0 is None or a0.dtype != b0.dtype or x.dtype != y.dtype:
+        z[:] = a*x + b*y
+        return z
+    _axpby(a0, x.reshape(-1), b0, y.reshape(-1), z.reshape(-1))
+    return z
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _axpy(a, x, y):
+    for i in range(x.shape[0]):
+        y[i] += a[i]*x[i]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _axpby(a, x, b, y, z):
+    for i in range(x.shape[0]):
+        z[i] = a[i]*x[i] + b[i]*y[i]
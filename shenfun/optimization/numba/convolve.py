@@ -0,0 +1,40 @@
+import numba as nb
+
+__all__ = ['convolve_1D', 'convolve_real_1D']
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def convolve_1D(u, v, uv, k):
+    N = u.shape[0]
+    for m in k:
+        for n in k:
+            p = m + n
+            um = u[m]
+            vn = v[n]
+            if N % 2 == 0:
+                if abs(m) == N//2:
+                    um = um*0.5
+                if abs(n) == N//2:
+                    vn = vn*0.5
+            uv[p] = uv[p] + um*vn
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def convolve_real_1D(u, v, uv, k):
+    N = uv.shape[0]-1
+    for m in k:
+        for n in k:
+            p = m + n
+            if p >= 0:
+                if m >= 0:
+                    um = u[m]
+                else:
+                    um = u[abs(m)].conjugate()
+                if n >= 0:
+                    vn = v[n]
+                else:
+                    vn = v[abs(n)].conjugate()
+                if N % 2 == 0:
+                    if abs(m) == N//2:
+                        um = u[abs(m)]*0.5
+                    if abs(n) == N//2:
+                        vn = v[abs(n)]*0.5
+                uv[p] = uv[p] + um*vn
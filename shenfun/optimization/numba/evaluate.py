@@ -0,0 +1,249 @@
+import numpy as np
+import numba as nb
+
+__all__ = ['clenshaw', 'nufft_interp', 'evaluate_2D', 'evaluate_3D',
+           'evaluate_lm_2D', 'evaluate_lm_3D']
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def clenshaw(x, c, a, b, g, output_array):
+    P, R = output_array.shape
+    N = c.shape[1]
+    shared = c.shape[0] == 1
+    b1 = np.zeros(R, dtype=output_array.dtype)
+    b2 = np.zeros(R, dtype=output_array.dtype)
+    for i in range(P):
+        q = 0 if shared else i
+        b1[:] = 0
+        b2[:] = 0
+        for n in range(N-1, -1, -1):
+            alpha = a[n]*x[i] + b[n]
+            if n < N-1:
+                for j in range(R):
+                    b0 = c[q, n, j] + alpha*b1[j] - g[n+1]*b2[j]
+                    b2[j] = b1[j]
+                    b1[j] = b0
+            else:
+                for j in range(R):
+                    b2[j] = b1[j]
+                    b1[j] = c[q, n, j]
+        for j in range(R):
+            output_array[i, j] = b1[j]
+    return output_array
+
+def nufft_interp(h, x, M, offset, tau, msp, output_array):
+    d = x.shape[0]
+    if d == 1:
+        _nufft_interp_1D(h, x, M, offset, tau, msp, output_array)
+    elif d == 2:
+        _nufft_interp_2D(h, x, M, offset, tau, msp, output_array)
+    else:
+        _nufft_interp_3D(h, x, M, offset, tau, msp, output_array)
+    return output_array
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _gaussian_stencil(x, M, offset, n, tau, msp, idx, w):
+    # Indices into the local grid, and Gaussian weights, of the stencil of x.
+    # Indices outside the local grid are set to -1.
+    h = 2*np.pi/M
+    m0 = int(np.floor(x/h))-msp+1
+    for s in range(2*msp):
+        m = m0+s
+        ii = m % M - offset
+        if ii >= 0 and ii < n:
+            idx[s] = ii
+            w[s] = np.exp(-(x-m*h)**2/(4*tau))
+        else:
+            idx[s] = -1
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _nufft_interp_1D(h, x, M, offset, tau, msp, output_array):
+    P, R = output_array.shape
+    S = 2*msp
+    i0 = np.zeros(S, dtype=np.int64)
+    w0 = np.zeros(S)
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for j in range(R):
+                output_array[p, j] += ws*h[ii, j]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _nufft_interp_2D(h, x, M, offset, tau, msp, output_array):
+    P, R = output_array.shape
+    S = 2*msp
+    i0 = np.zeros(S, dtype=np.int64)
+    i1 = np.zeros(S, dtype=np.int64)
+    w0 = np.zeros(S)
+    w1 = np.zeros(S)
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        _gaussian_stencil(x[1, p], M[1], offset[1], h.shape[1], tau[1], msp, i1, w1)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for t in range(S):
+                jj = i1[t]
+                if jj < 0:
+                    continue
+                wt = ws*w1[t]
+                for j in range(R):
+                    output_array[p, j] += wt*h[ii, jj, j]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def _nufft_interp_3D(h, x, M, offset, tau, msp, output_array):
+    P, R = output_array.shape
+    S = 2*msp
+    i0 = np.zeros(S, dtype=np.int64)
+    i1 = np.zeros(S, dtype=np.int64)
+    i2 = np.zeros(S, dtype=np.int64)
+    w0 = np.zeros(S)
+    w1 = np.zeros(S)
+    w2 = np.zeros(S)
+    for p in range(P):
+        _gaussian_stencil(x[0, p], M[0], offset[0], h.shape[0], tau[0], msp, i0, w0)
+        _gaussian_stencil(x[1, p], M[1], offset[1], h.shape[1], tau[1], msp, i1, w1)
+        _gaussian_stencil(x[2, p], M[2], offset[2], h.shape[2], tau[2], msp, i2, w2)
+        for s in range(S):
+            ii = i0[s]
+            if ii < 0:
+                continue
+            ws = w0[s]
+            for t in range(S):
+                jj = i1[t]
+                if jj < 0:
+                    continue
+                wt = ws*w1[t]
+                for u in range(S):
+                    kk = i2[u]
+                    if kk < 0:
+                        continue
+                    wu = wt*w2[u]
+                    for j in range(R):
+                        output_array[p, j] += wu*h[ii, jj, kk, j]
+
+def _r2c_scale(u, r2c, M, start):
+    """Return u with the R2C axis scaled for its missing conjugate modes"""
+    if r2c < 0:
+        return u
+    k = np.arange(start, start+u.shape[r2c])
+    sh = [1]*u.ndim
+    sh[r2c] = u.shape[r2c]
+    return u*np.where((k > 0) & (k < M), 2, 1).reshape(sh)
+
+def _add(b, out):
+    if np.isrealobj(b):
+        b += out.real
+    else:
+        b += out
+    return b
+
+def evaluate_2D(b, u, P, r2c, M, start):
+    u = _r2c_scale(u, r2c, M, start)
+    out = np.zeros(b.shape, dtype=np.result_type(u, *P))
+    _evaluate_2D(out, u, P[0], P[1])
+    return _add(b, out)
+
+def evaluate_3D(b, u, P, r2c, M, start):
+    u = _r2c_scale(u, r2c, M, start)
+    out = np.zeros(b.shape, dtype=np.result_type(u, *P))
+    _evaluate_3D(out, u, P[0], P[1], P[2])
+    return _add(b, out)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _evaluate_2D(out, u, P0, P1):
+    for i in nb.prange(out.shape[0]):
+        s = 0*out[i]
+        for k in range(u.shape[0]):
+            s1 = 0*out[i]
+            for l in range(u.shape[1]):
+                s1 += u[k, l]*P1[i, l]
+            s += P0[i, k]*s1
+        out[i] += s
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _evaluate_3D(out, u, P0, P1, P2):
+    for i in nb.prange(out.shape[0]):
+        s = 0*out[i]
+        for k in range(u.shape[0]):
+            s1 = 0*out[i]
+            for l in range(u.shape[1]):
+                s2 = 0*out[i]
+                for m in range(u.shape[2]):
+                    s2 += u[k, l, m]*P2[i, m]
+                s1 += P1[i, l]*s2
+            s += P0[i, k]*s1
+        out[i] += s
+
+def evaluate_lm_2D(bases, b, u, x0, x1, w0, w1, r2c, M, start):
+    x, w = (x0, x1), (w0, w1)
+    u = _r2c_scale(u, r2c, M, start)
+    out = np.zeros(b.shape, dtype=complex)
+    fourier = [base.family() == 'fourier' for base in bases]
+    if np.all(fourier):
+        _evaluate_lm_2D(out, u, x0, x1, w0, w1, np.ones(len(x0)))
+    else:
+        # One non-Fourier axis, evaluated one basis function at the time
+        axis = fourier.index(False)
+        f = 1-axis
+        P = np.zeros(len(x[axis]))
+        for k in range(u.shape[axis]):
+            P = bases[axis].evaluate_basis(x[axis], k, P)
+            _evaluate_lm_1D(out, np.take(u, k, axis), x[f], w[f], P)
+    return _add(b, out)
+
+def evaluate_lm_3D(bases, b, u, x0, x1, x2, w0, w1, w2, r2c, M, start):
+    x, w = (x0, x1, x2), (w0, w1, w2)
+    u = _r2c_scale(u, r2c, M, start)
+    out = np.zeros(b.shape, dtype=complex)
+    fourier = [base.family() == 'fourier' for base in bases]
+    if np.all(fourier):
+        _evaluate_lm_3D(out, u, x0, x1, x2, w0, w1, w2)
+    else:
+        # One non-Fourier axis, evaluated one basis function at the time
+        axis = fourier.index(False)
+        f0, f1 = [i for i in range(3) if i != axis]
+        P = np.zeros(len(x[axis]))
+        for k in range(u.shape[axis]):
+            P = bases[axis].evaluate_basis(x[axis], k, P)
+            _evaluate_lm_2D(out, np.ascontiguousarray(np.take(u, k, axis)),
+                            x[f0], x[f1], w[f0], w[f1], P)
+    return _add(b, out)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _evaluate_lm_1D(out, u, x0, w0, P):
+    for i in nb.prange(out.shape[0]):
+        s = 0j
+        for k in range(u.shape[0]):
+            s += u[k]*np.exp(1j*w0[k]*x0[i])
+        out[i] += P[i]*s
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _evaluate_lm_2D(out, u, x0, x1, w0, w1, P):
+    for i in nb.prange(out.shape[0]):
+        s = 0j
+        for k in range(u.shape[0]):
+            s1 = 0j
+            for l in range(u.shape[1]):
+                s1 += u[k, l]*np.exp(1j*w1[l]*x1[i])
+            s += s1*np.exp(1j*w0[k]*x0[i])
+        out[i] += P[i]*s
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _evaluate_lm_3D(out, u, x0, x1, x2, w0, w1, w2):
+    for i in nb.prange(out.shape[0]):
+        s = 0j
+        for k in range(u.shape[0]):
+            s1 = 0j
+            for l in range(u.shape[1]):
+                s2 = 0j
+                for m in range(u.shape[2]):
+                    s2 += u[k, l, m]*np.exp(1j*w2[m]*x2[i])
+                s1 += s2*np.exp(1j*w1[l]*x1[i])
+            s += s1*np.exp(1j*w0[k]*x0[i])
+        out[i] += s
@@ -0,0 +1,143 @@
+"""
+Numba versions of the linear algebra functions in the Cython module la
+"""
+import numba as nb
+from .tdma import *
+from .pdma import *
+from .helmholtz import *
+from .biharmonic import *
+
+def LU_Helmholtz_Biharmonic_1D(A, B, A_scale, B_scale, l2, l1, d, u1, u2):
+    l2[:] = B_scale*B.get(-4)
+    l1[:] = A_scale*A.get(-2) + B_scale*B.get(-2)
+    d[:] = A_scale*A[0] + B_scale*B[0]
+    u1[:] = A_scale*A[2] + B_scale*B[2]
+    u2[:] = B_scale*B[4]
+    PDMA_LU(l2, l1, d, u1, u2, d.shape[0])
+
+def LU_Helmholtz_Biharmonic_3D(A, B, axis, A_scale, B_scale, l2, l1, d, u1, u2):
+    diags = (B.get(-4), A.get(-2), B.get(-2), A[0], B[0], A[2], B[2], B[4])
+    _LU_Helmholtz_Biharmonic_3D(*diags, axis, A_scale, B_scale, l2, l1, d, u1, u2)
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def PDMA_LU(l2, l1, d, u1, u2, n):
+    k = 2
+    for i in range(n-2*k):
+        lam = l1[i]/d[i]
+        d[i+k] -= lam*u1[i]
+        u1[i+k] -= lam*u2[i]
+        l1[i] = lam
+        lam = l2[i]/d[i]
+        l1[i+k] -= lam*u1[i]
+        d[i+2*k] -= lam*u2[i]
+        l2[i] = lam
+
+    i = n-4
+    lam = l1[i]/d[i]
+    d[i+k] -= lam*u1[i]
+    l1[i] = lam
+    i = n-3
+    lam = l1[i]/d[i]
+    d[i+k] -= lam*u1[i]
+    l1[i] = lam
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def LU_Helmholtz_Biharmonic_line(B_m4, A_m2, B_m2, A_0, B_0, A_2, B_2, B_4,
+                                 A_scale, B_scale, l2, l1, d, u1, u2):
+    n = A_0.shape[0]
+    for i in range(B_m4.shape[0]):
+        l2[i] = B_scale*B_m4[i]
+        u2[i] = B_scale*B_4[i]
+    for i in range(A_m2.shape[0]):
+        l1[i] = A_scale*A_m2[i] + B_scale*B_m2[i]
+        u1[i] = A_scale*A_2[i] + B_scale*B_2[i]
+    for i in range(n):
+        d[i] = A_scale*A_0[i] + B_scale*B_0[i]
+    PDMA_LU(l2, l1, d, u1, u2, n)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def _LU_Helmholtz_Biharmonic_3D(B_m4, A_m2, B_m2, A_0, B_0, A_2, B_2, B_4,
+                                axis, A_scale, B_scale, l2, l1, d, u1, u2):
+    if axis == 0:
+        for j in nb.prange(d.shape[1]):
+            for k in range(d.shape[2]):
+                LU_Helmholtz_Biharmonic_line(B_m4, A_m2, B_m2, A_0, B_0, A_2, B_2, B_4,
+                                             A_scale[0, j, k], B_scale[0, j, k],
+                                             l2[:, j, k], l1[:, j, k], d[:, j, k],
+                                             u1[:, j, k], u2[:, j, k])
+    elif axis == 1:
+        for i in nb.prange(d.shape[0]):
+            for k in range(d.shape[2]):
+                LU_Helmholtz_Biharmonic_line(B_m4, A_m2, B_m2, A_0, B_0, A_2, B_2, B_4,
+                                             A_scale[i, 0, k], B_scale[i, 0, k],
+                                             l2[i, :, k], l1[i, :, k], d[i, :, k],
+                                             u1[i, :, k], u2[i, :, k])
+    elif axis == 2:
+        for i in nb.prange(d.shape[0]):
+            for j in range(d.shape[1]):
+                LU_Helmholtz_Biharmonic_line(B_m4, A_m2, B_m2, A_0, B_0, A_2, B_2, B_4,
+                                             A_scale[i, j, 0], B_scale[i, j, 0],
+                                             l2[i, j], l1[i, j], d[i, j],
+                                             u1[i, j], u2[i, j])
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def Solve_Helmholtz_Biharmonic_line(fk, u_hat, l2, l1, d, u1, u2, n):
+    for k in range(n):
+        u_hat[k] = fk[k]
+
+    u_hat[2] -= l1[0]*u_hat[0]
+    u_hat[3] -= l1[1]*u_hat[1]
+    for k in range(4, n):
+        u_hat[k] -= (l1[k-2]*u_hat[k-2] + l2[k-4]*u_hat[k-4])
+
+    u_hat[n-1] /= d[n-1]
+    u_hat[n-2] /= d[n-2]
+    u_hat[n-3] /= d[n-3]
+    u_hat[n-3] -= u1[n-3]*u_hat[n-1]/d[n-3]
+    u_hat[n-4] /= d[n-4]
+    u_hat[n-4] -= u1[n-4]*u_hat[n-2]/d[n-4]
+    for k in range(n-5, -1, -1):
+        u_hat[k] /= d[k]
+        u_hat[k] -= (u1[k]*u_hat[k+2]/d[k] + u2[k]*u_hat[k+4]/d[k])
+
+def Solve_Helmholtz_Biharmonic_1D(fk, u_hat, l2, l1, d, u1, u2):
+    bc = fk.copy()
+    Solve_Helmholtz_Biharmonic_line(fk, bc, l2, l1, d, u1, u2, fk.shape[0]-4)
+    u_hat[:] = bc
+
+def Solve_Helmholtz_Biharmonic_1D_p(fk, u_hat, l2, l1, d, u1, u2):
+    Solve_Helmholtz_Biharmonic_line(fk, u_hat, l2, l1, d, u1, u2, fk.shape[0]-4)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Solve_Helmholtz_Biharmonic_2D_ptr(axis, fk, u_hat, l2, l1, d, u1, u2):
+    n = d.shape[axis]-4
+    if axis == 0:
+        for j in nb.prange(d.shape[1]):
+            Solve_Helmholtz_Biharmonic_line(fk[:, j], u_hat[:, j], l2[:, j], l1[:, j],
+                                            d[:, j], u1[:, j], u2[:, j], n)
+    elif axis == 1:
+        for i in nb.prange(d.shape[0]):
+            Solve_Helmholtz_Biharmonic_line(fk[i], u_hat[i], l2[i], l1[i],
+                                            d[i], u1[i], u2[i], n)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Solve_Helmholtz_Biharmonic_3D_ptr(axis, fk, u_hat, l2, l1, d, u1, u2):
+    n = d.shape[axis]-4
+    if axis == 0:
+        for j in nb.prange(d.shape[1]):
+            for k in range(d.shape[2]):
+                Solve_Helmholtz_Biharmonic_line(fk[:, j, k], u_hat[:, j, k], l2[:, j, k],
+                                                l1[:, j, k], d[:, j, k], u1[:, j, k],
+                                                u2[:, j, k], n)
+    elif axis == 1:
+        for i in nb.prange(d.shape[0]):
+            for k in range(d.shape[2]):
+                Solve_Helmholtz_Biharmonic_line(fk[i, :, k], u_hat[i, :, k], l2[i, :, k],
+                                                l1[i, :, k], d[i, :, k], u1[i, :, k],
+                                                u2[i, :, k], n)
+    elif axis == 2:
+        for i in nb.prange(d.shape[0]):
+            for j in range(d.shape[1]):
+                Solve_Helmholtz_Biharmonic_line(fk[i, j], u_hat[i, j], l2[i, j],
+                                                l1[i, j], d[i, j], u1[i, j],
+                                                u2[i, j], n)
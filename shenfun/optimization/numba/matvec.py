@@ -0,0 +1,625 @@
+"""
+Numba versions of the matrix-vector products in the Cython module Matvec
+
+The 2D and 3D products loop over independent lines of the arrays, and the
+lines are shared between threads using ``prange``.
+"""
+import numba as nb
+import numpy as np
+from .helmholtz import Helmholtz_matvec
+from .biharmonic import Biharmonic_matvec
+
+M_PI = np.pi
+
+__all__ = ['CDN_matvec1D_ptr', 'CDN_matvec2D_ptr', 'CDN_matvec3D_ptr',
+           'BDN_matvec1D_ptr', 'BDN_matvec2D_ptr', 'BDN_matvec3D_ptr',
+           'CDD_matvec1D_ptr', 'CDD_matvec2D_ptr', 'CDD_matvec3D_ptr',
+           'SBBmat_matvec', 'SBB_matvec2D_ptr', 'SBB_matvec3D_ptr',
+           'ADDmat_matvec', 'ADD_matvec', 'ADD_matvec2D_ptr', 'ADD_matvec3D_ptr',
+           'ATT_matvec', 'ATT_matvec2D_ptr', 'ATT_matvec3D_ptr',
+           'GLL_matvec', 'GLL_matvec2D_ptr', 'GLL_matvec3D_ptr',
+           'CLL_matvec', 'CLL_matvec2D_ptr', 'CLL_matvec3D_ptr',
+           'CTT_matvec', 'CTT_matvec2D_ptr', 'CTT_matvec3D_ptr',
+           'Tridiagonal_matvec', 'Tridiagonal_matvec2D_ptr', 'Tridiagonal_matvec3D_ptr',
+           'Pentadiagonal_matvec', 'Pentadiagonal_matvec2D_ptr', 'Pentadiagonal_matvec3D_ptr',
+           'CBD_matvec', 'CBD_matvec2D_ptr', 'CBD_matvec3D_ptr',
+           'CDB_matvec', 'CDB_matvec2D_ptr', 'CDB_matvec3D_ptr',
+           'BBD_matvec1D_ptr', 'BBD_matvec2D_ptr', 'BBD_matvec3D_ptr',
+           'Helmholtz_matvec', 'Biharmonic_matvec']
+
+# Products along one line
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def CDN_matvec(v, b, ld, ud, N):
+    b[0] = ud[0]*v[1]
+    b[N-1] = ld[N-2]*v[N-2]
+    for i in range(1, N-1):
+        b[i] = ud[i]*v[i+1] + ld[i-1]*v[i-1]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def BDN_matvec(v, b, ld, dd, ud, N):
+    b[0] = ud*v[2] + dd[0]*v[0]
+    b[1] = ud*v[3] + dd[1]*v[1]
+    b[N-2] = ld[N-4]*v[N-4] + dd[N-2]*v[N-2]
+    b[N-1] = ld[N-3]*v[N-3] + dd[N-1]*v[N-1]
+    for i in range(2, N-2):
+        b[i] = ud*v[i+2] + dd[i]*v[i] + ld[i-2]*v[i-2]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def SBB_matvec(v, b, dd, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    o1 = 0.0*v[0]
+    o2 = 0.0*v[0]
+    j = N-1
+    b[j] = dd[j]*v[j]
+    b[j-1] = dd[j-1]*v[j-1]
+    for k in range(N-3, -1, -1):
+        j = k+2
+        p = k*dd[k]/(k+1)
+        r = 24*(k+1)*(k+2)*M_PI
+        d = v[j]/(j+3.)
+        if k % 2 == 0:
+            s1 += d
+            s2 += (j+2)*(j+2)*d
+            b[k] = dd[k]*v[k] + p*s1 + r*s2
+        else:
+            o1 += d
+            o2 += (j+2)*(j+2)*d
+            b[k] = dd[k]*v[k] + p*o1 + r*o2
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def ADD_matvec1D(v, b, dd, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    k = N-1
+    b[k] = dd[k]*v[k]
+    b[k-1] = dd[k-1]*v[k-1]
+    for k in range(N-3, -1, -1):
+        j = k+2
+        p = -4*(k+1)*M_PI
+        if j % 2 == 0:
+            s1 += v[j]
+            b[k] = dd[k]*v[k] + p*s1
+        else:
+            s2 += v[j]
+            b[k] = dd[k]*v[k] + p*s2
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def ATT_matvec1D(v, b, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    s3 = 0.0*v[0]
+    s4 = 0.0*v[0]
+    b[N-1] = 0
+    b[N-2] = 0
+    for k in range(N-3, -1, -1):
+        j = k+2
+        p0 = M_PI/2
+        p1 = M_PI/2*k**2
+        if j % 2 == 0:
+            s1 += j*v[j]
+            s3 += j**3*v[j]
+            b[k] = p0*s3 - p1*s1
+        else:
+            s2 += j*v[j]
+            s4 += j**3*v[j]
+            b[k] = p0*s4 - p1*s2
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def GLL_matvec1D(v, b, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    s3 = 0.0*v[0]
+    s4 = 0.0*v[0]
+    b[N-1] = 0
+    b[N-2] = 0
+    for k in range(N-3, -1, -1):
+        j = k+2
+        p0 = 2*(k+0.5)/(2*k+1)
+        p1 = p0*k*(k+1)
+        if j % 2 == 0:
+            s1 += j*(j+1)*v[j]
+            s3 += v[j]
+            b[k] = p0*s1 - p1*s3
+        else:
+            s2 += j*(j+1)*v[j]
+            s4 += v[j]
+            b[k] = p0*s2 - p1*s4
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def CLL_matvec1D(v, b, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    b[N-1] = 0
+    for k in range(N-2, -1, -1):
+        j = k+1
+        if j % 2 == 0:
+            s1 += v[j]
+            b[k] = 2*s1
+        else:
+            s2 += v[j]
+            b[k] = 2*s2
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def CTT_matvec1D(v, b, N):
+    s1 = 0.0*v[0]
+    s2 = 0.0*v[0]
+    b[N-1] = 0
+    for k in range(N-2, -1, -1):
+        j = k+1
+        if j % 2 == 0:
+            s1 += (k+1)*v[j]
+            b[k] = M_PI*s1
+        else:
+            s2 += (k+1)*v[j]
+            b[k] = M_PI*s2
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def Tridiagonal_matvec1D(v, b, ld, dd, ud, N):
+    b[0] = dd[0]*v[0] + ud[0]*v[2]
+    b[1] = dd[1]*v[1] + ud[1]*v[3]
+    for i in range(2, N-2):
+        b[i] = ld[i-2]*v[i-2] + dd[i]*v[i] + ud[i]*v[i+2]
+    i = N-2
+    b[i] = ld[i-2]*v[i-2] + dd[i]*v[i]
+    i = N-1
+    b[i] = ld[i-2]*v[i-2] + dd[i]*v[i]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def Pentadiagonal_matvec1D(v, b, ldd, ld, dd, ud, udd, N):
+    b[0] = dd[0]*v[0] + ud[0]*v[2] + udd[0]*v[4]
+    b[1] = dd[1]*v[1] + ud[1]*v[3] + udd[1]*v[5]
+    b[2] = ld[0]*v[0] + dd[2]*v[2] + ud[2]*v[4] + udd[2]*v[6]
+    b[3] = ld[1]*v[1] + dd[3]*v[3] + ud[3]*v[5] + udd[3]*v[7]
+    for i in range(4, N-4):
+        b[i] = ldd[i-4]*v[i-4] + ld[i-2]*v[i-2] + dd[i]*v[i] + ud[i]*v[i+2] + udd[i]*v[i+4]
+    i = N-4
+    b[i] = ldd[i-4]*v[i-4] + ld[i-2]*v[i-2] + dd[i]*v[i] + ud[i]*v[i+2]
+    i = N-3
+    b[i] = ldd[i-4]*v[i-4] + ld[i-2]*v[i-2] + dd[i]*v[i] + ud[i]*v[i+2]
+    i = N-2
+    b[i] = ldd[i-4]*v[i-4] + ld[i-2]*v[i-2] + dd[i]*v[i]
+    i = N-1
+    b[i] = ldd[i-4]*v[i-4] + ld[i-2]*v[i-2] + dd[i]*v[i]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def CBD_matvec1D(v, b, ld, ud, udd, N):
+    b[0] = ud[0]*v[1] + udd[0]*v[3]
+    for i in range(1, N):
+        b[i] = ld[i-1]*v[i-1] + ud[i]*v[i+1] + udd[i]*v[i+3]
+    i = N
+    b[i] = ld[i-1]*v[i-1] + ud[i]*v[i+1]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def CDB_matvec1D(v, b, lld, ld, ud, N):
+    b[0] = ud[0]*v[1]
+    for k in range(1, 3):
+        b[k] = ld[k-1]*v[k-1] + ud[k]*v[k+1]
+    for k in range(3, N):
+        b[k] = lld[k-3]*v[k-3] + ld[k-1]*v[k-1] + ud[k]*v[k+1]
+    for k in range(N, N+2):
+        b[k] = lld[k-3]*v[k-3] + ld[k-1]*v[k-1]
+    b[N+2] = lld[N-1]*v[N-1]
+
+@nb.jit(nopython=True, fastmath=True, cache=True)
+def BBD_matvec(v, b, ld, dd, ud, uud, N):
+    b[0] = dd[0]*v[0] + ud[0]*v[2] + uud[0]*v[4]
+    b[1] = dd[1]*v[1] + ud[1]*v[3] + uud[1]*v[5]
+    for k in range(2, N):
+        b[k] = ld*v[k-2] + dd[k]*v[k] + ud[k]*v[k+2] + uud[k]*v[k+4]
+    for k in range(N, N+2):
+        b[k] = ld*v[k-2] + dd[k]*v[k] + ud[k]*v[k+2]
+
+# 1D products
+
+def CDN_matvec1D_ptr(v, b, ld, ud):
+    CDN_matvec(v, b, ld, ud, v.shape[0]-2)
+
+def BDN_matvec1D_ptr(v, b, ld, dd, ud):
+    BDN_matvec(v, b, ld, dd, ud, v.shape[0]-2)
+
+def CDD_matvec1D_ptr(v, b, ld, ud):
+    CDN_matvec(v, b, ld, ud, ud.shape[0]+1)
+
+def SBBmat_matvec(v, b, dd):
+    SBB_matvec(v, b, dd, v.shape[0]-4)
+
+def ADDmat_matvec(v, b, dd):
+    ADD_matvec1D(v, b, dd, v.shape[0]-2)
+
+def ADD_matvec(v, b, dd):
+    ADD_matvec1D(v, b, dd, dd.shape[0])
+
+def ATT_matvec(v, b):
+    ATT_matvec1D(v, b, v.shape[0])
+
+def GLL_matvec(v, b):
+    GLL_matvec1D(v, b, v.shape[0])
+
+def CLL_matvec(v, b):
+    CLL_matvec1D(v, b, v.shape[0])
+
+def CTT_matvec(v, b):
+    CTT_matvec1D(v, b, v.shape[0])
+
+def Tridiagonal_matvec(v, b, ld, dd, ud):
+    Tridiagonal_matvec1D(v, b, ld, dd, ud, dd.shape[0])
+
+def Pentadiagonal_matvec(v, b, ldd, ld, dd, ud, udd):
+    Pentadiagonal_matvec1D(v, b, ldd, ld, dd, ud, udd, dd.shape[0])
+
+def CBD_matvec(v, b, ld, ud, udd):
+    CBD_matvec1D(v, b, ld, ud, udd, udd.shape[0])
+
+def CDB_matvec(v, b, lld, ld, ud):
+    CDB_matvec1D(v, b, lld, ld, ud, ud.shape[0])
+
+def BBD_matvec1D_ptr(v, b, ld, dd, ud, uud):
+    BBD_matvec(v, b, ld, dd, ud, uud, uud.shape[0])
+
+# 2D and 3D products
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDN_matvec2D_ptr(v, b, ld, ud, axis):
+    N = v.shape[axis]-2
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CDN_matvec(v[:, j], b[:, j], ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CDN_matvec(v[i], b[i], ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDN_matvec3D_ptr(v, b, ld, ud, axis):
+    N = v.shape[axis]-2
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CDN_matvec(v[:, j, k], b[:, j, k], ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CDN_matvec(v[i, :, k], b[i, :, k], ld, ud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CDN_matvec(v[i, j], b[i, j], ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def BDN_matvec2D_ptr(v, b, ld, dd, ud, axis):
+    N = v.shape[axis]-2
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            BDN_matvec(v[:, j], b[:, j], ld, dd, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            BDN_matvec(v[i], b[i], ld, dd, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def BDN_matvec3D_ptr(v, b, ld, dd, ud, axis):
+    N = v.shape[axis]-2
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                BDN_matvec(v[:, j, k], b[:, j, k], ld, dd, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                BDN_matvec(v[i, :, k], b[i, :, k], ld, dd, ud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                BDN_matvec(v[i, j], b[i, j], ld, dd, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDD_matvec2D_ptr(v, b, ld, ud, axis):
+    N = ud.shape[0]+1
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CDN_matvec(v[:, j], b[:, j], ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CDN_matvec(v[i], b[i], ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDD_matvec3D_ptr(v, b, ld, ud, axis):
+    N = ud.shape[0]+1
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CDN_matvec(v[:, j, k], b[:, j, k], ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CDN_matvec(v[i, :, k], b[i, :, k], ld, ud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CDN_matvec(v[i, j], b[i, j], ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def SBB_matvec2D_ptr(v, b, dd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            SBB_matvec(v[:, j], b[:, j], dd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            SBB_matvec(v[i], b[i], dd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def SBB_matvec3D_ptr(v, b, dd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                SBB_matvec(v[:, j, k], b[:, j, k], dd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                SBB_matvec(v[i, :, k], b[i, :, k], dd, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                SBB_matvec(v[i, j], b[i, j], dd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def ADD_matvec2D_ptr(v, b, dd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            ADD_matvec1D(v[:, j], b[:, j], dd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            ADD_matvec1D(v[i], b[i], dd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def ADD_matvec3D_ptr(v, b, dd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                ADD_matvec1D(v[:, j, k], b[:, j, k], dd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                ADD_matvec1D(v[i, :, k], b[i, :, k], dd, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                ADD_matvec1D(v[i, j], b[i, j], dd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def ATT_matvec2D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            ATT_matvec1D(v[:, j], b[:, j], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            ATT_matvec1D(v[i], b[i], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def ATT_matvec3D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                ATT_matvec1D(v[:, j, k], b[:, j, k], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                ATT_matvec1D(v[i, :, k], b[i, :, k], N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                ATT_matvec1D(v[i, j], b[i, j], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def GLL_matvec2D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            GLL_matvec1D(v[:, j], b[:, j], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            GLL_matvec1D(v[i], b[i], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def GLL_matvec3D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                GLL_matvec1D(v[:, j, k], b[:, j, k], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                GLL_matvec1D(v[i, :, k], b[i, :, k], N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                GLL_matvec1D(v[i, j], b[i, j], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CLL_matvec2D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CLL_matvec1D(v[:, j], b[:, j], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CLL_matvec1D(v[i], b[i], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CLL_matvec3D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CLL_matvec1D(v[:, j, k], b[:, j, k], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CLL_matvec1D(v[i, :, k], b[i, :, k], N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CLL_matvec1D(v[i, j], b[i, j], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CTT_matvec2D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CTT_matvec1D(v[:, j], b[:, j], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CTT_matvec1D(v[i], b[i], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CTT_matvec3D_ptr(v, b, axis):
+    N = v.shape[axis]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CTT_matvec1D(v[:, j, k], b[:, j, k], N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CTT_matvec1D(v[i, :, k], b[i, :, k], N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CTT_matvec1D(v[i, j], b[i, j], N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Tridiagonal_matvec2D_ptr(v, b, ld, dd, ud, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            Tridiagonal_matvec1D(v[:, j], b[:, j], ld, dd, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            Tridiagonal_matvec1D(v[i], b[i], ld, dd, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Tridiagonal_matvec3D_ptr(v, b, ld, dd, ud, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                Tridiagonal_matvec1D(v[:, j, k], b[:, j, k], ld, dd, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                Tridiagonal_matvec1D(v[i, :, k], b[i, :, k], ld, dd, ud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                Tridiagonal_matvec1D(v[i, j], b[i, j], ld, dd, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Pentadiagonal_matvec2D_ptr(v, b, ldd, ld, dd, ud, udd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            Pentadiagonal_matvec1D(v[:, j], b[:, j], ldd, ld, dd, ud, udd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            Pentadiagonal_matvec1D(v[i], b[i], ldd, ld, dd, ud, udd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def Pentadiagonal_matvec3D_ptr(v, b, ldd, ld, dd, ud, udd, axis):
+    N = dd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                Pentadiagonal_matvec1D(v[:, j, k], b[:, j, k], ldd, ld, dd, ud, udd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                Pentadiagonal_matvec1D(v[i, :, k], b[i, :, k], ldd, ld, dd, ud, udd, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                Pentadiagonal_matvec1D(v[i, j], b[i, j], ldd, ld, dd, ud, udd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CBD_matvec2D_ptr(v, b, ld, ud, udd, axis):
+    N = udd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CBD_matvec1D(v[:, j], b[:, j], ld, ud, udd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CBD_matvec1D(v[i], b[i], ld, ud, udd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CBD_matvec3D_ptr(v, b, ld, ud, udd, axis):
+    N = udd.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CBD_matvec1D(v[:, j, k], b[:, j, k], ld, ud, udd, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CBD_matvec1D(v[i, :, k], b[i, :, k], ld, ud, udd, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CBD_matvec1D(v[i, j], b[i, j], ld, ud, udd, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDB_matvec2D_ptr(v, b, lld, ld, ud, axis):
+    N = ud.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            CDB_matvec1D(v[:, j], b[:, j], lld, ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            CDB_matvec1D(v[i], b[i], lld, ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def CDB_matvec3D_ptr(v, b, lld, ld, ud, axis):
+    N = ud.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                CDB_matvec1D(v[:, j, k], b[:, j, k], lld, ld, ud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                CDB_matvec1D(v[i, :, k], b[i, :, k], lld, ld, ud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                CDB_matvec1D(v[i, j], b[i, j], lld, ld, ud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def BBD_matvec2D_ptr(v, b, ld, dd, ud, uud, axis):
+    N = uud.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            BBD_matvec(v[:, j], b[:, j], ld, dd, ud, uud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            BBD_matvec(v[i], b[i], ld, dd, ud, uud, N)
+
+@nb.jit(nopython=True, fastmath=True, cache=True, parallel=True)
+def BBD_matvec3D_ptr(v, b, ld, dd, ud, uud, axis):
+    N = uud.shape[0]
+    if axis == 0:
+        for j in nb.prange(v.shape[1]):
+            for k in range(v.shape[2]):
+                BBD_matvec(v[:, j, k], b[:, j, k], ld, dd, ud, uud, N)
+    elif axis == 1:
+        for i in nb.prange(v.shape[0]):
+            for k in range(v.shape[2]):
+                BBD_matvec(v[i, :, k], b[i, :, k], ld, dd, ud, uud, N)
+    elif axis == 2:
+        for i in nb.prange(v.shape[0]):
+            for j in range(v.shape[1]):
+                BBD_matvec(v[i, j], b[i, j], ld, dd, ud, uud, N)
@@ -19,9 +19,11 @@ import importlib
 from numbers import Number
 import sympy as sp
 import numpy as np
+from mpmath import mp
 from mpi4py_fft import fftw
-from .utilities import CachedArrayDict, split
+from .utilities import CachedArrayDict, split, clenshaw
 from .coordinates import Coordinates
+from .optimization import autotune
 work = CachedArrayDict()
 
 class SpectralBase:
@@ -44,6 +46,7 @@ class SpectralBase:
             self.padding_factor = np.floor(N*padding_factor)/N if N > 0 else 1
         self.dealias_direct = dealias_direct
         self._mass = None         # Mass matrix (if needed)
+        self._measured_weights = {} # Cached weights of get_measured_weights
         self._dtype = dtype
         self._M = 1.0             # Normalization factor
         self._xfftn_fwd = None    # external forward transform function
@@ -55,6 +58,7 @@ class SpectralBase:
         self.si = islicedict()
         self.sl = slicedict()
         self._tensorproductspace = None     # link if belonging to TensorProductSpace
+        self._uniform_matrix = None   # cached basis on uniform mesh
 
     def points_and_weights(self, N=None, map_true_domain=False, weighted=True, **kw):
         r"""Return points and weights of quadrature for weighted integral
@@ -152,10 +156,9 @@ class SpectralBase:
         x = self.mesh(uniform=uniform)
         if self.coors.is_cartesian:
             return x
-        psi = self.coors.psi
         xx = []
         for rvi in self.coors.rv:
-            xx.append(sp.lambdify(psi, rvi)(x))
+            xx.append(self.coors.lambdify(rvi)(x))
         return xx
 
     def wavenumbers(self, bcast=True, **kw):
@@ -204,7 +207,7 @@ class SpectralBase:
         s[self.axis] = slice(None)
         return x[tuple(s)]
 
-    def scalar_product(self, input_array=None, output_array=None, fast_transform=True):
+    def scalar_product(self, input_array=None, output_array=None, fast_transform=None):
         """Compute weighted scalar product
 
         Parameters
@@ -213,9 +216,10 @@ class SpectralBase:
                 Function values on quadrature mesh
             output_array : array, optional
                 Expansion coefficients
-            fast_transform : bool, optional
+            fast_transform : bool or None, optional
                 If True use fast transforms, if False use
-                Vandermonde type
+                Vandermonde type. If None, then use the fastest of the
+                two if autotuning is enabled, and fast transforms otherwise
 
         Note
         ----
@@ -223,10 +227,12 @@ class SpectralBase:
         as planned with self.plan
 
         """
-        if input_array is not None:
-            self.scalar_product.input_array[...] = input_array
+        # Measure and copy input in one pass
+        array = self.scalar_product.input_array
+        self.get_measured_array(array if input_array is None else input_array, out=array)
 
-        self.scalar_product._input_array = self.get_measured_array(self.scalar_product._input_array)
+        if fast_transform is None:
+            fast_transform = self.get_fast_transform('scalar_product') if autotune.enabled else True
 
         self._evaluate_scalar_product(fast_transform=fast_transform)
 
@@ -235,7 +241,7 @@ class SpectralBase:
             return output_array
         return self.scalar_product.output_array
 
-    def forward(self, input_array=None, output_array=None, fast_transform=True):
+    def forward(self, input_array=None, output_array=None, fast_transform=None):
         """Compute forward transform
 
         Parameters
@@ -244,9 +250,10 @@ class SpectralBase:
                 Function values on quadrature mesh
             output_array : array, optional
                 Expansion coefficients
-            fast_transform : bool, optional
+            fast_transform : bool or None, optional
                 If True use fast transforms, if False use
-                Vandermonde type
+                Vandermonde type. If None, then use the fastest of the
+                two if autotuning is enabled, and fast transforms otherwise
 
         Note
         ----
@@ -265,7 +272,7 @@ class SpectralBase:
             return output_array
         return self.forward.output_array
 
-    def backward(self, input_array=None, output_array=None, fast_transform=True, kind='normal'):
+    def backward(self, input_array=None, output_array=None, fast_transform=None, kind='normal'):
         """Compute backward (inverse) transform
 
         Parameters
@@ -274,9 +281,11 @@ class SpectralBase:
                 Expansion coefficients
             output_array : array, optional
                 Function values on quadrature mesh
-            fast_transform : bool, optional
+            fast_transform : bool or None, optional
                 If True use fast transforms (if implemented), if
-                False use Vandermonde type
+                False use Vandermonde type. If None, then use the fastest
+                of the two if autotuning is enabled, and fast transforms
+                otherwise
 
         Note
         ----
@@ -290,17 +299,22 @@ class SpectralBase:
         self._padding_backward(self.backward.input_array,
                                self.backward.tmp_array)
 
+        if kind == 'uniform' and self.family() == 'fourier':
+            kind = 'normal' # The uniform mesh is the quadrature mesh
+
         if kind == 'normal':
+            if fast_transform is None:
+                fast_transform = self.get_fast_transform('backward') if autotune.enabled else True
             self.evaluate_expansion_all(self.backward.tmp_array,
                                         self.backward.output_array,
                                         fast_transform=fast_transform)
+        elif kind == 'uniform':
+            self._evaluate_expansion_uniform(self.backward.tmp_array,
+                                             self.backward.output_array)
         else:
-            if kind == 'uniform':
-                mesh = self.mesh(bcast=False, map_true_domain=False, uniform=True)
-            else:
-                mesh = kind.mesh()
-                if len(kind) > 1:
-                    mesh = np.squeeze(mesh[self.axis])
+            mesh = kind.mesh()
+            if len(kind) > 1:
+                mesh = np.squeeze(mesh[self.axis])
             self.evaluate_expansion_all(self.backward.tmp_array,
                                         self.backward.output_array,
                                         x=mesh, fast_transform=False) # cannot use fast transforms on random mesh
@@ -310,6 +324,64 @@ class SpectralBase:
             return output_array
         return self.backward.output_array
 
+    def get_fast_transform(self, name):
+        """Return whether fast transforms are faster than Vandermonde type
+
+        The two are benchmarked on the planned arrays the first time a
+        signature (class, N, quad, shape, dtype, axis) is seen on this
+        machine, see :mod:`.optimization.autotune`.
+
+        Parameters
+        ----------
+            name : str
+                Either 'scalar_product' or 'backward'
+        """
+        if name == 'scalar_product':
+            array = self.scalar_product.input_array
+            def run(fast_transform):
+                self._evaluate_scalar_product(fast_transform=fast_transform)
+        else:
+            array = self.backward.tmp_array
+            def run(fast_transform):
+                self.evaluate_expansion_all(array, self.backward.output_array,
+                                            fast_transform=fast_transform)
+        key = ('fast_transform', name, self.__class__.__module__+'.'+self.__class__.__name__,
+               self.N, self.quad, array.shape, array.dtype.str, self.axis)
+        # Some fast transforms overwrite their input
+        saved = array.copy()
+        def run_and_restore(fast_transform):
+            try:
+                run(fast_transform)
+            finally:
+                array[...] = saved
+        return autotune.select(key, [True, False], run_and_restore)
+
+    def _evaluate_expansion_uniform(self, input_array, output_array):
+        """Evaluate expansion on uniform mesh
+
+        The basis functions evaluated on the uniform mesh are computed only
+        once and cached. The expansion is then evaluated with one (batched)
+        matrix-matrix product.
+
+        Parameters
+        ----------
+            input_array : array
+                Expansion coefficients
+            output_array : array
+                Function values on uniform mesh
+        """
+        if self._uniform_matrix is None:
+            mesh = self.mesh(bcast=False, map_true_domain=False, uniform=True)
+            self._uniform_matrix = self.evaluate_basis_all(x=mesh, argument=1)
+        P = self._uniform_matrix
+        N = P.shape[1]
+        shape = input_array.shape
+        A = int(np.prod(shape[:self.axis]))
+        B = int(np.prod(shape[self.axis+1:]))
+        c = np.ascontiguousarray(input_array[self.sl[slice(0, N)]]).reshape((A, N, B))
+        output_array[:] = np.matmul(P, c).reshape(output_array.shape)
+        return output_array
+
     def vandermonde(self, x):
         r"""Return Vandermonde matrix based on the primary basis of the family.
 
@@ -341,6 +413,29 @@ class SpectralBase:
         """
         raise NotImplementedError
 
+    def three_term_recurrence(self, N=None):
+        r"""Return coefficients of three-term recurrence for orthogonal basis
+
+        The orthogonal basis functions satisfy
+
+        .. math::
+
+            \psi_{n+1}(x) = (a_n x + b_n) \psi_n(x) - g_n \psi_{n-1}(x)
+
+        where :math:`\psi_n(x)` is the basis function returned by
+        :meth:`.SpectralBase.evaluate_basis` for ``i=n``.
+
+        Parameters
+        ----------
+            N : int, optional
+                Number of coefficients. Defaults to self.N
+
+        Returns
+        -------
+            3-tuple of arrays (a, b, g)
+        """
+        raise NotImplementedError
+
     def evaluate_basis(self, x, i=0, output_array=None):
         """Evaluate basis ``i`` at points x
 
@@ -488,13 +583,61 @@ class SpectralBase:
             array
                 output_array
 
+        Note
+        ----
+        Bases with a three-term recurrence (see :meth:`three_term_recurrence`)
+        are evaluated with Clenshaw's algorithm, without forming the matrix of
+        basis functions evaluated at x.
+
         """
         if output_array is None:
             output_array = np.zeros(x.shape, dtype=self.dtype)
         x = self.map_reference_domain(x)
+        if u.ndim == 1 and self.dimensions == 1:
+            c, recurrence = self._get_recurrence(u.__array__())
+            if recurrence is not None:
+                ortho, a, b, g = recurrence
+                xr = np.ascontiguousarray(x, dtype=float).ravel()
+                dtype = np.result_type(c.dtype, float)
+                out = np.zeros((len(xr), 1), dtype=dtype)
+                out = clenshaw(xr, c.astype(dtype).reshape((1, -1, 1)), a, b, g, out)
+                out *= ortho.evaluate_basis(xr, i=0)[:, np.newaxis]
+                out = out.real if output_array.dtype.char in 'fdg' else out
+                output_array[...] = out.reshape(output_array.shape)
+                return output_array
         self.evaluate_expansion_all(u, output_array, x, False)
         return output_array
 
+    def _get_recurrence(self, c):
+        """Return coefficients in orthogonal basis and three-term recurrence
+
+        Parameters
+        ----------
+            c : array
+                Expansion coefficients along self.axis
+
+        Returns
+        -------
+            2-tuple
+                The coefficients of the orthogonal basis and a 4-tuple
+                (orthogonal basis, a, b, g) of the recurrence. The recurrence
+                is None, and c returned unchanged, if there is no three-term
+                recurrence or if c cannot be mapped to the orthogonal basis.
+        """
+        ortho = self if self.is_orthogonal else self.get_orthogonal()
+        try:
+            rec = ortho.three_term_recurrence(c.shape[self.axis])
+        except NotImplementedError:
+            return c, None
+        if not self.is_orthogonal:
+            if type(self).to_ortho in (SpectralBase.to_ortho, type(ortho).to_ortho):
+                return c, None
+            try:
+                c = self.to_ortho(c.copy(), np.zeros_like(c))
+            except NotImplementedError:
+                return c, None
+        return c, (ortho,) + tuple(np.ascontiguousarray(r, dtype=float) for r in rec)
+
     def _evaluate_scalar_product(self, fast_transform=False):
         """Evaluate scalar product
 
@@ -901,61 +1044,66 @@ class SpectralBase:
         N : integer, optional
             The number of quadrature points
         measure : 1 or `sympy.Expr`
+
+        Note
+        ----
+        The weights are computed only once for each N, measure and precision
+        of mpmath, and then cached. The returned array should not be modified.
         """
         if N is None:
             N = self.shape(False)
+        key = (N, measure, mp.prec)
+        if key in self._measured_weights:
+            return self._measured_weights[key]
         xm, wj = self.mpmath_points_and_weights(N, map_true_domain=True)
-        if measure == 1:
-            return wj
-
         if isinstance(measure, Number):
-            wj *= measure
-            return wj
-
-        s = measure.free_symbols
-        assert len(s) == 1
-        s = s.pop()
-        xj = sp.lambdify(s, measure)(xm)
-        wj = wj*xj
+            wj = wj*measure if measure != 1 else wj.copy()
+        else:
+            s = measure.free_symbols
+            assert len(s) == 1
+            s = s.pop()
+            xj = sp.lambdify(s, measure)(xm)
+            wj = wj*xj
+        self._measured_weights[key] = wj
         return wj
 
-    def get_measured_array(self, array):
+    def get_measured_array(self, array, out=None):
         """Return `array` times Jacobian determinant
 
         Parameters
         ----------
         array : array
+        out : array, optional
+            Array to store the result in. Default is to multiply `array`
+            in place
 
         Note
         ----
         If basis is part of a `TensorProductSpace`, then the
         array will be measured there. So in that case, just return
-        the array unchanged.
+        the array unchanged (copied to `out` if given).
         """
-        if self.tensorproductspace:
-            return array
+        out = array if out is None else out
+        xj = 1 if self.tensorproductspace else self.get_numeric('sg')
+        if isinstance(xj, Number) and xj == 1:
+            if out is not array:
+                out[...] = array
+            return out
+        np.multiply(array, xj, out=out)
+        return out
 
-        measure = self.coors.get_sqrt_det_g()
-        if measure == 1:
-            return array
+    def get_numeric(self, name):
+        """Return quantity of the coordinates evaluated on the mesh
 
-        if isinstance(measure, Number):
-            array *= measure
-            return array
+        The quantity is computed only once, and then cached.
 
+        Parameters
+        ----------
+        name : str or Sympy expression
+            See :meth:`.Coordinates.get_numeric`
+        """
         N = self.shape(False)
-        xm = self.mpmath_points_and_weights(N, map_true_domain=True)[0]
-        s = measure.free_symbols
-        if len(s) == 0:
-            # constant
-            array[...] = array*float(measure)
-        elif len(s) == 1:
-            s = s.pop()
-            xj = sp.lambdify(s, measure)(xm)
-            array[...] = array*xj
-        else:
-            raise NotImplementedError
-        return array
+        return self.coors.get_numeric(name, lambda: (self.mesh(False),), key=('mesh', N))
 
     def get_dealiased(self, padding_factor=1.5, dealias_direct=False):
         """Return space (otherwise as self) to be used for dealiasing
@@ -1074,9 +1222,16 @@ class SpectralBase:
     def _truncation_forward(self, padded_array, trunc_array):
         if not id(trunc_array) == id(padded_array):
             trunc_array.fill(0)
-            s = self.sl[self.slice()]
+            N = trunc_array.shape[self.axis]
+            s = self.sl[slice(0, min(N-self.N+self.slice().stop, self.slice().stop))]
             trunc_array[s] = padded_array[s]
 
+            # Fix boundary condition dofs if truncating to a coarser space
+            if self.bc and N < self.N:
+                sl = self.get_bc_basis().slice()
+                nd = sl.stop - sl.start
+                trunc_array[self.sl[slice(-nd, None)]] = padded_array[self.sl[sl]]
+
     def _padding_backward(self, trunc_array, padded_array):
         if not id(trunc_array) == id(padded_array):
             padded_array.fill(0)
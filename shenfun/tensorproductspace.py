@@ -7,15 +7,19 @@ import functools
 import sympy as sp
 import numpy as np
 from shenfun.fourier.bases import R2C, C2C
-from shenfun.utilities import apply_mask
+from shenfun.utilities import apply_mask, clenshaw, nufft_interp, memory_report
+from shenfun.utilities.probe import Probe
 from shenfun.forms.arguments import Function, Array
-from shenfun.optimization.cython import evaluate
+from shenfun.optimization import get_module, autotune
 from shenfun.spectralbase import slicedict, islicedict, SpectralBase
 from shenfun.coordinates import Coordinates
+from mpi4py_fft import fftw
 from mpi4py_fft.mpifft import Transform, PFFT
 from mpi4py_fft.pencil import Subcomm, Pencil
 from mpi4py import MPI
 
+evaluate = get_module('evaluate')
+
 comm = MPI.COMM_WORLD
 
 __all__ = ('TensorProductSpace', 'VectorSpace', 'TensorSpace',
@@ -55,19 +59,7 @@ class CurvilinearTransform(Transform):
     def get_measured_input_array(self):
         """Weigh input array with integral measure
         """
-        dx = self.sg
-        mesh = self.local_mesh
-        if dx == 1:
-            return
-
-        sym0 = dx.free_symbols
-        m = []
-        for sym in sym0:
-            j = 'xyzrs'.index(str(sym))
-            m.append(mesh[j])
-        xj = sp.lambdify(sym0, dx)(*m)
-        self.input_array[...] = self.input_array*xj
-        return
+        self._T.get_measured_array(self.input_array)
 
     def __call__(self, input_array=None, output_array=None, **kw):
         """Compute transform
@@ -88,10 +80,9 @@ class CurvilinearTransform(Transform):
         as planned with serial transform object _xfftn.
 
         """
-        if input_array is not None:
-            self.input_array[...] = input_array
-
-        self.get_measured_input_array()
+        # Measure and copy input in one pass
+        u = self.input_array if input_array is None else input_array
+        self._T.get_measured_array(u, out=self.input_array)
 
         for i in range(len(self._transfer)):
             self._xfftn[i](**kw)
@@ -106,6 +97,103 @@ class CurvilinearTransform(Transform):
         else:
             return self.output_array
 
+class NUFFTGrid:
+    """Twice oversampled grid for nonuniform FFTs along Fourier axes
+
+    Deconvolved expansion coefficients are moved to the oversampled grid one
+    Fourier axis at the time. A distributed axis is first made local with a
+    global redistribution of the pencil, and then padded and transformed with
+    a planned FFT. The grid is thus distributed like the coefficients, and
+    the non-Fourier axes end up with the same distribution as in spectral
+    space. The deconvolution factors, work arrays and FFT plans are created
+    only once.
+
+    Parameters
+    ----------
+    T : :class:`.TensorProductSpace`
+    msp : int
+        Half-width of the Gaussian spreading stencil
+
+    Attributes
+    ----------
+    faxes : list of ints
+        The Fourier axes
+    tau : array
+        Widths of the Gaussians, one for each Fourier axis
+    shape : tuple of ints
+        Global shape of the grid
+    substart : tuple of ints
+        Global index of the first item of the local part of the grid
+    """
+    def __init__(self, T, msp):
+        self.faxes = [axis for axis, base in enumerate(T.bases) if base.family() == 'fourier']
+        dtype = np.dtype(complex)
+        flags = (fftw.flag_dict['FFTW_MEASURE'], fftw.flag_dict['FFTW_DESTROY_INPUT'])
+        pencil0 = pencil = T.forward.output_pencil
+        self.input_array = fftw.aligned(pencil.subshape, dtype=dtype)
+        self._stages = []
+        tau = []
+        A = self.input_array
+        for axis in self.faxes:
+            base = T.bases[axis]
+            transfer = None
+            if pencil.subcomm[axis].Get_size() > 1:
+                pencilB = pencil.pencil(axis)
+                transfer = pencil.transfer(pencilB, dtype)
+                pencil = pencilB
+                A = fftw.aligned(pencil.subshape, dtype=dtype)
+            Mr = 2*base.N
+            tau.append(np.pi*msp/(base.N**2*3))
+            k = base.wavenumbers(bcast=False)
+            scale = np.sqrt(np.pi/tau[-1])*np.exp(k**2*tau[-1])/Mr
+            if isinstance(base, R2C):
+                M = base.N//2+1
+                last_conj_index = M-1 if base.N % 2 == 0 else M
+                scale *= np.where((k > 0) & (k < last_conj_index), 2, 1)
+            shape = list(pencil.shape)
+            shape[axis] = Mr
+            pencil = Pencil(pencil.subcomm, shape, pencil.axis)
+            U = fftw.aligned(pencil.subshape, dtype=dtype)
+            V = fftw.aligned(pencil.subshape, dtype=dtype)
+            fft = fftw.ifftn(U, axes=(axis,), flags=flags, output_array=V)
+            sl = [slice(None)]*len(shape)
+            sl[axis] = k % Mr
+            sc = [np.newaxis]*len(shape)
+            sc[axis] = slice(None)
+            self._stages.append((transfer, A, U, tuple(sl), scale[tuple(sc)], fft))
+            A = V
+        self._final = None
+        if pencil.axis != pencil0.axis and pencil0.axis not in self.faxes:
+            # Restore the distribution of the non-Fourier axes
+            pencilB = pencil.pencil(pencil0.axis)
+            self._final = (pencil.transfer(pencilB, dtype), fftw.aligned(pencilB.subshape, dtype=dtype))
+            pencil = pencilB
+        self.tau = np.array(tau)
+        self.shape = pencil.shape
+        self.substart = pencil.substart
+
+    def __call__(self, c):
+        """Return local part of the grid for expansion coefficients c
+
+        Parameters
+        ----------
+        c : array
+            Expansion coefficients, distributed like the spectral space
+        """
+        self.input_array[...] = c
+        A = self.input_array
+        for transfer, B, U, sl, scale, fft in self._stages:
+            if transfer is not None:
+                transfer.forward(A, B)
+            U.fill(0)
+            U[sl] = B*scale
+            A = fft()
+        if self._final is not None:
+            transfer, B = self._final
+            transfer.forward(A, B)
+            A = B
+        return A
+
 class TensorProductSpace(PFFT):
     """Class for multidimensional tensorproductspaces.
 
@@ -163,6 +251,7 @@ class TensorProductSpace(PFFT):
                  coordinates=None, modify_spaces_inplace=False, **kw):
         # Note do not call __init__ of super
         self.comm = comm
+        self._nufft = {}
         self.bases = bases
         if not modify_spaces_inplace:
             self.bases = tuple([base.get_unplanned() for base in bases])
@@ -457,7 +546,7 @@ class TensorProductSpace(PFFT):
         ab_hat = self.forward(a*b, ab_hat)
         return ab_hat
 
-    def eval(self, points, coefficients, output_array=None, method=2):
+    def eval(self, points, coefficients, output_array=None, method=None):
         """Evaluate Function at points, given expansion coefficients
 
         Parameters
@@ -468,16 +557,34 @@ class TensorProductSpace(PFFT):
             Expansion coefficients, or instance of :class:`.Function`
         output_array : array, optional
             Return array, function values at points
-        method : int, optional
-            Chooses implementation. The default 0 is a low-memory cython
+        method : int or None, optional
+            Chooses implementation. Method 0 is a low-memory cython
             version. Using method = 1 leads to a faster cython
             implementation that, on the downside, uses more memory.
-            The final, method = 2, is a python implementation.
+            Method = 2 is a python implementation. Method = 3,
+            uses recurrences (Clenshaw's algorithm) for non-periodic axes
+            and evaluates the points in blocks. Method 3 does not create
+            dense basis matrices for non-periodic axes that are not
+            distributed, and the memory use is independent of the number of
+            points. Distributed non-periodic axes use basis matrices of the
+            locally owned coefficients. Method = 4 is like
+            method = 3, but uses a nonuniform FFT for the Fourier axes, which
+            is faster for many points and large Fourier spaces. If None,
+            then the fastest method is chosen if autotuning is enabled (see
+            :mod:`.optimization.autotune`), and method 2 is used otherwise.
+            Note that autotuning is collective over the communicator of the
+            space.
         """
+        if method is None:
+            method = self.get_eval_method(points, coefficients) if autotune.enabled else 2
         if output_array is None:
             output_array = np.zeros(points.shape[1], dtype=self.forward.input_array.dtype)
         else:
             output_array[:] = 0
+        if method == 3:
+            return self._eval_clenshaw(points, coefficients, output_array)
+        if method == 4:
+            return self._eval_nufft(points, coefficients, output_array)
         if len(self.get_nonperiodic_axes()) > 1:
             method = 2
         if method == 0:
@@ -487,6 +594,49 @@ class TensorProductSpace(PFFT):
         else:
             return self._eval_python(points, coefficients, output_array)
 
+    def get_eval_method(self, points, coefficients):
+        """Return the fastest method of :meth:`eval` for given arguments
+
+        Parameters
+        ----------
+        points : array
+            Array of shape (D, N), for  N points in D dimensions
+        coefficients : array
+            Expansion coefficients
+        """
+        key = ('eval', tuple((base.__class__.__name__, base.N) for base in self.bases),
+               np.asarray(coefficients).dtype.str, points.shape[-1])
+        def run(method):
+            self.eval(points, coefficients, method=method)
+        return autotune.select(key, range(5), run, comm=self.comm)
+
+    def memory_report(self, file=None):
+        """Print and return memory used by the arrays of this space
+
+        The memory is summed over the processes of the communicator of this
+        space, and only rank 0 prints.
+
+        Parameters
+        ----------
+        file : file-like object, optional
+            Where to print. Default is sys.stdout
+
+        See :func:`.utilities.memory_report`
+        """
+        return memory_report(self, self.comm, file)
+
+    def get_probe(self, points, **kw):
+        """Return :class:`.Probe` for repeated evaluations at fixed points
+
+        Parameters
+        ----------
+        points : array
+            Array of shape (D, N), for  N points in D dimensions
+        kw : dict, optional
+            Parameters to :class:`.Probe`, like blocksize, memory and store
+        """
+        return Probe(self, points, **kw)
+
     def _eval_python(self, points, coefficients, output_array):
         """Evaluate Function at points, given expansion coefficients
 
@@ -567,6 +717,164 @@ class TensorProductSpace(PFFT):
         return output_array
 
 
+    def _eval_clenshaw(self, points, coefficients, output_array, blocksize=None):
+        """Evaluate Function at points, given expansion coefficients
+
+        Non-periodic axes with a three-term recurrence are evaluated with
+        Clenshaw's algorithm, on the coefficients of the orthogonal basis.
+        The remaining axes use basis matrices. All points are treated in
+        blocks.
+
+        Note
+        ----
+        Clenshaw's algorithm needs all coefficients along an axis. Non-periodic
+        axes that are distributed among processors in spectral space are
+        therefore evaluated with basis matrices of the locally owned
+        coefficients, and the sum over processors is taken at the end. The
+        basis matrices are of size (blocksize, local number of
+        coefficients).
+
+        Parameters
+        ----------
+        points : float or array of floats
+        coefficients : array
+            Expansion coefficients
+        output_array : array
+            Return array, function values at points
+        blocksize : int, optional
+            Number of points in one block. Defaults to a number that leads
+            to work arrays of about 2**20 items.
+        """
+        c, recurrence = self._get_recurrences(coefficients.__array__())
+        if blocksize is None:
+            blocksize = max(1, 2**20//int(np.prod(c.shape[1:])))
+        npoints = points.shape[1]
+        for i0 in range(0, npoints, blocksize):
+            block = slice(i0, min(i0+blocksize, npoints))
+            out = c[np.newaxis]
+            for axis in range(len(self)):
+                out = self._contract_axis(axis, points[axis, block], out, recurrence[axis])
+            output_array[block] = out.real if output_array.dtype.char in 'fdg' else out
+        output_array = comm.allreduce(output_array)
+        return output_array
+
+    def _eval_nufft(self, points, coefficients, output_array, msp=12, blocksize=None):
+        """Evaluate Function at points, given expansion coefficients
+
+        Fourier axes are evaluated with a type-2 nonuniform FFT, using
+        Gaussian spreading on a twice oversampled grid (see
+        :class:`.NUFFTGrid`). The remaining axes are evaluated like in
+        :meth:`_eval_clenshaw`.
+
+        Parameters
+        ----------
+        points : float or array of floats
+        coefficients : array
+            Expansion coefficients
+        output_array : array
+            Return array, function values at points
+        msp : int, optional
+            Half-width of the Gaussian spreading stencil. The default leads
+            to an accuracy of about 12 digits.
+        blocksize : int, optional
+            Number of points in one block.
+        """
+        faxes = [axis for axis, base in enumerate(self.bases) if base.family() == 'fourier']
+        if len(faxes) == 0 or len(faxes) > 3:
+            return self._eval_clenshaw(points, coefficients, output_array, blocksize)
+        c, recurrence = self._get_recurrences(coefficients.__array__())
+        if msp not in self._nufft:
+            self._nufft[msp] = NUFFTGrid(self, msp)
+        grid = self._nufft[msp]
+        h = np.moveaxis(grid(c), faxes, range(len(faxes)))
+        shape = h.shape[len(faxes):]
+        h = np.ascontiguousarray(h.reshape(h.shape[:len(faxes)]+(-1,)))
+        M = np.array([grid.shape[axis] for axis in faxes], dtype=int)
+        offset = np.array([grid.substart[axis] for axis in faxes], dtype=int)
+
+        if blocksize is None:
+            blocksize = max(1, 2**20//h.shape[-1])
+        npoints = points.shape[1]
+        for i0 in range(0, npoints, blocksize):
+            block = slice(i0, min(i0+blocksize, npoints))
+            x = np.array([self.bases[axis].map_reference_domain(points[axis, block]) for axis in faxes], dtype=float)
+            out = np.zeros((x.shape[1], h.shape[-1]), dtype=complex)
+            out = nufft_interp(h, x, M, offset, grid.tau, msp, out)
+            out = out.reshape((len(out),)+shape)
+            for axis in range(len(self)):
+                if axis not in faxes:
+                    out = self._contract_axis(axis, points[axis, block], out, recurrence[axis])
+            output_array[block] = out.real if output_array.dtype.char in 'fdg' else out
+        output_array = comm.allreduce(output_array)
+        return output_array
+
+    def _get_recurrences(self, c):
+        """Return coefficients and recurrences for evaluating non-periodic axes
+
+        Non-periodic axes that are not distributed and that have a
+        three-term recurrence (see :meth:`.SpectralBase.three_term_recurrence`)
+        are evaluated with Clenshaw's algorithm. The coefficients are for these
+        axes transformed to the orthogonal basis.
+
+        Parameters
+        ----------
+        c : array
+            Expansion coefficients
+
+        Returns
+        -------
+        2-tuple
+            The coefficients and a list of recurrences, one for each axis.
+            An item of the list is None for axes not evaluated with Clenshaw's
+            algorithm, and otherwise a 4-tuple (orthogonal basis, a, b, g).
+        """
+        gshape = self.global_shape(True)
+        recurrence = []
+        for axis, base in enumerate(self.bases):
+            rec = None
+            if base.family() != 'fourier' and c.shape[axis] == gshape[axis]:
+                c, rec = base._get_recurrence(c)
+            recurrence.append(rec)
+        return c, recurrence
+
+    def _contract_axis(self, axis, x, c, recurrence):
+        """Return c contracted along its second axis with basis of given axis
+
+        Parameters
+        ----------
+        axis : int
+            The axis of the basis
+        x : array
+            Points (in the true domain) of one block
+        c : array
+            Partially contracted coefficients. The first axis is either of
+            length 1 (shared by all points) or of the same length as x.
+        recurrence : None or 4-tuple
+            Recurrence, as returned by :meth:`_get_recurrences`
+        """
+        base = self.bases[axis]
+        x = np.ascontiguousarray(base.map_reference_domain(x), dtype=float)
+        cx = c.reshape(c.shape[:2]+(-1,))
+        if recurrence is not None:
+            ortho, a, b, g = recurrence
+            dtype = np.result_type(c.dtype, float)
+            u = np.zeros((len(x), cx.shape[2]), dtype=dtype)
+            u = clenshaw(x, cx.astype(dtype, copy=False), a, b, g, u)
+            u *= ortho.evaluate_basis(x, i=0)[:, np.newaxis]
+        else:
+            local_slice = self.local_slice(True)
+            P = base.evaluate_basis_all(x=x, argument=1)[:, local_slice[axis]]
+            if isinstance(base, R2C):
+                M = base.N//2+1
+                last_conj_index = M-1 if base.N % 2 == 0 else M
+                k = np.arange(local_slice[axis].start, local_slice[axis].start+P.shape[1])
+                P = P*np.where((k > 0) & (k < last_conj_index), 2, 1)
+            if cx.shape[0] == 1:
+                u = np.dot(P, cx[0])
+            else:
+                u = np.einsum('ijk,ij->ik', cx, P)
+        return u.reshape((len(x),)+c.shape[2:])
+
     def _eval_lm_cython(self, points, coefficients, output_array):
         """Evaluate Function at points, given expansion coefficients
 
@@ -734,9 +1042,8 @@ class TensorProductSpace(PFFT):
         """
         X = self.local_mesh(broadcast=True, uniform=uniform)
         xx = []
-        psi = self.coors.coordinates[0]
-        for rv in self.coors.coordinates[1]:
-            xx.append(sp.lambdify(psi, rv)(*X))
+        for rv in self.coors.rv:
+            xx.append(self.coors.lambdify(rv)(*X))
         return xx
 
     def cartesian_mesh(self, uniform=False):
@@ -749,9 +1056,8 @@ class TensorProductSpace(PFFT):
         """
         X = self.mesh(uniform=uniform)
         xx = []
-        psi = self.coors.coordinates[0]
-        for rv in self.coors.coordinates[1]:
-            xx.append(sp.lambdify(psi, rv)(*X))
+        for rv in self.coors.rv:
+            xx.append(self.coors.lambdify(rv)(*X))
         return xx
 
     def dim(self):
@@ -828,26 +1134,40 @@ class TensorProductSpace(PFFT):
             mask = mask * ll
         return mask
 
-    def get_measured_array(self, u):
+    def get_measured_array(self, u, out=None):
         """Weigh Array `u` with integral measure
 
         Parameters
         ----------
         u : Array
+        out : array, optional
+            Array to store the result in. Default is to weigh `u` in place
         """
-        dx = self.coors.get_sqrt_det_g()
-        mesh = self.local_mesh(True)
-        if dx == 1:
-            return
+        out = u if out is None else out
+        xj = self.get_numeric('sg')
+        if isinstance(xj, Number) and xj == 1:
+            if out is not u:
+                out[...] = u
+            return out
+        np.multiply(u, xj, out=out)
+        return out
 
-        sym0 = dx.free_symbols
-        m = []
-        for sym in sym0:
-            j = 'xyzrs'.index(str(sym))
-            m.append(mesh[j])
-        xj = sp.lambdify(sym0, dx)(*m)
-        u *= xj
-        return u
+    def get_numeric(self, name):
+        """Return quantity of the coordinates evaluated on the local mesh
+
+        The quantity is computed only once, and then cached.
+
+        Parameters
+        ----------
+        name : str or Sympy expression
+            See :meth:`.Coordinates.get_numeric`
+
+        Returns
+        -------
+        A number, or an array broadcastable to the local shape of the
+        TensorProductSpace
+        """
+        return self.coors.get_numeric(name, self.local_mesh, key='local_mesh')
 
     def __iter__(self):
         return iter(self.bases)
@@ -1026,7 +1346,7 @@ class CompositeSpace:
     def is_composite_space(self):
         return 1
 
-    def eval(self, points, coefficients, output_array=None, method=0):
+    def eval(self, points, coefficients, output_array=None, method=None):
         """Evaluate Function at points, given expansion coefficients
 
         Parameters
@@ -1041,14 +1361,44 @@ class CompositeSpace:
             version. Using method = 1 leads to a faster cython
             implementation that, on the downside, uses more memory.
             The final, method = 2, is a python implementation used only
-            for verification.
+            for verification. If None, then the fastest method is chosen if
+            autotuning is enabled, and method 0 is used otherwise.
         """
+        if method is None and not autotune.enabled:
+            method = 0
         if output_array is None:
             output_array = np.zeros((len(self.flatten()), points.shape[-1]), dtype=self.forward.input_array.dtype)
         for i, space in enumerate(self.flatten()):
             output_array.__array__()[i] = space.eval(points, coefficients.__array__()[i], output_array.__array__()[i], method)
         return output_array
 
+    def memory_report(self, file=None):
+        """Print and return memory used by the arrays of this space
+
+        The memory is summed over the processes of the communicator of this
+        space, and only rank 0 prints.
+
+        Parameters
+        ----------
+        file : file-like object, optional
+            Where to print. Default is sys.stdout
+
+        See :func:`.utilities.memory_report`
+        """
+        return memory_report(self, self.flatten()[0].comm, file)
+
+    def get_probe(self, points, **kw):
+        """Return :class:`.Probe` for repeated evaluations at fixed points
+
+        Parameters
+        ----------
+        points : array
+            Array of shape (D, N), for  N points in D dimensions
+        kw : dict, optional
+            Parameters to :class:`.Probe`, like blocksize, memory and store
+        """
+        return Probe(self, points, **kw)
+
     def convolve(self, a_hat, b_hat, ab_hat):
         """Convolution of a_hat and b_hat
 
@@ -11,10 +11,12 @@ from collections import defaultdict
 import numpy as np
 import sympy as sp
 from scipy.fftpack import dct
+from mpi4py import MPI
 from shenfun.optimization import optimizer
 
 __all__ = ['dx', 'clenshaw_curtis1D', 'CachedArrayDict', 'surf3D', 'wrap_periodic',
-           'outer', 'apply_mask', 'integrate_sympy', 'mayavi_show']
+           'outer', 'apply_mask', 'integrate_sympy', 'mayavi_show',
+           'memory_report']
 
 
 def dx(u):
@@ -123,6 +125,143 @@ class CachedArrayDict(MutableMapping):
     def values(self):
         raise TypeError('Cached work arrays not iterable')
 
+def _root_buffer(a):
+    """Return the array or buffer that owns the memory of array a"""
+    while isinstance(a.base, np.ndarray):
+        a = a.base
+    return a
+
+def _owned_spaces(obj):
+    """Return ids of the function spaces that are part of obj"""
+    from shenfun.spectralbase import SpectralBase
+    from shenfun.tensorproductspace import TensorProductSpace, CompositeSpace
+    spaces = []
+    if isinstance(obj, CompositeSpace):
+        spaces = list(obj.flatten())
+    elif isinstance(obj, (TensorProductSpace, SpectralBase)):
+        spaces = [obj]
+    for space in list(spaces):
+        if isinstance(space, TensorProductSpace):
+            spaces += list(space.bases)
+    for space in list(spaces):
+        if getattr(space, '_bc_basis', None) is not None:
+            spaces.append(space._bc_basis)
+    return set(id(space) for space in spaces)
+
+def memory_report(obj, comm=MPI.COMM_WORLD, file=None):
+    """Print and return memory used by the arrays of obj
+
+    All Numpy arrays reachable from the attributes of obj are collected, like
+    the planned arrays of function spaces, the diagonals of matrices and the
+    factorizations stored by solvers. Each buffer is counted once, and arrays
+    that are views of a buffer already counted are reported as shared views.
+    Function spaces that are not part of obj, like the test and trial spaces
+    of a matrix, are not included.
+
+    Must be called by all processes in comm. Only rank 0 prints.
+
+    Parameters
+    ----------
+    obj : object
+        For example a :class:`.TensorProductSpace`, a :class:`.CompositeSpace`,
+        a :class:`.SparseMatrix` or a solver
+    comm : MPI communicator or None, optional
+        If None, then report only the memory of this process
+    file : file-like object, optional
+        Where to print. Default is sys.stdout
+
+    Returns
+    -------
+    2-tuple of dicts (local, reduced)
+        Keys are the attributes of obj holding arrays, and values are tuples
+        (owned, views) of bytes. The key 'total' holds the sum. The first
+        dict holds the memory of this process and the second the memory
+        summed over all processes in comm.
+    """
+    import sys
+    from shenfun.spectralbase import SpectralBase
+    from shenfun.tensorproductspace import TensorProductSpace, CompositeSpace
+    spacetypes = (SpectralBase, TensorProductSpace, CompositeSpace)
+    owned_spaces = _owned_spaces(obj)
+    buffers = set()
+    visited = set()
+    usage = defaultdict(lambda: [0, 0])
+
+    def visit(x, group):
+        if isinstance(x, np.ndarray):
+            if id(x) in visited:
+                return
+            visited.add(id(x))
+            root = _root_buffer(x)
+            if id(root) in buffers:
+                usage[group][1] += x.nbytes
+            else:
+                buffers.add(id(root))
+                usage[group][0] += root.nbytes
+            return
+        if isinstance(x, (Number, str, bytes, type, types.FunctionType)) or x is None:
+            return
+        if id(x) in visited:
+            return
+        if isinstance(x, spacetypes) and id(x) not in owned_spaces:
+            return
+        if not isinstance(x, (dict, list, tuple, set)):
+            module = type(x).__module__
+            if not module.startswith(('shenfun', 'mpi4py_fft', 'scipy.sparse')):
+                return
+        visited.add(id(x))
+        if isinstance(x, types.MethodType):
+            return visit(x.__self__, group)
+        if isinstance(x, dict):
+            for value in x.values():
+                visit(value, group)
+        elif isinstance(x, (list, tuple, set)):
+            for value in x:
+                visit(value, group)
+        attributes = dict(getattr(x, '__dict__', {}))
+        for cls in type(x).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(x, name):
+                    attributes[name] = getattr(x, name)
+        if not attributes:
+            for name in ('input_array', 'output_array'): # serial fftw plans
+                attributes[name] = getattr(x, name, None)
+        for name, value in attributes.items():
+            visit(value, group)
+
+    visited.add(id(obj))
+    if isinstance(obj, dict):
+        for value in obj.values():
+            visit(value, 'diagonals')
+    for name, value in getattr(obj, '__dict__', {}).items():
+        if isinstance(value, (list, tuple)) and value and all(isinstance(v, spacetypes) for v in value):
+            visited.add(id(value))
+            for i, space in enumerate(value):
+                visit(space, '%s[%d]'%(name, i))
+        else:
+            visit(value, name)
+
+    report = {key: tuple(val) for key, val in usage.items() if val[0] or val[1]}
+    report['total'] = tuple(sum(val[i] for val in report.values()) for i in range(2))
+    reports = [report] if comm is None else comm.allgather(report)
+    keys = []
+    for r in reports:
+        keys += [key for key in r if key not in keys and key != 'total']
+    keys.append('total')
+    reduced = {key: tuple(sum(r.get(key, (0, 0))[i] for r in reports) for i in range(2))
+               for key in keys}
+    if comm is None or comm.Get_rank() == 0:
+        file = sys.stdout if file is None else file
+        print('{:<40} {:>12} {:>12} {:>16}'.format(type(obj).__name__, 'owned (MB)',
+                                                   'views (MB)', 'max owned (MB)'),
+              file=file)
+        for key, val in reduced.items():
+            maxowned = max(r.get(key, (0, 0))[0] for r in reports)
+            print('{:<40} {:>12.4f} {:>12.4f} {:>16.4f}'.format(key, val[0]/2**20, val[1]/2**20,
+                                                             maxowned/2**20),
+                  file=file)
+    return report, reduced
+
 def outer(a, b, c):
     r"""Return outer product $c_{i,j} = a_i b_j$
 
@@ -178,6 +317,136 @@ def apply_mask(u_hat, mask):
         u_hat *= mask
     return u_hat
 
+@optimizer
+def axpy(a, x, y):
+    r"""Return y = a x + y, computed in place
+
+    Parameters
+    ----------
+    a : number or array
+        Coefficient, broadcastable to the shape of x
+    x : array
+    y : array of same shape as x
+    """
+    y += a*x
+    return y
+
+@optimizer
+def axpby(a, x, b, y, z):
+    r"""Return z = a x + b y, computed in place
+
+    Parameters
+    ----------
+    a, b : numbers or arrays
+        Coefficients, broadcastable to the shapes of x and y
+    x : array
+    y : array of same shape as x
+    z : array of same shape as x
+        Return array. May be the same array as x or y.
+    """
+    z[:] = a*x + b*y
+    return z
+
+@optimizer
+def clenshaw(x, c, a, b, g, output_array):
+    r"""Evaluate expansions in basis functions with three-term recurrence
+
+    The basis functions satisfy
+
+    .. math::
+
+        \psi_{n+1}(x) = (a_n x + b_n) \psi_n(x) - g_n \psi_{n-1}(x)
+
+    and the returned array is
+
+    .. math::
+
+        y_{ij} = \sum_{n} c_{inj} \psi_n(x_i) / \psi_0(x_i)
+
+    computed with Clenshaw's algorithm.
+
+    Parameters
+    ----------
+    x : array of shape (P,)
+        Points of evaluation
+    c : array of shape (P, N, R) or (1, N, R)
+        Expansion coefficients. If the first dimension is 1, then the same
+        coefficients are used for all points.
+    a, b, g : arrays of shape (N,)
+        Recurrence coefficients
+    output_array : array of shape (P, R)
+    """
+    N = c.shape[1]
+    xx = x[:, np.newaxis]
+    b1 = np.zeros(output_array.shape, dtype=output_array.dtype)
+    b2 = np.zeros_like(b1)
+    for n in range(N-1, -1, -1):
+        b0 = c[:, n] + (a[n]*xx + b[n])*b1
+        if n < N-2:
+            b0 -= g[n+1]*b2
+        b2 = b1
+        b1 = b0
+    output_array[:] = b1
+    return output_array
+
+@optimizer
+def nufft_interp(h, x, M, offset, tau, msp, output_array):
+    r"""Interpolate from uniform grid to scattered points with Gaussian stencils
+
+    The grid is periodic, with M_a points uniformly spaced in [0, 2\pi) along
+    axis a. Each point x is given a stencil of the 2*msp grid points
+    :math:`m` nearest to x, with weights
+
+    .. math::
+
+        w(x, m) = \exp(-(x-2\pi m/M_a)^2/(4\tau_a)).
+
+    The returned array is, for a grid of dimension 2,
+
+    .. math::
+
+        y_{ij} = y_{ij} + \sum_{s, t} w(x^0_i, m_s) w(x^1_i, m_t) h_{m_s, m_t, j}
+
+    and similarly for dimensions 1 and 3. Only the part of the grid held in
+    h is used. Stencil points outside h are skipped.
+
+    Parameters
+    ----------
+    h : array of shape (m_0, ..., m_{d-1}, R)
+        Values on the local part of the grid, with d = 1, 2 or 3
+    x : array of shape (d, P)
+        Points, in [0, 2\pi)
+    M : integer array of shape (d,)
+        Global number of grid points along each axis
+    offset : integer array of shape (d,)
+        Global index of the first grid point in h along each axis
+    tau : array of shape (d,)
+        Widths of the Gaussians
+    msp : int
+        Half-width of the stencils
+    output_array : array of shape (P, R)
+    """
+    d = x.shape[0]
+    stencil = np.arange(-msp+1, msp+1)
+    idx = []
+    w = []
+    for axis in range(d):
+        m = np.floor(x[axis]*M[axis]/(2*np.pi)).astype(int)[:, np.newaxis] + stencil
+        i = np.mod(m, M[axis]) - offset[axis]
+        inside = (i >= 0) & (i < h.shape[axis])
+        w.append(np.where(inside, np.exp(-(x[axis][:, np.newaxis]-2*np.pi*m/M[axis])**2/(4*tau[axis])), 0))
+        idx.append(np.where(inside, i, 0))
+    if d == 1:
+        output_array += np.einsum('ps,psr->pr', w[0], h[idx[0]])
+    elif d == 2:
+        output_array += np.einsum('ps,pt,pstr->pr', w[0], w[1],
+                                  h[idx[0][:, :, None], idx[1][:, None, :]])
+    else:
+        output_array += np.einsum('ps,pt,pu,pstur->pr', w[0], w[1], w[2],
+                                  h[idx[0][:, :, None, None], idx[1][:, None, :, None],
+                                    idx[2][:, None, None, :]])
+    return output_array
+
 def integrate_sympy(f, d):
     """Exact definite integral using sympy
 
@@ -5,6 +5,13 @@ Module for some integrators.
     - RK4:      Runge-Kutta fourth order
     - ETD:      Exponential time differencing Euler method
     - ETDRK4:   Exponential time differencing Runge-Kutta fourth order
+    - BS3:      Bogacki-Shampine 3(2) pair with error control
+    - DOPRI5:   Dormand-Prince 5(4) pair with error control
+    - ARK43:    Additive (IMEX) Runge-Kutta 4(3) pair with error control
+    - SBDF2:    Semi-implicit backward differentiation second order
+    - SBDF3:    Semi-implicit backward differentiation third order
+    - SBDF4:    Semi-implicit backward differentiation fourth order
+    - CNAB2:    Crank-Nicolson Adams-Bashforth second order
 
 See, e.g.,
 H. Montanelli and N. Bootland "Solving periodic semilinear PDEs in 1D, 2D and
@@ -19,20 +26,165 @@ Integrators are set up to solve equations like
 where :math:`u` is the solution, :math:`L` is a linear operator and
 :math:`N(u)` is the nonlinear part of the right hand side.
 
+All integrators may use adaptive time steps. Time steps are then taken from a
+geometric ladder :math:`dt_0 r^n`, where :math:`dt_0` is the initial time step
+and :math:`r` is the ratio ``dt_ratio``. The setup (assembled matrices,
+factorized solvers or :math:`\varphi`-functions) of the most recently used
+rungs of the ladder are cached, such that changing the time step does not
+lead to a new setup.
+
 Note
 ----
-`RK4`, `ETD` and `ETDRK4` can only be used with Fourier function spaces,
-as they assume all matrices are diagonal.
+`RK4`, `BS3` and `DOPRI5` can only be used with Fourier function spaces, as
+they assume all matrices are diagonal. `ETD` and `ETDRK4` use elementwise
+:math:`\varphi`-functions for diagonal linear operators, and contour integrals
+(see :class:`PhiFunctions`) for non-diagonal linear operators.
 
 """
+import copy
 import types
+from collections import OrderedDict
 import numpy as np
 from shenfun import Function, TPMatrix, TrialFunction, TestFunction, inner, la
+from shenfun.fourier.bases import R2C
+from shenfun.utilities import axpy, axpby
 
-__all__ = ('IRK3', 'RK4', 'ETDRK4', 'ETD')
+__all__ = ('IRK3', 'RK4', 'ETDRK4', 'ETD', 'BS3', 'DOPRI5', 'ARK43', 'SBDF2',
+           'SBDF3', 'SBDF4', 'CNAB2', 'PhiFunctions')
 
 #pylint: disable=unused-variable
 
+def get_solver(mats):
+    """Return solver for tensor product matrices
+
+    Parameters
+    ----------
+        mats : TPMatrix or list of TPMatrix
+    """
+    mats = mats if isinstance(mats, list) else [mats]
+    if len(mats) == 1:
+        mat = mats[0]
+        if len(mat.naxes) == 0 and all(base.family() == 'fourier' for base in mat.space.bases):
+            return diagonal_solver(mat)
+        return mat.solve
+    if len(mats[0].naxes) == 1:
+        return la.SolverGeneric1ND(mats)
+    elif len(mats[0].naxes) == 2:
+        return la.SolverGeneric2ND(mats)
+    raise NotImplementedError
+
+def diagonal_solver(mat):
+    """Return solver for diagonal tensor product matrix of Fourier bases
+
+    The inverse of the diagonal is computed once, and the solver does not
+    allocate any temporary arrays.
+
+    Parameters
+    ----------
+        mat : TPMatrix
+    """
+    with np.errstate(divide='ignore'):
+        d = 1./mat.scale
+    d = np.where(np.isfinite(d), d, 0)
+    d = np.broadcast_to(d, mat.space.forward.output_array.shape).copy()
+    def solve(b, u=None):
+        if u is None:
+            u = Function(mat.space)
+        return axpby(d, b, 0, b, u)
+    return solve
+
+class PhiFunctions:
+    r"""Action of :math:`\varphi`-functions of non-diagonal linear operators
+
+    For the weak form :math:`M u_t = L u + N(u)`, the functions
+    :math:`\varphi_k(s h A)`, with :math:`A = M^{-1} L`, are computed through
+    the contour integral
+
+    .. math::
+
+        \varphi_k(s h A) M^{-1} b = \frac{1}{2 \pi i} \int_{\Gamma}
+            \frac{e^{s z}}{(s z)^k} (z M - h L)^{-1} b \, dz,
+
+    where :math:`\Gamma` is a Talbot contour that encloses the origin and the
+    spectrum of :math:`hA`. The integral is approximated with the trapezoidal
+    rule, leading to one shifted system :math:`z_j M - h L` for each
+    quadrature node. The solvers of these systems are factorized once, and
+    then reused for all :math:`k` and :math:`s`.
+
+    J. A. C. Weideman and L. N. Trefethen "Parabolic and hyperbolic contours
+    for computing the Bromwich integral", Math. Comp. 76, 1341-1356 (2007)
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : TPMatrix or list of TPMatrix
+            The weak form of the linear operator
+        dt : float
+            Timestep
+        nodes : int, optional
+            Number of quadrature nodes
+        shift : float, optional
+            Shift of the contour. Must be larger than the largest real part
+            of the eigenvalues of :math:`hA`.
+    """
+    def __init__(self, T, L, dt, nodes=32, shift=0):
+        L = L if isinstance(L, list) else [L]
+        self.mass = inner(TrialFunction(T), TestFunction(T))
+        th = -np.pi+(np.arange(nodes)+0.5)*2*np.pi/nodes
+        self.z = shift+nodes*(0.5017*th/np.tan(0.6407*th)-0.6122+0.2645j*th)
+        dz = nodes*(0.5017/np.tan(0.6407*th)-0.5017*0.6407*th/np.sin(0.6407*th)**2+0.2645j)
+        self.w = dz/(1j*nodes)
+        self.solvers = []
+        for z in self.z:
+            mats = []
+            for m, c in [(self.mass, z)]+[(l, -dt) for l in L]:
+                mats.append(copy.copy(m))
+                mats[-1].scale = m.scale*c
+            self.solvers.append(get_solver(mats))
+        self.rhs = np.zeros(T.forward.output_array.shape, dtype=complex)
+        self.x = np.zeros_like(self.rhs)
+        self.sol = np.zeros_like(self.rhs)
+
+    def weights(self, k, s=1):
+        r"""Return quadrature weights of :math:`\varphi_k(s h A)`
+
+        Parameters
+        ----------
+            k : int
+                The index of the :math:`\varphi`-function
+            s : float, optional
+                Scaling of the time step
+        """
+        return self.w*np.exp(s*self.z)/(s*self.z)**k
+
+    def __call__(self, terms, output_array):
+        r"""Return :math:`\sum_i \varphi_{k_i}(s_i h A) M^{-1} b_i`
+
+        Parameters
+        ----------
+            terms : sequence of 2-tuples
+                Each term is a tuple (w, b), where w are the quadrature
+                weights of one :math:`\varphi`-function, see :meth:`weights`,
+                and b is the array it acts on. Note that b must be multiplied
+                by the mass matrix.
+            output_array : array
+                Return array
+        """
+        self.sol[:] = 0
+        for j, solver in enumerate(self.solvers):
+            self.rhs[:] = 0
+            for w, b in terms:
+                self.rhs = axpy(w[j], b, self.rhs)
+            self.x = solver(self.rhs, self.x)
+            self.sol += self.x
+        output_array[:] = self.sol if output_array.dtype.char in 'FDG' else self.sol.real
+        return output_array
+
+    def matvec(self, u, output_array):
+        """Return mass matrix times u"""
+        return self.mass.matvec(u, output_array)
+
+
 class IntegratorBase:
     """Abstract base class for integrators
 
@@ -45,41 +197,213 @@ class IntegratorBase:
             To compute nonlinear part of right hand side
         update : function
                  To be called at the end of a timestep
+        cfl : function, optional
+              To compute the largest stable time step. Used for adaptive
+              time stepping.
         params : dictionary
-                 Any relevant keyword arguments
+                 Any relevant keyword arguments. Adaptive time stepping
+                 is controlled by the following keys
+
+                 - adaptive : bool - Whether or not to adapt the time step
+                 - dt_ratio : float - Ratio of the geometric ladder of time steps
+                 - dt_min, dt_max : float - Bounds for the time step
+                 - safety : float - Safety factor applied to the proposed time step
+                 - cache_size : int - Number of cached setups
+                 - rtol, atol : float - Tolerances for error based control
 
     """
+    # Names of attributes created by setup(dt). Cached for each time step
+    setup_attributes = ()
 
     def __init__(self, T,
                  L=None,
                  N=None,
                  update=None,
+                 cfl=None,
                  **params):
         _p = {'call_update': -1,
-              'dt': 0}
+              'dt': 0,
+              'adaptive': False,
+              'dt_ratio': 2**0.25,
+              'dt_min': 0,
+              'dt_max': np.inf,
+              'safety': 0.9,
+              'cache_size': 8,
+              'rtol': 1e-6,
+              'atol': 1e-8}
         _p.update(params)
         self.params = _p
         self.T = T
+        self._setups = OrderedDict()
+        self._dt0 = None
+        self._mass = None
+        self._parseval = None
+        self._work = None
         if L is not None:
             self.LinearRHS = types.MethodType(L, self)
         if N is not None:
             self.NonlinearRHS = types.MethodType(N, self)
         if update is not None:
             self.update = types.MethodType(update, self)
+        if cfl is not None:
+            self.cfl = types.MethodType(cfl, self)
 
     def update(self, u, u_hat, t, tstep, **par):
         pass
 
+    def broadcast(self, a):
+        """Return coefficient array a broadcasted to the shape of u_hat
+
+        Coefficients of the shape of the solution can be used by the
+        compiled in-place kernels :func:`.axpy` and :func:`.axpby`.
+
+        Parameters
+        ----------
+            a : number or array
+        """
+        shape = self.T.forward.output_array.shape
+        return np.broadcast_to(a, shape).copy()
+
     def LinearRHS(self, *args, **kwargs):
         pass
 
     def NonlinearRHS(self, *args, **kwargs):
         pass
 
+    def cfl(self, u, u_hat, **par):
+        """Return largest stable time step, or None if unknown"""
+        return None
+
     def setup(self, dt):
         """Set up solver"""
         pass
 
+    def set_dt(self, dt):
+        """Set time step and the corresponding setup
+
+        Setups are cached for the ``cache_size`` most recently used time
+        steps, and retrieved from the cache if possible.
+
+        Parameters
+        ----------
+            dt : float
+                Timestep
+        """
+        key = float('%.12e' % dt)
+        if key in self._setups:
+            self._setups.move_to_end(key)
+            for name, val in self._setups[key].items():
+                setattr(self, name, val)
+        else:
+            self.setup(dt)
+            self._setups[key] = {name: getattr(self, name) for name in self.setup_attributes}
+            while len(self._setups) > self.params['cache_size']:
+                self._setups.popitem(last=False)
+        self.params['dt'] = dt
+
+    def quantize_dt(self, dt):
+        """Return largest rung of the geometric time step ladder <= dt
+
+        Parameters
+        ----------
+            dt : float
+                Timestep
+        """
+        r = self.params['dt_ratio']
+        dt = min(max(dt, self.params['dt_min']), self.params['dt_max'])
+        n = np.floor(np.log(dt/self._dt0)/np.log(r)+1e-8)
+        return self._dt0*r**n
+
+    def propose_dt(self, u, u_hat, dt, err=None, order=None):
+        """Return new time step proposed by the controller
+
+        If an error estimate is given, then the time step is chosen such
+        that the estimate is of the size of the tolerance. Otherwise the
+        time step is computed from :meth:`cfl`. The returned time step is
+        a rung of the geometric ladder.
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Current timestep
+            err : float, optional
+                Estimated local error, scaled by tolerance
+            order : int, optional
+                Order of error estimate
+        """
+        dtn = self.cfl(u, u_hat, **self.params)
+        if dtn is not None:
+            dtn *= self.params['safety']
+        if err is not None:
+            fac = self.params['safety']*(1./max(err, 1e-10))**(1./(order+1))
+            dte = dt*min(5., max(0.2, fac))
+            dtn = dte if dtn is None else min(dte, dtn)
+        if dtn is None:
+            return dt
+        return self.quantize_dt(dtn)
+
+    def norm(self, u_hat, Mu_hat=None):
+        """Return weighted L2 norm of Function from its expansion coefficients
+
+        The norm is computed in spectral space as the square root of
+        conj(u_hat)*(M u_hat), where M is the mass matrix (including the
+        weights of the function spaces), taking into
+        account the Hermitian symmetric coefficients that are not stored for
+        real transforms.
+
+        Parameters
+        ----------
+            u_hat : array
+                Expansion coefficients
+            Mu_hat : array, optional
+                The mass matrix times u_hat, if already computed
+        """
+        if self._parseval is None:
+            self._mass = inner(TrialFunction(self.T), TestFunction(self.T))
+            self._parseval = np.ones(1)
+            for axis, base in enumerate(self.T.bases):
+                if isinstance(base, R2C):
+                    M = base.N//2+1
+                    last_conj_index = M-1 if base.N % 2 == 0 else M
+                    k = base.wavenumbers(bcast=False)[self.T.local_slice(True)[axis]]
+                    self._parseval = base.broadcast_to_ndims(np.where((k > 0) & (k < last_conj_index), 2., 1.))
+            self._parseval = self.broadcast(self._parseval).astype(u_hat.dtype)
+            self._work = np.zeros_like(u_hat)
+        if Mu_hat is None:
+            Mu_hat = self._mass.matvec(u_hat, self._work)
+        Mu_hat = np.multiply(self._parseval, Mu_hat, out=self._work)
+        s = np.vdot(u_hat, Mu_hat).real.item()
+        return np.sqrt(abs(self.T.comm.allreduce(s)))
+
+    def next_dt(self, u, u_hat, dt, t, end_time):
+        """Return time step to use for the next step, and set it up
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Current timestep
+            t : float
+                Current time
+            end_time : float
+                End time
+        """
+        if self._dt0 is None:
+            self._dt0 = dt
+        if self.params['adaptive']:
+            dt = self.propose_dt(u, u_hat, dt)
+            if t+dt > end_time:
+                dt = end_time-t
+        self.set_dt(dt)
+        return dt
+
     def solve(self, u, u_hat, dt, trange):
         """Integrate forward in end_time
 
@@ -109,16 +433,21 @@ class IRK3(IntegratorBase):
             To compute nonlinear part of right hand side
         update : function
                  To be called at the end of a timestep
+        cfl : function, optional
+              To compute the largest stable time step
         params : dictionary
                  Any relevant keyword arguments
 
     """
+    setup_attributes = ('solver', 'rhs_mats', 'mass')
+
     def __init__(self, T,
                  L=None,
                  N=None,
                  update=None,
+                 cfl=None,
                  **params):
-        IntegratorBase.__init__(self, T, L=L, N=N, update=update, **params)
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
         self.dU = Function(T)
         self.dU1 = Function(T)
         self.a = (8./15., 5./12., 3./4.)
@@ -126,8 +455,12 @@ class IRK3(IntegratorBase):
         self.c = (0., 8./15., 2./3., 1)
         self.solver = None
         self.rhs_mats = None
+        self.mass = None
         self.w0 = Function(self.T).v
+        self.w1 = Function(self.T)
         self.mask = self.T.get_mask_nyquist()
+        if self.mask is not None:
+            self.mask = self.broadcast(self.mask)
 
     def setup(self, dt):
         self.params['dt'] = dt
@@ -142,12 +475,7 @@ class IRK3(IntegratorBase):
         self.solver = []
         for rk in range(3):
             mats = inner(v, u - ((a[rk]+b[rk])*dt/2)*self.LinearRHS(u))
-            if len(mats[0].naxes) == 1:
-                self.solver.append(la.SolverGeneric1ND(mats))
-            elif len(mats[0].naxes) == 2:
-                self.solver.append(la.SolverGeneric2ND(mats))
-            else:
-                raise NotImplementedError
+            self.solver.append(get_solver(mats))
 
         self.rhs_mats = []
         for rk in range(3):
@@ -161,16 +489,28 @@ class IRK3(IntegratorBase):
         dt = self.params['dt']
         dU = self.NonlinearRHS(u, u_hat, dU, **self.params)
         dU.mask_nyquist(self.mask)
-        w1 = dU*a*dt + self.dU1*b*dt
+        w1 = axpby(a*dt, dU, b*dt, self.dU1, self.w1)
         self.dU1[:] = dU
         return w1
 
     def solve(self, u, u_hat, dt, trange):
-        if self.solver is None or abs(self.params['dt']-dt) > 1e-12:
-            self.setup(dt)
+        """Integrate forward in time
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Timestep
+            trange : two-tuple
+                Time and end time
+        """
         t, end_time = trange
         tstep = 0
         while t < end_time-1e-8:
+            dt = self.next_dt(u, u_hat, dt, t, end_time)
             for rk in range(3):
                 dU = self.compute_rhs(u, u_hat, self.dU, self.dU1, rk)
                 for mat in self.rhs_mats[rk]:
@@ -179,9 +519,10 @@ class IRK3(IntegratorBase):
                 u_hat = self.solver[rk](dU, u_hat)
                 u_hat.mask_nyquist(self.mask)
 
-            t += self.dt
+            t += dt
             tstep += 1
             self.update(u, u_hat, t, tstep, **self.params)
+        return u_hat
 
 
 class ETD(IntegratorBase):
@@ -199,37 +540,68 @@ class ETD(IntegratorBase):
             To compute nonlinear part of right hand side
         update : function
             To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
         params : dictionary
-            Any relevant keyword arguments
+            Any relevant keyword arguments. For non-diagonal linear
+            operators the :math:`\\varphi`-functions are computed with
+            :class:`PhiFunctions`, using keys
+
+            - contour_nodes : int - Number of quadrature nodes
+            - contour_shift : float - Shift of the contour
+
+    Note
+    ----
+    If the linear operator is non-diagonal, then N must return the weak form
+    of the nonlinear part, like for :class:`IRK3`, and the mass matrix is
+    available as the attribute ``mass``.
     """
 
+    setup_attributes = ('ehL', 'psi', 'phi')
+
     def __init__(self, T,
                  L=None,
                  N=None,
                  update=None,
+                 cfl=None,
                  **params):
-        IntegratorBase.__init__(self, T, L=L, N=N, update=update, **params)
+        params.setdefault('contour_nodes', 32)
+        params.setdefault('contour_shift', 0)
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
         self.dU = Function(T)
+        self.Mu_hat = None
         self.psi = None
         self.ehL = None
+        self.phi = None
+        self.mass = None
 
     def setup(self, dt):
         """Set up ETD ODE solver"""
         self.params['dt'] = dt
         L = self.LinearRHS(**self.params)
+        if isinstance(L, list) or (isinstance(L, TPMatrix) and not L.isidentity()):
+            self.phi = PhiFunctions(self.T, L, dt, self.params['contour_nodes'],
+                                    self.params['contour_shift'])
+            self.mass = self.phi.mass
+            self.ehL = self.phi.weights(0)
+            self.psi = dt*self.phi.weights(1)
+            if self.Mu_hat is None:
+                self.Mu_hat = Function(self.T)
+            return
+        self.phi = None
         if isinstance(L, TPMatrix):
             assert L.isidentity()
             L = L.scale
         L = np.atleast_1d(L)
         hL = L*dt
-        self.ehL = np.exp(hL)
+        self.ehL = self.broadcast(np.exp(hL))
         M = 50
-        psi = self.psi = np.zeros(hL.shape, dtype=np.float)
+        psi = np.zeros(hL.shape, dtype=float)
         for k in range(1, M+1):
             ll = hL+np.exp(np.pi*1j*(k-0.5)/M)
             psi += ((np.exp(ll)-1.)/ll).real
 
-        psi /= M
+        self.psi = self.broadcast(dt*psi/M)
 
     def solve(self, u, u_hat, dt, trange):
         """Integrate forward in time
@@ -245,15 +617,18 @@ class ETD(IntegratorBase):
             trange : two-tuple
                 Time and end time
         """
-        if self.psi is None or abs(self.params['dt']-dt) > 1e-12:
-            self.setup(dt)
         t, end_time = trange
         tstep = 0
         while t < end_time-1e-8:
+            dt = self.next_dt(u, u_hat, dt, t, end_time)
             t += dt
             tstep += 1
             self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
-            u_hat[:] = self.ehL*u_hat + dt*self.psi*self.dU
+            if self.phi is not None:
+                self.Mu_hat = self.phi.matvec(u_hat, self.Mu_hat)
+                u_hat = self.phi(((self.ehL, self.Mu_hat), (self.psi, self.dU)), u_hat)
+            else:
+                u_hat = axpby(self.ehL, u_hat, self.psi, self.dU, u_hat)
             self.update(u, u_hat, t, tstep, **self.params)
         return u_hat
 
@@ -273,39 +648,69 @@ class ETDRK4(IntegratorBase):
             To compute nonlinear part of right hand side
         update : function
             To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
         params : dictionary
-            Any relevant keyword arguments
+            Any relevant keyword arguments. For non-diagonal linear
+            operators the :math:`\\varphi`-functions are computed with
+            :class:`PhiFunctions`, using keys
+
+            - contour_nodes : int - Number of quadrature nodes
+            - contour_shift : float - Shift of the contour
+
+    Note
+    ----
+    If the linear operator is non-diagonal, then N must return the weak form
+    of the nonlinear part, like for :class:`IRK3`, and the mass matrix is
+    available as the attribute ``mass``.
     """
+    setup_attributes = ('ehL', 'ehL_h', 'psi', 'a', 'phi')
+
     def __init__(self, T,
                  L=None,
                  N=None,
                  update=None,
+                 cfl=None,
                  **params):
-        IntegratorBase.__init__(self, T, L=L, N=N, update=update, **params)
+        params.setdefault('contour_nodes', 32)
+        params.setdefault('contour_shift', 0)
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
         self.U_hat0 = Function(T)
         self.U_hat1 = Function(T)
         self.dU = Function(T)
         self.dU0 = Function(T)
         self.V2 = Function(T)
-        self.psi = np.zeros((4,)+self.U_hat0.shape, dtype=np.float)
+        self.psi = None
         self.a = None
-        self.b = [0.5, 0.5, 0.5]
         self.ehL = None
         self.ehL_h = None
+        self.phi = None
+        self.mass = None
 
     def setup(self, dt):
         """Set up ETDRK4 ODE solver"""
         self.params['dt'] = dt
         L = self.LinearRHS(**self.params)
+        if isinstance(L, list) or (isinstance(L, TPMatrix) and not L.isidentity()):
+            phi = self.phi = PhiFunctions(self.T, L, dt, self.params['contour_nodes'],
+                                          self.params['contour_shift'])
+            self.mass = phi.mass
+            self.ehL = phi.weights(0)
+            self.ehL_h = phi.weights(0, 0.5)
+            self.psi = 0.5*dt*phi.weights(1, 0.5)
+            psi = [dt*phi.weights(k) for k in (1, 2, 3)]
+            self.a = [psi[0]-3*psi[1]+4*psi[2], 2*psi[1]-4*psi[2], -psi[1]+4*psi[2]]
+            return
+        self.phi = None
         if isinstance(L, TPMatrix):
             assert L.isidentity()
             L = L.scale
         L = np.atleast_1d(L)
         hL = L*dt
-        self.ehL = np.exp(hL)
-        self.ehL_h = np.exp(hL/2.)
+        self.ehL = self.broadcast(np.exp(hL))
+        self.ehL_h = self.broadcast(np.exp(hL/2.))
         M = 50
-        psi = self.psi = np.zeros((4,) + hL.shape, dtype=np.float)
+        psi = np.zeros((4,) + hL.shape, dtype=float)
         for k in range(1, M+1):
             ll = hL+np.exp(np.pi*1j*(k-0.5)/M)
             psi[0] += ((np.exp(ll)-1.)/ll).real
@@ -314,11 +719,12 @@ class ETDRK4(IntegratorBase):
             ll2 = hL/2.+np.exp(np.pi*1j*(k-0.5)/M)
             psi[3] += ((np.exp(ll2)-1.)/(ll2)).real
 
-        psi /= M
-        a = [psi[0]-3*psi[1]+4*psi[2]]
-        a.append(2*psi[1]-4*psi[2])
-        a.append(2*psi[1]-4*psi[2])
-        a.append(-psi[1]+4*psi[2])
+        psi *= dt/M
+        self.psi = self.broadcast(0.5*psi[3])
+        a = [self.broadcast(psi[0]-3*psi[1]+4*psi[2])]
+        a.append(self.broadcast(2*psi[1]-4*psi[2]))
+        a.append(a[1])
+        a.append(self.broadcast(-psi[1]+4*psi[2]))
         self.a = a
 
     def solve(self, u, u_hat, dt, trange):
@@ -335,32 +741,69 @@ class ETDRK4(IntegratorBase):
             trange : two-tuple
                 Time and end time
         """
-        if self.a is None or abs(self.params['dt']-dt) > 1e-12:
-            self.setup(dt)
         t, end_time = trange
         tstep = 0
         while t < end_time-1e-8:
+            dt = self.next_dt(u, u_hat, dt, t, end_time)
             t += dt
             tstep += 1
+            if self.phi is not None:
+                u_hat = self.step_nondiagonal(u, u_hat)
+                self.update(u, u_hat, t, tstep, **self.params)
+                continue
 
-            self.U_hat0[:] = u_hat*self.ehL_h
-            self.U_hat1[:] = u_hat*self.ehL
+            self.U_hat0 = axpby(self.ehL_h, u_hat, 0., u_hat, self.U_hat0)
+            self.U_hat1 = axpby(self.ehL, u_hat, 0., u_hat, self.U_hat1)
             for rk in range(4):
                 self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
+                self.U_hat1 = axpy(self.a[rk], self.dU, self.U_hat1)
                 if rk < 2:
-                    u_hat[:] = self.U_hat0 + self.b[rk]*dt*self.psi[3]*self.dU
+                    u_hat = axpby(1., self.U_hat0, self.psi, self.dU, u_hat)
                 elif rk == 2:
-                    u_hat[:] = self.ehL_h*self.V2 + self.b[rk]*dt*self.psi[3]*(2*self.dU-self.dU0)
+                    self.dU *= 2
+                    self.dU -= self.dU0
+                    u_hat = axpby(self.ehL_h, self.V2, self.psi, self.dU, u_hat)
 
                 if rk == 0:
                     self.dU0[:] = self.dU
                     self.V2[:] = u_hat
 
-                self.U_hat1 += self.a[rk]*dt*self.dU
             u_hat[:] = self.U_hat1
             self.update(u, u_hat, t, tstep, **self.params)
         return u_hat
 
+    def step_nondiagonal(self, u, u_hat):
+        """Take one step with a non-diagonal linear operator
+
+        The four stages of Cox and Matthews are computed with
+        :class:`PhiFunctions`, using one contour integral per stage.
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+        """
+        phi = self.phi
+        self.U_hat0 = phi.matvec(u_hat, self.U_hat0)
+        self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
+        self.dU0[:] = self.dU
+        u_hat = phi(((self.ehL_h, self.U_hat0), (self.psi, self.dU0)), u_hat)
+        self.U_hat1 = phi.matvec(u_hat, self.U_hat1)
+        self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
+        self.V2[:] = self.dU
+        u_hat = phi(((self.ehL_h, self.U_hat0), (self.psi, self.dU)), u_hat)
+        self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
+        self.V2 += self.dU
+        self.dU *= 2
+        self.dU -= self.dU0
+        u_hat = phi(((self.ehL_h, self.U_hat1), (self.psi, self.dU)), u_hat)
+        self.dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
+        u_hat = phi(((self.ehL, self.U_hat0), (self.a[0], self.dU0),
+                     (self.a[1], self.V2), (self.a[2], self.dU)), u_hat)
+        return u_hat
+
 
 class RK4(IntegratorBase):
     """Regular 4'th order Runge-Kutta integrator
@@ -374,6 +817,8 @@ class RK4(IntegratorBase):
             To compute nonlinear part of right hand side
         update : function
             To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
         params : dictionary
             Any relevant keyword arguments
     """
@@ -381,8 +826,9 @@ class RK4(IntegratorBase):
                  L=None,
                  N=None,
                  update=None,
+                 cfl=None,
                  **params):
-        IntegratorBase.__init__(self, T, L=L, N=N, update=update, **params)
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
         self.U_hat0 = Function(T)
         self.U_hat1 = Function(T)
         self.dU = Function(T)
@@ -407,22 +853,612 @@ class RK4(IntegratorBase):
             trange : two-tuple
                 Time and end time
         """
-        if self.a is None or abs(self.params['dt']-dt) > 1e-12:
-            self.setup(dt)
         t, end_time = trange
         tstep = 0
         L = self.LinearRHS(**self.params)
+        if isinstance(L, TPMatrix):
+            assert L.isidentity()
+            L = L.scale
+        if L is not None:
+            L = self.broadcast(L)
         while t < end_time-1e-8:
+            dt = self.next_dt(u, u_hat, dt, t, end_time)
             t += dt
             tstep += 1
             self.U_hat0[:] = self.U_hat1[:] = u_hat
             for rk in range(4):
                 dU = self.NonlinearRHS(u, u_hat, self.dU, **self.params)
-                if L:
-                    dU += L*u_hat
+                if L is not None:
+                    dU = axpy(L, u_hat, dU)
                 if rk < 3:
-                    u_hat[:] = self.U_hat0 + self.b[rk]*dt*dU
-                self.U_hat1 += self.a[rk]*dt*dU
-            u_hat[:] = self. U_hat1
+                    u_hat = axpby(1., self.U_hat0, self.b[rk]*dt, dU, u_hat)
+                self.U_hat1 = axpy(self.a[rk]*dt, dU, self.U_hat1)
+            u_hat[:] = self.U_hat1
             self.update(u, u_hat, t, tstep, **self.params)
         return u_hat
+
+
+class RKEmbedded(IntegratorBase):
+    """Base class for explicit embedded Runge-Kutta pairs with error control
+
+    The local error is estimated from the difference between the solutions
+    of the two methods of the pair, and its norm (see
+    :meth:`IntegratorBase.norm`) is scaled with the tolerance
+    ``atol + rtol*norm(u_hat)``. Steps with scaled error larger than one
+    are rejected. Adaptive time stepping is on by default.
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    # Butcher tableau. Subclasses set A, b, bhat, c, the order of the error
+    # estimate and whether the last stage is the first stage of the next step
+    A = None
+    b = None
+    bhat = None
+    c = None
+    order = None
+    fsal = False
+    setup_attributes = ('L',)
+
+    def __init__(self, T,
+                 L=None,
+                 N=None,
+                 update=None,
+                 cfl=None,
+                 **params):
+        params.setdefault('adaptive', True)
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
+        s = len(self.b)
+        self.U_hat0 = Function(T)
+        self.U_hat1 = Function(T)
+        self.E = Function(T)
+        self.K = [Function(T) for i in range(s)]
+        self.L = None
+        self._fsal_valid = False
+        self.accepted = 0
+        self.rejected = 0
+
+    def setup(self, dt):
+        """Set up embedded Runge-Kutta solver"""
+        self.params['dt'] = dt
+        L = self.LinearRHS(**self.params)
+        if isinstance(L, TPMatrix):
+            assert L.isidentity()
+            L = L.scale
+        self.L = None if L is None else self.broadcast(L)
+
+    def compute_rhs(self, u, u_hat, dU):
+        dU = self.NonlinearRHS(u, u_hat, dU, **self.params)
+        if self.L is not None:
+            dU = axpy(self.L, u_hat, dU)
+        return dU
+
+    def step(self, u, u_hat, dt):
+        """Take one step from u_hat and return scaled error estimate
+
+        The new solution is stored in ``self.U_hat1``, whereas u_hat is left
+        unchanged.
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space, used as work array
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Timestep
+        """
+        A, b, bhat = self.A, self.b, self.bhat
+        K = self.K
+        self.U_hat0[:] = u_hat
+        for i in range(len(b)):
+            if i == 0 and self.fsal and self._fsal_valid:
+                continue
+            w = self.U_hat1
+            w[:] = self.U_hat0
+            for j in range(i):
+                if A[i][j] != 0:
+                    w = axpy(dt*A[i][j], K[j], w)
+            K[i] = self.compute_rhs(u, w, K[i])
+        self.U_hat1[:] = self.U_hat0
+        self.E[:] = 0
+        for j in range(len(b)):
+            if b[j] != 0:
+                self.U_hat1 = axpy(dt*b[j], K[j], self.U_hat1)
+            if b[j] != bhat[j]:
+                self.E = axpy(dt*(b[j]-bhat[j]), K[j], self.E)
+        return self.error(self.U_hat0, self.U_hat1, self.E)
+
+    def error(self, u0, u1, e, Me=None):
+        """Return scaled error norm
+
+        Parameters
+        ----------
+            u0, u1 : arrays
+                Solution at start and end of step
+            e : array
+                Error estimate
+            Me : array, optional
+                Mass matrix times e
+        """
+        sc = self.params['atol'] + self.params['rtol']*max(self.norm(u0), self.norm(u1))
+        return self.norm(e, Me)/sc
+
+    def accept(self):
+        """Prepare for next step after an accepted step"""
+        if self.fsal:
+            self.K[0], self.K[-1] = self.K[-1], self.K[0]
+            self._fsal_valid = True
+
+    def solve(self, u, u_hat, dt, trange):
+        """Integrate forward in time
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Initial timestep
+            trange : two-tuple
+                Time and end time
+        """
+        t, end_time = trange
+        tstep = 0
+        if self._dt0 is None:
+            self._dt0 = dt
+        while t < end_time-1e-8:
+            dt = min(dt, end_time-t)
+            self.set_dt(dt)
+            err = self.step(u, u_hat, dt)
+            if self.params['adaptive'] and err > 1:
+                self.rejected += 1
+                dt = self.propose_dt(u, u_hat, dt, err, self.order)
+                continue
+            self.accepted += 1
+            u_hat[:] = self.U_hat1
+            self.accept()
+            t += dt
+            tstep += 1
+            self.update(u, u_hat, t, tstep, **self.params)
+            if self.params['adaptive']:
+                dt = self.propose_dt(u, u_hat, dt, err, self.order)
+        return u_hat
+
+
+class BS3(RKEmbedded):
+    """Bogacki-Shampine 3(2) pair with error control
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    A = ((0, 0, 0, 0),
+         (1/2, 0, 0, 0),
+         (0, 3/4, 0, 0),
+         (2/9, 1/3, 4/9, 0))
+    b = (2/9, 1/3, 4/9, 0)
+    bhat = (7/24, 1/4, 1/3, 1/8)
+    c = (0, 1/2, 3/4, 1)
+    order = 2
+    fsal = True
+
+
+class DOPRI5(RKEmbedded):
+    """Dormand-Prince 5(4) pair with error control
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    A = ((0, 0, 0, 0, 0, 0, 0),
+         (1/5, 0, 0, 0, 0, 0, 0),
+         (3/40, 9/40, 0, 0, 0, 0, 0),
+         (44/45, -56/15, 32/9, 0, 0, 0, 0),
+         (19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0, 0),
+         (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0, 0),
+         (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0))
+    b = (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0)
+    bhat = (5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40)
+    c = (0, 1/5, 3/10, 4/5, 8/9, 1, 1)
+    order = 4
+    fsal = True
+
+
+class ARK43(RKEmbedded):
+    """Additive Runge-Kutta 4(3) IMEX pair with error control
+
+    The linear part is treated implicitly with an ESDIRK method and the
+    nonlinear part explicitly. All implicit stages use the same diagonal
+    coefficient, so only one left hand side is factorized for each time
+    step. This is ARK4(3)6L[2]SA of
+
+    C. A. Kennedy and M. H. Carpenter "Additive Runge-Kutta schemes for
+    convection-diffusion-reaction equations", Appl. Numer. Math. 44 (2003)
+
+    Like for :class:`IRK3`, L is a function of TrialFunction(T) and N
+    returns the nonlinear right hand side tested with TestFunction(T).
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    gamma = 1/4
+    A = ((0, 0, 0, 0, 0, 0),
+         (1/2, 0, 0, 0, 0, 0),
+         (13861/62500, 6889/62500, 0, 0, 0, 0),
+         (-116923316275/2393684061468, -2731218467317/15368042101831,
+          9408046702089/11113171139209, 0, 0, 0),
+         (-451086348788/2902428689909, -2682348792572/7519795681897,
+          12662868775082/11960479115383, 3355817975965/11060851509271, 0, 0),
+         (647845179188/3216320057751, 73281519250/8382639484533,
+          552539513391/3454668386233, 3354512671639/8306763924573,
+          4040/17871, 0))
+    AI = ((0, 0, 0, 0, 0, 0),
+          (1/4, 1/4, 0, 0, 0, 0),
+          (8611/62500, -1743/31250, 1/4, 0, 0, 0),
+          (5012029/34652500, -654441/2922500, 174375/388108, 1/4, 0, 0),
+          (15267082809/155376265600, -71443401/120774400,
+           730878875/902184768, 2285395/8070912, 1/4, 0),
+          (82889/524892, 0, 15625/83664, 69875/102672, -2260/8211, 1/4))
+    b = (82889/524892, 0, 15625/83664, 69875/102672, -2260/8211, 1/4)
+    bhat = (4586570599/29645900160, 0, 178811875/945068544,
+            814220225/1159782912, -3700637/11593932, 61727/225920)
+    c = (0, 1/2, 83/250, 31/50, 17/20, 1)
+    order = 3
+    setup_attributes = ('solver',)
+
+    def __init__(self, T,
+                 L=None,
+                 N=None,
+                 update=None,
+                 cfl=None,
+                 **params):
+        RKEmbedded.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
+        self.LU = [Function(T) for i in range(len(self.b))]
+        self.Mu0 = Function(T)
+        self.rhs = Function(T)
+        self.w0 = Function(T)
+        self.solver = None
+        self.mass = None
+        self.mass_solver = None
+        self.linear_mats = None
+
+    def setup(self, dt):
+        """Set up ARK43 solver"""
+        self.params['dt'] = dt
+        u = TrialFunction(self.T)
+        v = TestFunction(self.T)
+        self.solver = get_solver(inner(v, u - (self.gamma*dt)*self.LinearRHS(u)))
+        if self.mass_solver is None:
+            self.mass = inner(u, v)
+            self.mass_solver = get_solver(self.mass)
+            mats = inner(v, self.LinearRHS(u))
+            self.linear_mats = mats if isinstance(mats, list) else [mats]
+
+    def step(self, u, u_hat, dt):
+        """Take one step from u_hat and return scaled error estimate
+
+        The new solution is stored in ``self.U_hat1``, whereas u_hat is left
+        unchanged.
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space, used as work array
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Timestep
+        """
+        A, AI, b, bhat = self.A, self.AI, self.b, self.bhat
+        K, LU = self.K, self.LU
+        Mu0 = self.mass.matvec(u_hat, self.Mu0)
+        w = self.U_hat0
+        for i in range(len(b)):
+            if i == 0:
+                w[:] = u_hat
+            else:
+                rhs = self.rhs
+                rhs[:] = Mu0
+                for j in range(i):
+                    if A[i][j] != 0:
+                        rhs = axpy(dt*A[i][j], K[j], rhs)
+                    if AI[i][j] != 0:
+                        rhs = axpy(dt*AI[i][j], LU[j], rhs)
+                w = self.solver(rhs, w)
+            K[i] = self.NonlinearRHS(u, w, K[i], **self.params)
+            LU[i].fill(0)
+            for mat in self.linear_mats:
+                LU[i] = axpy(1, mat.matvec(w, self.w0), LU[i])
+
+        # Mass matrix times new solution and error estimate
+        rhs = self.rhs
+        rhs[:] = Mu0
+        self.w0[:] = 0
+        for j in range(len(b)):
+            rhs = axpy(dt*b[j], K[j], rhs)
+            rhs = axpy(dt*b[j], LU[j], rhs)
+            if b[j] != bhat[j]:
+                self.w0 = axpy(dt*(b[j]-bhat[j]), K[j], self.w0)
+                self.w0 = axpy(dt*(b[j]-bhat[j]), LU[j], self.w0)
+        self.U_hat1 = self.mass_solver(rhs, self.U_hat1)
+        rhs[:] = self.w0
+        self.E = self.mass_solver(rhs, self.E)
+        return self.error(u_hat, self.U_hat1, self.E, self.w0)
+
+
+class IMEXMultistep(IntegratorBase):
+    r"""Base class for implicit-explicit multistep integrators
+
+    The linear part is treated implicitly and the nonlinear part explicitly.
+    A step of order m solves
+
+    .. math::
+
+        (\alpha_0 M - \theta dt L) u^{n+1} = -\sum_{j=1}^{m} \alpha_j M u^{n+1-j}
+            + (1-\theta) dt L u^n + dt \sum_{j=1}^{m} \beta_j N(u^{n+1-j})
+
+    where M is the mass matrix. Only one left hand side is factorized for a
+    given time step and the nonlinear right hand side is computed once per
+    step. The history is stored in buffers allocated once. The first m-1
+    steps, that build the history, are taken with :class:`ARK43`.
+
+    Like for :class:`IRK3`, L is a function of TrialFunction(T) and N
+    returns the nonlinear right hand side tested with TestFunction(T).
+
+    Note
+    ----
+    The coefficients assume constant time steps. If the time step changes,
+    then the history is built anew.
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    # Coefficients (alpha_0, ..., alpha_m) and (beta_1, ..., beta_m)
+    alpha = None
+    beta = None
+    theta = 1
+    setup_attributes = ('solver',)
+
+    def __init__(self, T,
+                 L=None,
+                 N=None,
+                 update=None,
+                 cfl=None,
+                 **params):
+        IntegratorBase.__init__(self, T, L=L, N=N, update=update, cfl=cfl, **params)
+        self.order = len(self.beta)
+        self.Mu = [Function(T) for i in range(self.order)]
+        self.dU = [Function(T) for i in range(self.order)]
+        self.rhs = Function(T)
+        self.w0 = Function(T)
+        self.solver = None
+        self.mass = None
+        self.linear_mats = None
+        self.starter = None
+        self.nsteps = 0
+
+    def setup(self, dt):
+        """Set up IMEX multistep solver"""
+        self.params['dt'] = dt
+        u = TrialFunction(self.T)
+        v = TestFunction(self.T)
+        self.solver = get_solver(inner(v, self.alpha[0]*u - (self.theta*dt)*self.LinearRHS(u)))
+        if self.mass is None:
+            self.mass = inner(u, v)
+            if self.theta != 1:
+                mats = inner(v, self.LinearRHS(u))
+                self.linear_mats = mats if isinstance(mats, list) else [mats]
+
+    def start(self, u, u_hat, dt):
+        """Take one step with :class:`ARK43`, used to build the history
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Timestep
+        """
+        if self.starter is None:
+            self.starter = ARK43(self.T)
+            self.starter.LinearRHS = self.LinearRHS
+            self.starter.NonlinearRHS = self.NonlinearRHS
+        # The starter has its own params, since its setups are cached for
+        # its own time steps
+        self.starter.params.update({k: v for k, v in self.params.items()
+                                    if k not in ('dt', 'adaptive')})
+        self.starter.set_dt(dt)
+        self.starter.step(u, u_hat, dt)
+        u_hat[:] = self.starter.U_hat1
+        return u_hat
+
+    def solve(self, u, u_hat, dt, trange):
+        """Integrate forward in time
+
+        Parameters
+        ----------
+            u : array
+                The solution array in physical space
+            u_hat : array
+                The solution array in spectral space
+            dt : float
+                Timestep
+            trange : two-tuple
+                Time and end time
+        """
+        t, end_time = trange
+        tstep = 0
+        alpha, beta = self.alpha, self.beta
+        while t < end_time-1e-8:
+            dt0 = self.params['dt']
+            dt = self.next_dt(u, u_hat, dt, t, end_time)
+            if dt != dt0 or self.nsteps == 0:
+                self.nsteps = 0
+                self.Mu[0] = self.mass.matvec(u_hat, self.Mu[0])
+
+            # Newest nonlinear term first
+            self.dU.insert(0, self.dU.pop())
+            self.dU[0] = self.NonlinearRHS(u, u_hat, self.dU[0], **self.params)
+            if self.nsteps < self.order-1:
+                u_hat = self.start(u, u_hat, dt)
+            else:
+                rhs = self.rhs
+                rhs.fill(0)
+                for j in range(self.order):
+                    rhs = axpy(-alpha[j+1], self.Mu[j], rhs)
+                    rhs = axpy(dt*beta[j], self.dU[j], rhs)
+                if self.theta != 1:
+                    for mat in self.linear_mats:
+                        rhs = axpy((1-self.theta)*dt, mat.matvec(u_hat, self.w0), rhs)
+                u_hat = self.solver(rhs, u_hat)
+
+            # Newest mass matrix times solution first
+            self.Mu.insert(0, self.Mu.pop())
+            self.Mu[0] = self.mass.matvec(u_hat, self.Mu[0])
+            self.nsteps += 1
+            t += dt
+            tstep += 1
+            self.update(u, u_hat, t, tstep, **self.params)
+        return u_hat
+
+
+class SBDF2(IMEXMultistep):
+    """Semi-implicit backward differentiation formula of second order
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    alpha = (3/2, -2, 1/2)
+    beta = (2, -1)
+
+
+class SBDF3(IMEXMultistep):
+    """Semi-implicit backward differentiation formula of third order
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    alpha = (11/6, -3, 3/2, -1/3)
+    beta = (3, -3, 1)
+
+
+class SBDF4(IMEXMultistep):
+    """Semi-implicit backward differentiation formula of fourth order
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    alpha = (25/12, -4, 3, -4/3, 1/4)
+    beta = (4, -6, 4, -1)
+
+
+class CNAB2(IMEXMultistep):
+    """Crank-Nicolson Adams-Bashforth of second order
+
+    Parameters
+    ----------
+        T : TensorProductSpace
+        L : function of TrialFunction(T)
+            To compute linear part of right hand side
+        N : function
+            To compute nonlinear part of right hand side
+        update : function
+            To be called at the end of a timestep
+        cfl : function, optional
+            To compute the largest stable time step
+        params : dictionary
+            Any relevant keyword arguments
+    """
+    alpha = (1, -1, 0)
+    beta = (3/2, -1/2)
+    theta = 1/2
@@ -1,7 +1,6 @@
 import numpy as np
 from mpi4py import MPI
-
-comm = MPI.COMM_WORLD
+from shenfun.fourier.bases import R2C
 
 __all__ = ['LagrangianParticles']
 
@@ -16,24 +15,243 @@ class LagrangianParticles:
         Time step
     u_hat : :class:`.Function`
         Spectral Galerkin :class:`.Function` for the Eulerian velocity
+    integrator : str, optional
+        The time integrator. Either 'euler' (forward Euler), 'rk2' (Heun's
+        method) or 'rk4' (classical fourth order Runge-Kutta)
+    distribute : bool, optional
+        If False, then all processors hold all particles. If True, then the
+        particles are owned by the processor whose subdomain of the physical
+        space pencil contains the particle, and particles migrate between
+        processors as they move. In the latter case points must contain only
+        the particles of the calling processor, which are sent to their
+        owners on creation.
+    periodic : bool, optional
+        Whether or not to wrap particles leaving the domain along periodic
+        (Fourier) axes back into the domain.
+    blocksize : int, optional
+        The number of particles evaluated in one go. If None, then use
+        blocks leading to work arrays of about 2**20 items.
+
+    Note
+    ----
+    All velocity components are evaluated with the same basis functions,
+    which are computed for one block of particles at the time, such that
+    the memory use is bounded by the blocksize.
+
+    Each processor evaluates the particles using only its locally owned
+    expansion coefficients, and the velocities are summed over all
+    processors. With distribute=False all processors evaluate all particles,
+    and the velocities are summed with an Allreduce. With distribute=True
+    the positions and partial velocities of the particles owned by a
+    processor are passed around a ring of all processors, each adding its
+    contribution, until they return to the owner. The memory use of a
+    processor is then proportional to the number of particles it owns, and
+    the velocity coefficients are never gathered.
 
     """
 
-    def __init__(self, points, dt, u_hat):
+    def __init__(self, points, dt, u_hat, integrator='euler', distribute=False,
+                 periodic=False, blocksize=None):
+        assert integrator in self.tableaus
         self.x = points
         self.u_hat = u_hat
         self.dt = dt
+        self.integrator = integrator
+        self.distribute = distribute
+        self.periodic = periodic
+        self.blocksize = blocksize
+        self.T = u_hat.function_space().flatten()[0]
+        self.comm = self.T.comm
         self.up = np.zeros(self.x.shape)
+        self.ids = np.arange(points.shape[1])
+        self._k = None
+        self._slices = list(self.T.local_slice(True))
+        if distribute:
+            offset = self.comm.exscan(points.shape[1])
+            self.ids += offset if offset is not None else 0
+            self._setup_ownership()
+            self.migrate()
+
+    # Coefficients (a, b) of explicit Runge-Kutta methods
+    tableaus = {
+        'euler': ((), (1,)),
+        'rk2': (((1,),), (0.5, 0.5)),
+        'rk4': (((0.5,), (0, 0.5), (0, 0, 1)), (1/6, 1/3, 1/3, 1/6))
+    }
 
     def step(self):
-        up = self.rhs()
-        self.x[:] = self.x + self.dt*up
+        """Integrate particles one time step"""
+        a, b = self.tableaus[self.integrator]
+        if self._k is None or self._k.shape[1:] != self.x.shape:
+            self._k = np.zeros((len(b),)+self.x.shape)
+        k = self._k
+        self.rhs()
+        k[0] = self.up
+        for s, a_s in enumerate(a):
+            xs = self.x.copy()
+            for j, a_sj in enumerate(a_s):
+                if a_sj != 0:
+                    xs += self.dt*a_sj*k[j]
+            self.rhs(xs, k[s+1])
+        for j, b_j in enumerate(b):
+            self.x += self.dt*b_j*k[j]
+        if self.periodic:
+            self.wrap()
+        if self.distribute:
+            self.migrate()
+
+    def rhs(self, x=None, output_array=None):
+        """Return velocity at particle positions
+
+        Parameters
+        ----------
+        x : array, optional
+            Particle positions. If not provided use the current positions
+            and store the result in self.up
+        output_array : array, optional
+            Return array
+        """
+        if x is None:
+            x = self.x
+            output_array = self.up
+        if output_array is None:
+            output_array = np.zeros((self.u_hat.shape[0], x.shape[1]))
+        output_array.fill(0)
+        if not self.distribute:
+            self._evaluate(x, output_array)
+            self.comm.Allreduce(MPI.IN_PLACE, output_array, op=MPI.SUM)
+            return output_array
+
+        # Pass positions and partial velocities around the ring of processors
+        comm = self.comm
+        size, rank = comm.Get_size(), comm.Get_rank()
+        dest, source = (rank+1) % size, (rank-1) % size
+        D, n = x.shape[0], x.shape[1]
+        nmax = comm.allreduce(n, op=MPI.MAX)
+        buf = np.zeros((2, D, nmax))
+        buf[0, :, :n] = x
+        for i in range(size):
+            self._evaluate(buf[0, :, :n], buf[1, :output_array.shape[0], :n])
+            if size > 1:
+                n = comm.sendrecv(n, dest=dest, source=source)
+                comm.Sendrecv_replace(buf, dest=dest, source=source)
+        output_array[:] = buf[1, :output_array.shape[0], :n]
+        return output_array
+
+    def _evaluate(self, x, output_array):
+        """Add velocity of the locally owned expansion coefficients at x to
+        output_array
+
+        Parameters
+        ----------
+        x : array
+            Particle positions
+        output_array : array
+            Velocities
+        """
+        # Put the component axis last, shared by all contractions
+        c = np.moveaxis(self.u_hat.__array__(), 0, -1)
+        npart = x.shape[1]
+        blocksize = self.blocksize
+        if blocksize is None:
+            blocksize = max(1, 2**20//max(1, int(np.prod(c.shape[1:]))))
+        for i0 in range(0, npart, blocksize):
+            block = slice(i0, min(i0+blocksize, npart))
+            rows = self._basis_rows(x[:, block])
+            out = np.tensordot(rows[0], c, (1, 0))
+            for P in rows[1:]:
+                out = np.einsum('ij...,ij->i...', out, P)
+            output_array[:, block] += out.T.real
+        return output_array
+
+    def _basis_rows(self, x):
+        """Return list of basis matrices, one for each axis, for particles at x
+
+        The columns of the matrices correspond to the locally owned expansion
+        coefficients.
+
+        Parameters
+        ----------
+        x : array
+            Particle positions
+        """
+        rows = []
+        for axis, base in enumerate(self.T.bases):
+            sl = self._slices[axis]
+            X = base.map_reference_domain(x[axis])
+            P = base.evaluate_basis_all(x=X, argument=1)[:, sl]
+            if isinstance(base, R2C):
+                # Account for the Hermitian symmetric part that is not stored
+                M = base.N//2+1
+                last_conj_index = M-1 if base.N % 2 == 0 else M
+                k = np.arange(sl.start, sl.start+P.shape[1])
+                P = P*np.where((k > 0) & (k < last_conj_index), 2, 1)
+            rows.append(np.ascontiguousarray(P))
+        return rows
+
+    def wrap(self):
+        """Wrap particles into the domain along periodic axes"""
+        for axis, base in enumerate(self.T.bases):
+            if base.family() == 'fourier':
+                a, b = base.domain
+                self.x[axis] = a + np.mod(self.x[axis]-a, b-a)
+
+    def _setup_ownership(self):
+        """Compute subdomains of the physical space pencils"""
+        pencil = self.T.forward.input_pencil
+        self._bounds = []
+        self._order = []
+        coords = []
+        for axis, base in enumerate(self.T.bases):
+            subcomm = pencil.subcomm[axis]
+            coords.append(subcomm.Get_rank())
+            start = pencil.substart[axis]
+            stop = start + pencil.subshape[axis]
+            mesh = base.mesh(bcast=False, map_true_domain=True)
+            lohi = np.array([(mesh[i0:i1].min(), mesh[i0:i1].max())
+                             for i0, i1 in subcomm.allgather((start, stop))])
+            order = np.argsort(lohi[:, 0])
+            lohi = lohi[order]
+            self._bounds.append(0.5*(lohi[1:, 0]+lohi[:-1, 1]))
+            self._order.append(order)
+        self._ranks = {c: r for r, c in enumerate(self.comm.allgather(tuple(coords)))}
+
+    def owner(self, x=None):
+        """Return rank of processors owning the particles
+
+        Parameters
+        ----------
+        x : array, optional
+            Particle positions. If not provided use the current positions
+        """
+        x = self.x if x is None else x
+        coords = [order[np.searchsorted(bounds, x[axis])]
+                  for axis, (bounds, order) in enumerate(zip(self._bounds, self._order))]
+        return np.array([self._ranks[c] for c in zip(*coords)], dtype=int)
 
-    def rhs(self):
-        return self.u_hat.eval(self.x, output_array=self.up)
+    def migrate(self):
+        """Send particles (positions, velocities and ids) to the processors
+        that own them"""
+        comm = self.comm
+        D = self.x.shape[0]
+        dest = self.owner()
+        order = np.argsort(dest, kind='stable')
+        sendcounts = np.bincount(dest, minlength=comm.Get_size())
+        recvcounts = np.zeros_like(sendcounts)
+        comm.Alltoall(sendcounts, recvcounts)
+        xu = np.ascontiguousarray(np.vstack((self.x, self.up))[:, order].T)
+        xur = np.zeros((recvcounts.sum(), 2*D))
+        comm.Alltoallv([xu, sendcounts*2*D], [xur, recvcounts*2*D])
+        ids = np.ascontiguousarray(self.ids[order])
+        idr = np.zeros(recvcounts.sum(), dtype=ids.dtype)
+        comm.Alltoallv([ids, sendcounts], [idr, recvcounts])
+        self.x = xur[:, :D].T.copy()
+        self.up = xur[:, D:].T.copy()
+        self.ids = idr
 
 if __name__ == '__main__':
     from shenfun import *
+    comm = MPI.COMM_WORLD
     import sympy as sp
     import matplotlib.pyplot as plt
     import h5py
@@ -0,0 +1,204 @@
+"""
+Module for evaluating Functions repeatedly at a fixed set of points
+"""
+import numpy as np
+from mpi4py import MPI
+from shenfun.fourier.bases import R2C
+
+comm = MPI.COMM_WORLD
+
+__all__ = ['Probe']
+
+class Probe:
+    """Class for evaluating Functions at fixed probe locations
+
+    The basis functions of each axis are evaluated at the probe locations
+    once, and stored. Evaluating a :class:`.Function` is then only a matter of
+    small tensor contractions with the locally owned expansion coefficients,
+    followed by a reduction over all processors.
+
+    Parameters
+    ----------
+    space : :class:`.TensorProductSpace`, :class:`.CompositeSpace` or 1D basis
+        The function space of the Functions that are to be evaluated
+    points : array
+        Location of probes. (D, N) array, with N points in D dimensions.
+        For a 1D basis a (N,) array may also be used.
+    blocksize : int, optional
+        The number of points evaluated in one go. Smaller blocks lead to
+        smaller work arrays in the tensor contractions. If None, then use all
+        points in one block, unless this leads to a work array larger than
+        the memory budget.
+    memory : int or None, optional
+        Memory budget (in bytes) for the stored basis matrices. Blocks of
+        points that do not fit within the budget are not stored, and their
+        basis matrices are recomputed on each evaluation. If blocksize is
+        None, then the budget is also used to limit the size of the work
+        array of one block. If None, then there is no limit.
+    store : bool, optional
+        Whether or not to store the time series of all evaluations.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from mpi4py import MPI
+    >>> from shenfun import FunctionSpace, TensorProductSpace, Function, Probe
+    >>> K0 = FunctionSpace(8, 'C')
+    >>> K1 = FunctionSpace(8, 'F', dtype='d')
+    >>> T = TensorProductSpace(MPI.COMM_WORLD, (K0, K1))
+    >>> u = Function(T, val=1)
+    >>> points = np.array([[0.5, -0.5], [0., 1.0]])
+    >>> probe = Probe(T, points, store=True)
+    >>> u0 = probe(u, t=0)
+    >>> u1 = probe(2*u, t=1)
+    >>> probe.series.shape
+    (2, 2)
+
+    """
+    def __init__(self, space, points, blocksize=None, memory=None, store=False):
+        points = np.atleast_2d(points)
+        self.space = space
+        self.points = points
+        self.memory = memory
+        self.store = store
+        self._times = []
+        self._series = []
+        self._spaces = space.flatten() if space.is_composite_space else [space]
+        self.dimensions = self._spaces[0].dimensions
+        assert points.shape[0] == self.dimensions
+        self.dtype = np.dtype(space.forward.input_array.dtype)
+        shape = self._spaces[0].forward.output_array.shape
+        itemsize = np.dtype(space.forward.output_array.dtype).itemsize
+        npoints = points.shape[1]
+        if blocksize is None:
+            blocksize = npoints
+            if memory is not None and self.dimensions > 1:
+                blocksize = int(memory // (2*itemsize*np.prod(shape[1:])))
+        self.blocksize = min(max(1, blocksize), max(1, npoints))
+        self._blocks = [slice(i, min(i+self.blocksize, npoints))
+                        for i in range(0, npoints, self.blocksize)]
+        self._matrices = {}
+        used = 0
+        for sp in self._spaces:
+            if id(sp) in self._matrices:
+                continue
+            mats = []
+            for block in self._blocks:
+                P = self._get_basis_matrices(sp, block)
+                nbytes = np.sum([p.nbytes for p in P])
+                if memory is not None and used + nbytes > memory:
+                    P = None
+                else:
+                    used += nbytes
+                mats.append(P)
+            self._matrices[id(sp)] = mats
+        self.nbytes = used
+
+    def _get_basis_matrices(self, space, block):
+        """Return list of basis matrices, one for each axis, for points in block
+
+        Parameters
+        ----------
+        space : :class:`.TensorProductSpace` or 1D basis
+        block : slice
+            The points to use
+        """
+        if space.dimensions == 1:
+            bases = [space]
+            local_slice = [slice(None)]
+        else:
+            bases = space.bases
+            local_slice = space.local_slice(True)
+        P = []
+        for axis, base in enumerate(bases):
+            x = base.map_reference_domain(self.points[axis, block])
+            D = base.evaluate_basis_all(x=x, argument=1)[:, local_slice[axis]]
+            if isinstance(base, R2C):
+                # Account for the Hermitian symmetric part that is not stored
+                M = base.N//2+1
+                last_conj_index = M-1 if base.N % 2 == 0 else M
+                k = np.arange(local_slice[axis].start, local_slice[axis].start+D.shape[1])
+                D = D*np.where((k > 0) & (k < last_conj_index), 2, 1)
+            P.append(np.ascontiguousarray(D))
+        return P
+
+    def _contract(self, P, c):
+        """Return c contracted with basis matrices P for all points"""
+        out = np.dot(P[0], c.reshape((c.shape[0], -1)))
+        out = out.reshape((P[0].shape[0],)+c.shape[1:])
+        for Pa in P[1:]:
+            out = np.einsum('ij...,ij->i...', out, Pa)
+        return out
+
+    def evaluate_local(self, u, output_array=None):
+        """Return contribution to Function values from local coefficients
+
+        The sum over all processors of the returned arrays equals the
+        Function evaluated at the probe locations.
+
+        Parameters
+        ----------
+        u : :class:`.Function`
+            Function, scalar or vector, with expansion coefficients
+        output_array : array, optional
+            Return array
+        """
+        c = u.__array__()
+        nd = c.ndim if not self.space.is_composite_space else c.ndim-self.space.tensor_rank
+        shape = c.shape[:c.ndim-nd] + (self.points.shape[1],)
+        c = c.reshape((-1,)+c.shape[c.ndim-nd:])
+        if output_array is None:
+            output_array = np.zeros(shape, dtype=self.dtype)
+        out = output_array.reshape((c.shape[0], -1))
+        for i, sp in enumerate(self._spaces):
+            for block, P in zip(self._blocks, self._matrices[id(sp)]):
+                if P is None:
+                    P = self._get_basis_matrices(sp, block)
+                ub = self._contract(P, c[i])
+                out[i, block] = ub.real if self.dtype.char in 'fdg' else ub
+        return out.reshape(shape)
+
+    def __call__(self, u, output_array=None, t=None):
+        """Evaluate Function at the probe locations
+
+        Parameters
+        ----------
+        u : :class:`.Function`
+            Function, scalar or vector, with expansion coefficients
+        output_array : array, optional
+            Return array, Function values at probe locations
+        t : float, optional
+            Time of evaluation. Stored with the time series if store is True
+
+        Returns
+        -------
+        array
+            Function values at the probe locations. For composite spaces the
+            shape is (number of components, number of points).
+        """
+        output_array = self.evaluate_local(u, output_array)
+        if self.dimensions > 1:
+            output_array = np.ascontiguousarray(output_array)
+            comm.Allreduce(MPI.IN_PLACE, output_array, op=MPI.SUM)
+        if self.store:
+            self._times.append(t)
+            self._series.append(output_array.copy())
+        return output_array
+
+    @property
+    def times(self):
+        """Return array of the times of stored evaluations"""
+        return np.array(self._times)
+
+    @property
+    def series(self):
+        """Return array of stored evaluations
+
+        The first index of the returned array is the index of the evaluation.
+        """
+        return np.array(self._series)
+
+    def clear(self):
+        """Clear stored time series"""
+        self._times = []
+        self._series = []
@@ -0,0 +1,231 @@
+"""
+Module for timing the hot paths of shenfun
+
+Timing is off by default, and then the hot paths run without any
+instrumentation. Enable timing, run, and print a table with :func:`report`::
+
+    from shenfun.utilities import timing
+    timing.enable()
+    ... # time stepping
+    timing.report()
+
+Wall time and number of calls are recorded for
+
+    - 'transform' - forward, backward and scalar_product of a
+      :class:`.TensorProductSpace`
+    - 'transform 1D' - serial transforms along one axis
+    - 'transform MPI' - global redistributions between pencils
+    - 'matvec <Matrix>' - :meth:`.SparseMatrix.matvec`
+    - 'solve <Solver>' - calling the solvers of :mod:`.la`,
+      :mod:`.chebyshev.la` and :mod:`.legendre.la`
+    - 'inner' and 'project'
+
+and for any region of code timed with :func:`region`. The times are
+inclusive, such that, e.g., 'transform' contains 'transform 1D'. Nested calls
+of the same kind, like a matvec calling the matvec of its base class, are only
+counted once.
+
+The records are kept per process. :func:`report` reduces them over a
+communicator, and reports the min, mean and max time over the processes.
+
+"""
+import sys
+import time
+import functools
+import contextlib
+from collections import defaultdict
+import numpy as np
+from mpi4py import MPI
+
+__all__ = ['enable', 'reset', 'timings', 'timed', 'region', 'report']
+
+enabled = False
+
+_records = defaultdict(lambda: [0, 0.0])
+
+_running = defaultdict(int) # Depth of running calls of each kind
+
+_patched = []
+
+def _timer(kind, func, label=None):
+    """Return func recording under label, or under kind and the name of the
+    class of the first argument if label is None"""
+    @functools.wraps(func)
+    def wrapped(*args, **kwargs):
+        if _running[kind]:
+            return func(*args, **kwargs)
+        _running[kind] += 1
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record = _records[label or ' '.join((kind, type(args[0]).__name__))]
+            record[0] += 1
+            record[1] += time.perf_counter()-t0
+            _running[kind] -= 1
+    return wrapped
+
+def _transform(func):
+    """Return timed Transform.__call__ that also times the MPI transfers"""
+    transform = _timer('transform', func, 'transform')
+    @functools.wraps(func)
+    def wrapped(self, *args, **kwargs):
+        # The transfers are bound methods, so they are wrapped for the call
+        transfer = self._transfer
+        self._transfer = tuple(_timer('transform MPI', t, 'transform MPI') for t in transfer)
+        try:
+            return transform(self, *args, **kwargs)
+        finally:
+            self._transfer = transfer
+    return wrapped
+
+def _subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+def _matvec_target(cls):
+    return (cls, 'matvec', _timer('matvec', cls.__dict__['matvec']))
+
+def _patch(cls, name, method):
+    _patched.append((cls, name, cls.__dict__.get(name)))
+    setattr(cls, name, method)
+
+def instrument_matrix(cls):
+    """Time matvec of SparseMatrix subclass cls if timing is enabled
+
+    Called for each new subclass of :class:`.SparseMatrix`, such that also
+    matrices of families imported after :func:`enable` are timed.
+    """
+    if enabled and 'matvec' in cls.__dict__:
+        _patch(*_matvec_target(cls))
+
+def _targets():
+    """Return list of (class, method name, timed method)"""
+    from mpi4py_fft import mpifft
+    from shenfun import spectralbase, tensorproductspace, matrixbase, la
+    from shenfun.chebyshev import la as chebyshev_la
+    from shenfun.legendre import la as legendre_la
+    targets = []
+    for cls in (mpifft.Transform, tensorproductspace.CurvilinearTransform):
+        targets.append((cls, '__call__', _transform(getattr(cls, '__call__'))))
+    cls = spectralbase.Transform
+    targets.append((cls, '__call__', _timer('transform 1D', cls.__call__, 'transform 1D')))
+    for cls in (matrixbase.SparseMatrix,)+tuple(_subclasses(matrixbase.SparseMatrix)):
+        if 'matvec' in cls.__dict__:
+            targets.append(_matvec_target(cls))
+    for mod in (la, chebyshev_la, legendre_la):
+        for cls in vars(mod).values():
+            if isinstance(cls, type) and cls.__module__ == mod.__name__ and '__call__' in cls.__dict__:
+                targets.append((cls, '__call__', _timer('solve', cls.__dict__['__call__'])))
+    return targets
+
+def enable(flag=True):
+    """Enable or disable timing
+
+    Parameters
+    ----------
+    flag : bool, optional
+
+    Note
+    ----
+    Records are kept when timing is disabled. Use :func:`reset` to remove
+    them.
+    """
+    global enabled
+    if flag and not enabled:
+        for target in _targets():
+            _patch(*target)
+    elif not flag and enabled:
+        while _patched:
+            cls, name, method = _patched.pop()
+            if method is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, method)
+    enabled = flag
+
+def reset():
+    """Remove all records"""
+    _records.clear()
+
+def timings():
+    """Return dictionary of records of this process
+
+    The keys are labels, like 'transform' or 'inner', and the values are
+    tuples (calls, time).
+    """
+    return {label: tuple(record) for label, record in _records.items()}
+
+def timed(label):
+    """Decorator for timing function under label when timing is enabled
+
+    Parameters
+    ----------
+    label : str
+    """
+    def wrap(func):
+        timer = _timer(label, func, label)
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            if enabled:
+                return timer(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapped
+    return wrap
+
+@contextlib.contextmanager
+def region(label):
+    """Context manager for timing a region of code under label when timing
+    is enabled
+
+    Parameters
+    ----------
+    label : str
+    """
+    if not enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = _records[label]
+        record[0] += 1
+        record[1] += time.perf_counter()-t0
+
+def report(comm=MPI.COMM_WORLD, file=None):
+    """Print table of records reduced over all processes in comm
+
+    Must be called by all processes in comm. Only rank 0 prints.
+
+    Parameters
+    ----------
+    comm : MPI communicator or None, optional
+        If None, then report only the records of this process
+    file : file-like object, optional
+        Where to print. Default is sys.stdout
+
+    Returns
+    -------
+    List of tuples (label, calls, min time, mean time, max time), where
+    calls is summed over processes and the times are over processes
+    """
+    records = [timings()] if comm is None else comm.allgather(timings())
+    labels = set()
+    for r in records:
+        labels.update(r)
+    rows = []
+    for label in labels:
+        calls = sum(r.get(label, (0, 0.0))[0] for r in records)
+        times = np.array([r.get(label, (0, 0.0))[1] for r in records])
+        rows.append((label, calls, times.min(), times.mean(), times.max()))
+    rows.sort(key=lambda r: r[-1], reverse=True)
+    if comm is None or comm.Get_rank() == 0:
+        file = sys.stdout if file is None else file
+        print('{:<40} {:>9} {:>12} {:>12} {:>12}'.format('label', 'calls', 'min (s)',
+                                                         'mean (s)', 'max (s)'),
+              file=file)
+        for row in rows:
+            print('{:<40} {:>9d} {:>12.4e} {:>12.4e} {:>12.4e}'.format(*row), file=file)
+    return rows
@@ -92,6 +92,24 @@ def test_backward_uniform(family):
     fj = sp.lambdify(x, f)(xj)
     assert np.linalg.norm(fj-ub) < 1e-8
 
+@pytest.mark.parametrize('family', 'CL')
+def test_backward_uniform_2D(family):
+    B = FunctionSpace(N, family, bc=(0, 0))
+    F = FunctionSpace(N, 'F', dtype='d')
+    for bases in ((B, F), (F, B)):
+        T = TensorProductSpace(comm, bases)
+        u = Function(T)
+        u[:] = np.random.random(u.shape)
+        u = u.backward().forward()
+        ub = u.backward(kind='uniform')
+        X = np.meshgrid(*[np.squeeze(xi) for xi in T.mesh(uniform=True)], indexing='ij')
+        ue = T.eval(np.array([xi.ravel() for xi in X]), u).reshape(X[0].shape)
+        ue = ue[T.local_slice(False)]
+        assert np.linalg.norm(ue-ub) < 1e-8
+        ub = u.backward(kind='uniform')
+        assert np.linalg.norm(ue-ub) < 1e-8
+        T.destroy()
+
 @pytest.mark.parametrize('family', 'CL')
 def test_padding(family):
     N = 8
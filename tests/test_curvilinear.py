@@ -1,6 +1,8 @@
 import pytest
 import numpy as np
 import sympy as sp
+from mpmath import mp
+from shenfun.matrixbase import get_denser_matrix
 from shenfun import FunctionSpace, TensorProductSpace, TrialFunction, div, grad, \
     curl, comm, VectorSpace, Function, inner, \
     BlockMatrix, TestFunction as _TestFunction
@@ -62,6 +64,61 @@ def test_vector_laplace(space):
     b1 = a1.matvec(u_hat, b1)
     assert np.linalg.norm(b0-b1) < 1e-8
 
+def test_numeric_coordinates():
+    T = get_function_space('sphere')
+    r, theta, phi = T.coors.psi
+    X = T.local_mesh(True)
+    sg = T.get_numeric('sg')
+    assert sg is T.get_numeric('sg')
+    assert np.allclose(sg, sp.lambdify((r, theta), T.coors.sg)(X[0], X[1]))
+    hi = T.get_numeric('hi')
+    assert hi.shape[0] == 3
+    assert np.allclose(hi[0], 1)
+    assert np.allclose(hi[2], X[0]*np.sin(X[1]))
+    ct = T.get_numeric('ct')
+    assert ct.shape[:3] == (3, 3, 3)
+    assert np.allclose(ct[0, 1, 1], -X[0])
+    u = np.ones(T.shape(False))
+    assert np.allclose(T.get_measured_array(u), sg)
+    T.coors.subs(r, sp.Symbol('r', positive=True))
+    assert T.get_numeric('sg') is not sg
+    assert np.allclose(T.get_numeric('sg'), sg)
+    T2 = T.get_refined((8, 8, 6))
+    assert T2.get_numeric('sg').shape[1] == 8
+    T.destroy()
+    T2.destroy()
+
+def test_measured_transforms():
+    r = sp.Symbol('x', real=True, positive=True)
+    L = FunctionSpace(8, 'L', domain=(0.5, 1), coordinates=((r,), (r, r**2)))
+    assert L.get_measured_weights(8, r) is L.get_measured_weights(8, r)
+    xj, wj = L.points_and_weights(map_true_domain=True)
+    assert np.allclose(L.get_measured_weights(8, r).astype(float), wj*xj)
+    # The cached weights depend on the precision of mpmath
+    w = L.get_measured_weights(8, r)
+    with mp.workdps(mp.dps+10):
+        assert L.get_measured_weights(8, r) is not w
+    assert L.get_measured_weights(8, r) is w
+    # Denser matrices use weights cached on the given basis
+    D = get_denser_matrix((L, 0), (L, 0), r)
+    assert (12, r, mp.prec) in L._measured_weights
+    assert np.allclose(get_denser_matrix((L, 0), (L, 0), r).astype(float), D.astype(float))
+    u = np.random.random(8)
+    Lm = FunctionSpace(8, 'L', domain=(0.5, 1))
+    assert np.allclose(L.scalar_product(u), Lm.scalar_product(u*np.sqrt(1+4*xj**2)))
+    T = get_function_space('cylinder')
+    u = np.random.random(T.shape(False))
+    X = T.local_mesh(True)
+    ua = u.copy()
+    Tc = TensorProductSpace(comm, T.bases)
+    assert np.allclose(T.scalar_product(u), Tc.scalar_product(u*X[0]))
+    assert np.allclose(u, ua)
+    c = T.scalar_product(u).copy()
+    T.scalar_product.input_array[...] = u
+    assert np.allclose(T.scalar_product(), c)
+    T.destroy()
+    Tc.destroy()
+
 if __name__ == '__main__':
     test_cylinder()
     #test_vector_laplace('sphere')
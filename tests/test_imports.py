@@ -0,0 +1,22 @@
+import sys
+import subprocess
+import importlib
+import shenfun
+
+def test_lazy_imports():
+    code = ("import sys, shenfun; "
+            "assert not any(m in sys.modules for m in ('shenfun.chebyshev', 'shenfun.la', 'shenfun.io')); "
+            "assert shenfun.chebyshev.bases.ShenDirichlet; "
+            "assert shenfun.ShenfunFile and 'shenfun.io' in sys.modules")
+    subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True)
+    for module, names in shenfun._lazy_attributes.items():
+        mod = importlib.import_module('shenfun.'+module)
+        assert set(names) == set(mod.__all__)
+        for name in names:
+            assert getattr(shenfun, name) is getattr(mod, name)
+    for name in shenfun._lazy_modules:
+        assert name in dir(shenfun)
+        assert getattr(shenfun, name) is importlib.import_module('shenfun.'+name)
+
+if __name__ == '__main__':
+    test_lazy_imports()
@@ -0,0 +1,163 @@
+import os
+import tracemalloc
+import pytest
+import numpy as np
+import sympy as sp
+from shenfun import FunctionSpace, TensorProductSpace, Function, Array, \
+    TrialFunction, TestFunction, inner, div, grad, comm
+from shenfun.utilities.integrators import IRK3, ETD, ETDRK4, RK4, BS3, DOPRI5, \
+    ARK43, SBDF2, SBDF3, SBDF4, CNAB2, IMEXMultistep
+
+x, y, t = sp.symbols('x,y,t', real=True)
+
+# Solve u_t = div(grad(u)) - u with periodic and Dirichlet bcs
+K0 = FunctionSpace(8, 'F', dtype='D')
+K1 = FunctionSpace(8, 'F', dtype='d')
+SD = FunctionSpace(12, 'L', bc=(0, 0))
+spaces = {'periodic': (TensorProductSpace(comm, (K0, K1)),
+                       sp.exp(-2*t)*sp.sin(x) + sp.exp(-5*t)*sp.cos(2*y)),
+          'dirichlet': (TensorProductSpace(comm, (SD, K1)),
+                        sp.exp(-(sp.pi**2+5)*t)*sp.sin(sp.pi*x)*sp.cos(2*y))}
+
+def LinearRHS(self, *args, **params):
+    if isinstance(self, (IRK3, ARK43, IMEXMultistep)):
+        return div(grad(args[0]))
+    return inner(div(grad(TrialFunction(self.T))), TestFunction(self.T))
+
+def NonlinearRHS(self, U, U_hat, dU, **params):
+    if getattr(self, 'mass', None) is not None:
+        # Weak form
+        dU = self.mass.matvec(U_hat, dU)
+        dU *= -1
+        return dU
+    dU = np.negative(U_hat, out=dU)
+    return dU
+
+def cfl(self, U, U_hat, **params):
+    # Oscillating stable time step
+    self.ncalls = getattr(self, 'ncalls', 0) + 1
+    return 0.01*(1.5+np.sin(self.ncalls))
+
+def setup_counter(cls):
+    class Counter(cls):
+        nsetups = 0
+        def setup(self, dt):
+            self.nsetups += 1
+            cls.setup(self, dt)
+    return Counter
+
+@pytest.mark.parametrize('integrator', (IRK3, ETD, ETDRK4, RK4))
+def test_adaptive(integrator):
+    end_time = 0.5
+    T, ue = spaces['dirichlet' if integrator is IRK3 else 'periodic']
+    U = Array(T, buffer=ue.subs(t, 0))
+    U_hat = U.forward()
+    Integrator = setup_counter(integrator)
+    I = Integrator(T, L=LinearRHS, N=NonlinearRHS, cfl=cfl, adaptive=True,
+                   cache_size=16)
+    U_hat = I.solve(U, U_hat, 0.01, (0, end_time))
+    Ue = Array(T, buffer=ue.subs(t, end_time))
+    tol = {IRK3: 1e-4, ETD: 5e-2, ETDRK4: 1e-6, RK4: 1e-6}[integrator]
+    assert np.linalg.norm(U_hat.backward()-Ue) < tol
+    if integrator is not RK4:
+        # One setup per cached time step
+        assert I.nsetups <= len(I._setups)
+        assert I.nsetups < I.ncalls
+
+@pytest.mark.parametrize('integrator', (BS3, DOPRI5, ARK43))
+def test_embedded(integrator):
+    end_time = 0.5
+    T, ue = spaces['dirichlet' if integrator is ARK43 else 'periodic']
+    U = Array(T, buffer=ue.subs(t, 0))
+    U_hat = U.forward()
+    I = integrator(T, L=LinearRHS, N=NonlinearRHS, rtol=1e-8, atol=1e-10)
+    U_hat = I.solve(U, U_hat, 0.1, (0, end_time))
+    Ue = Array(T, buffer=ue.subs(t, end_time))
+    assert np.linalg.norm(U_hat.backward()-Ue) < 1e-6
+    assert I.accepted > 1
+    # Norm computed in spectral space. Fourier bases use weight 1/(2pi)
+    nF = [base.family() for base in T.bases].count('fourier')
+    assert abs(I.norm(U_hat)**2*(2*np.pi)**nF-inner(1, U_hat.backward()**2)) < 1e-8
+
+@pytest.mark.parametrize('integrator,order', ((SBDF2, 2), (SBDF3, 3), (SBDF4, 4), (CNAB2, 2)))
+def test_multistep(integrator, order):
+    end_time = 0.2
+    T, ue = spaces['dirichlet']
+    Ue = Array(T, buffer=ue.subs(t, end_time))
+    error = []
+    for dt in (0.01, 0.005):
+        U = Array(T, buffer=ue.subs(t, 0))
+        U_hat = U.forward()
+        I = integrator(T, L=LinearRHS, N=NonlinearRHS)
+        U_hat = I.solve(U, U_hat, dt, (0, end_time))
+        error.append(np.linalg.norm(U_hat.backward()-Ue))
+        # One factorization, apart from the startup steps
+        assert len(I._setups) == 1
+    assert np.log2(error[0]/error[1]) > order-0.5
+
+@pytest.mark.parametrize('integrator', (SBDF2, SBDF3, CNAB2))
+def test_multistep_adaptive(integrator):
+    # Time step going from 0.01 to 0.02, which restarts the history
+    def cfl_step(self, U, U_hat, **params):
+        self.ncalls = getattr(self, 'ncalls', 0) + 1
+        return (0.01 if self.ncalls < 5 else 0.02)/self.params['safety']
+    end_time = 0.2
+    T, ue = spaces['dirichlet']
+    Ue = Array(T, buffer=ue.subs(t, end_time))
+    error = []
+    for adaptive in (True, False):
+        U = Array(T, buffer=ue.subs(t, 0))
+        U_hat = U.forward()
+        I = integrator(T, L=LinearRHS, N=NonlinearRHS, cfl=cfl_step, adaptive=adaptive)
+        U_hat = I.solve(U, U_hat, 0.01 if adaptive else 0.02, (0, end_time))
+        error.append(np.linalg.norm(U_hat.backward()-Ue))
+        if adaptive:
+            # One setup of the starter for each time step
+            assert len(I.starter._setups) == 2
+    assert error[0] < error[1]
+
+@pytest.mark.parametrize('integrator,order', ((ETD, 1), (ETDRK4, 4)))
+def test_exponential_nondiagonal(integrator, order):
+    end_time = 0.5
+    T, ue = spaces['dirichlet']
+    Ue = Array(T, buffer=ue.subs(t, end_time))
+    error = []
+    for dt in (0.1, 0.05):
+        U = Array(T, buffer=ue.subs(t, 0))
+        U_hat = U.forward()
+        I = integrator(T, L=LinearRHS, N=NonlinearRHS)
+        U_hat = I.solve(U, U_hat, dt, (0, end_time))
+        error.append(np.linalg.norm(U_hat.backward()-Ue))
+        assert I.phi is not None
+    assert np.log2(error[0]/error[1]) > order-0.5
+
+@pytest.mark.skipif(os.environ.get('SHENFUN_OPTIMIZATION', 'cython').lower() == 'python',
+                    reason='Python kernels use temporary arrays')
+# IRK3 is not included, since its implicit stages are solved line by line
+# with scipy's SuperLU, which allocates internally.
+# The time step is fixed, since new time steps set up new solvers.
+@pytest.mark.parametrize('integrator', (ETD, ETDRK4, RK4, BS3, DOPRI5, ARK43, SBDF2, CNAB2))
+def test_allocations(integrator):
+    T = TensorProductSpace(comm, (FunctionSpace(64, 'F', dtype='D'),
+                                  FunctionSpace(64, 'F', dtype='d')))
+    def update(self, U, U_hat, t, tstep, **params):
+        # Peak of allocated memory during the step
+        current, peak = tracemalloc.get_traced_memory()
+        if tstep > 1:
+            self.peaks.append(peak-self.current)
+        tracemalloc.reset_peak()
+        self.current = tracemalloc.get_traced_memory()[0]
+    U = Array(T)
+    U_hat = Function(T, val=1)
+    I = integrator(T, L=LinearRHS, N=NonlinearRHS, update=update, adaptive=False)
+    I.peaks = []
+    tracemalloc.start()
+    try:
+        U_hat = I.solve(U, U_hat, 0.01, (0, 0.05))
+    finally:
+        tracemalloc.stop()
+    assert len(I.peaks) == 4
+    assert max(I.peaks) < U_hat.nbytes//4
+
+if __name__ == '__main__':
+    test_adaptive(IRK3)
@@ -1,15 +1,17 @@
 import functools
+import threading
+import time
 import numpy as np
 from mpi4py import MPI
 import pytest
 from mpi4py_fft import generate_xdmf
 from shenfun import FunctionSpace, TensorProductSpace, ShenfunFile, Function,\
-    Array, CompositeSpace, VectorSpace
+    Array, CompositeSpace, VectorSpace, Checkpoint, AsyncWriter, InSituWriter
 
 N = (12, 13, 14, 15)
 comm = MPI.COMM_WORLD
 
-skip = {'hdf5': False, 'netcdf4': False}
+skip = {'hdf5': False, 'netcdf4': False, 'npy': False}
 try:
     import h5py
 except ImportError:
@@ -25,7 +27,7 @@ writer = functools.partial(ShenfunFile, mode='w')
 reader = functools.partial(ShenfunFile, mode='r')
 
 @pytest.mark.parametrize('forward_output', (True, False))
-@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4'))
+@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4', 'npy'))
 def test_regular_2D(backend, forward_output):
     if (backend == 'netcdf4' and forward_output is True) or skip[backend]:
         return
@@ -47,7 +49,7 @@ def test_regular_2D(backend, forward_output):
     assert np.allclose(u0, u)
 
 @pytest.mark.parametrize('forward_output', (True, False))
-@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4'))
+@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4', 'npy'))
 @pytest.mark.parametrize('as_scalar', (True, False))
 def test_mixed_2D(backend, forward_output, as_scalar):
     if (backend == 'netcdf4' and forward_output is True) or skip[backend]:
@@ -78,7 +80,7 @@ def test_mixed_2D(backend, forward_output, as_scalar):
         assert np.allclose(u0, uf[0])
 
 @pytest.mark.parametrize('forward_output', (True, False))
-@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4'))
+@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4', 'npy'))
 def test_regular_3D(backend, forward_output):
     if (backend == 'netcdf4' and forward_output is True) or skip[backend]:
         return
@@ -106,7 +108,7 @@ def test_regular_3D(backend, forward_output):
     assert np.allclose(u0, u)
 
 @pytest.mark.parametrize('forward_output', (True, False))
-@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4'))
+@pytest.mark.parametrize('backend', ('hdf5', 'netcdf4', 'npy'))
 @pytest.mark.parametrize('as_scalar', (True, False))
 def test_mixed_3D(backend, forward_output, as_scalar):
     if (backend == 'netcdf4' and forward_output is True) or skip[backend]:
@@ -143,6 +145,161 @@ def test_mixed_3D(backend, forward_output, as_scalar):
         read.read(u0, 'u0', step=1)
         assert np.allclose(u0, uf[0])
 
+@pytest.mark.parametrize('precision', (None, 'single'))
+@pytest.mark.parametrize('compression', (None, 'gzip'))
+def test_checkpoint(precision, compression):
+    if skip['hdf5']:
+        return
+    K0 = FunctionSpace(N[0], 'C', bc=(0, 0))
+    K1 = FunctionSpace(N[1], 'F', dtype='D')
+    K2 = FunctionSpace(N[2], 'F', dtype='d')
+    T = TensorProductSpace(comm, (K0, K1, K2))
+    TT = VectorSpace(T)
+    filename = 'checkpoint_{}_{}'.format(precision, compression)
+    f = Checkpoint(filename, mode='w', compression=compression, precision=precision)
+    u = Function(T)
+    u[:] = np.random.random(u.shape)+1j*np.random.random(u.shape)
+    u = u.backward().forward()
+    uv = Function(TT)
+    uv[:] = np.random.random(uv.shape)+1j*np.random.random(uv.shape)
+    uv = uv.backward().forward()
+    f.write(0, {'u': u, 'uv': uv}, t=0.5)
+    f.write(1, {'u': 2*u})
+    assert f.steps('u') == [0, 1]
+    assert f.time('u', 0) == 0.5
+    tol = 1e-5 if precision == 'single' else 1e-12
+    u0 = f.read(Function(T), 'u', step=0)
+    assert np.linalg.norm(u0-u) < tol
+    # Read onto a different decomposition
+    T1 = TensorProductSpace(comm, (K0, K1, K2), axes=(1, 0, 2))
+    u1 = f.read(Function(T1), 'u')
+    norm = lambda v: np.sqrt(comm.allreduce(np.sum(abs(v.v)**2)))
+    assert abs(norm(u1)-2*norm(u)) < tol
+    uv0 = f.read(Function(TT), 'uv', step=0)
+    assert np.linalg.norm(uv0-uv) < tol
+
+def test_npy_slices():
+    K0 = FunctionSpace(N[0], 'F', dtype='D')
+    K1 = FunctionSpace(N[1], 'F', dtype='D')
+    K2 = FunctionSpace(N[2], 'F', dtype='d')
+    T = TensorProductSpace(comm, (K0, K1, K2))
+    u = Function(T)
+    u[:] = np.random.random(u.shape)+1j*np.random.random(u.shape)
+    f = ShenfunFile('test3Dnpy', T, backend='npy', mode='w')
+    f.write(0, {'u': [u, (u, [slice(None), 4, slice(None)])]})
+    ug = np.zeros(u.global_shape, dtype=u.dtype)
+    ug[u.local_slice()] = u
+    ug = comm.allreduce(ug)
+    d = f['u/3D/0']
+    assert d.shape == u.global_shape
+    assert len(d.chunks) == comm.Get_size()
+    assert np.allclose(d[2:5, -1, 3:], ug[2:5, -1, 3:])
+    assert np.allclose(d[..., 2], ug[..., 2])
+    assert np.allclose(f['u/2D/slice_4_slice/0'][:], ug[:, 4])
+    # Read onto a different decomposition
+    T1 = TensorProductSpace(comm, (K0, K1, K2), axes=(1, 0, 2))
+    u1 = Function(T1)
+    ShenfunFile('test3Dnpy', T1, backend='npy', mode='r').read(u1, 'u')
+    assert np.allclose(u1, ug[u1.local_slice()])
+
+def test_insitu():
+    K0 = FunctionSpace(N[0], 'C', bc=(-1, 1))
+    K1 = FunctionSpace(N[1], 'F', dtype='D')
+    K2 = FunctionSpace(N[2], 'F', dtype='d')
+    T = TensorProductSpace(comm, (K0, K1, K2))
+    u = Array(T)
+    u[:] = np.random.random(u.shape)
+    u_hat = u.forward()
+    u = u_hat.backward()
+    ug = np.zeros(u.global_shape)
+    ug[u.local_slice()] = u
+    ug = comm.allreduce(ug)
+    slices = [[slice(None), 4, slice(None)], [2, slice(None), slice(None)],
+              [slice(None), slice(None), 5]]
+    M = (8, 8, 8)
+    f = InSituWriter('insitu', T, slices=slices, N=M, backend='npy')
+    f.write(0, {'u': u_hat})
+    for sl in slices:
+        name = '_'.join([str(s) if not isinstance(s, slice) else 'slice' for s in sl])
+        d = ShenfunFile('insitu_'+name, T, backend='npy', mode='r')['u/2D/0']
+        assert np.allclose(d[:], ug[tuple(sl)])
+    uc = Function(T.get_refined(M))
+    uc = u_hat.assign(uc).backward()
+    d = ShenfunFile('insitu_coarse', T, backend='npy', mode='r')['u/3D/0']
+    assert np.allclose(d[uc.local_slice()], uc)
+    # Boundary values are kept by the truncation
+    assert np.allclose(uc.forward().eval(np.array([[-1, 1], [0.5, 0.5], [1, 1]])), [-1, 1])
+
+def test_checkpoint_resample():
+    if skip['hdf5']:
+        return
+    def space(M, axes=(0, 1, 2)):
+        K0 = FunctionSpace(M[0], 'C', bc=(0, 0))
+        K1 = FunctionSpace(M[1], 'F', dtype='D')
+        K2 = FunctionSpace(M[2], 'F', dtype='d')
+        return TensorProductSpace(comm, (K0, K1, K2), axes=axes)
+    T = space(N[:3])
+    u = Function(T)
+    u[:] = np.random.random(u.shape)+1j*np.random.random(u.shape)
+    u = u.backward().forward()
+    f = Checkpoint('checkpoint_resample', mode='w')
+    f.write(0, {'u': u})
+    # Restart on a finer mesh, also with a different decomposition
+    M = (16, 18, 20)
+    u1 = f.read(Function(space(M)), 'u')
+    assert np.allclose(u1, u.refine(M))
+    u2 = f.read(Function(space(M, axes=(1, 0, 2))), 'u')
+    norm = lambda v: np.sqrt(comm.allreduce(np.sum(abs(v.v)**2)))
+    assert abs(norm(u2)-norm(u1)) < 1e-12
+    # Restart from the finer mesh on the original mesh. Truncation is not
+    # the inverse of padding for the Nyquist coefficients of the R2C axis
+    f.write(1, {'u': u1})
+    u0 = f.read(Function(T), 'u', step=1)
+    assert np.allclose(u0, u1.refine(N[:3]))
+
+class SlowWriter:
+    # Stores the global sums of the written fields after a delay. The sums
+    # are computed with MPI calls from the background thread
+    def __init__(self):
+        self.data = {}
+        self.buffers = []
+        self.release = threading.Event()
+
+    def write(self, step, fields, **kw):
+        self.release.wait()
+        self.buffers.append(fields['u'][0])
+        self.data[step] = comm.allreduce(np.sum(fields['u'][0]))
+
+@pytest.mark.skipif(comm.Get_size() > 1 and MPI.Query_thread() != MPI.THREAD_MULTIPLE,
+                    reason='MPI not initialized with THREAD_MULTIPLE')
+def test_async_writer():
+    K0 = FunctionSpace(N[0], 'F', dtype='D')
+    K1 = FunctionSpace(N[1], 'F', dtype='d')
+    T = TensorProductSpace(comm, (K0, K1))
+    u = Array(T, val=1)
+    writer = SlowWriter()
+    f = AsyncWriter(writer, nbuffers=2)
+    assert f.asynchronous
+    f.write(0, {'u': [u]})
+    u[:] = 2
+    f.write(1, {'u': [u]})
+    assert f.pending() == 2
+    # Buffers are full, so the next write blocks until one snapshot is written
+    t0 = threading.Timer(0.2, writer.release.set)
+    t0.start()
+    t1 = time.time()
+    u[:] = 3
+    f.write(2, {'u': [u]})
+    assert time.time()-t1 > 0.1
+    with f:
+        u[:] = 4
+        f.write(3, {'u': [u]})
+    assert f.pending() == 0
+    for step in range(4):
+        assert writer.data[step] == (step+1)*N[0]*N[1]
+    # The snapshots are copied into the same two buffers
+    assert len({id(buf) for buf in writer.buffers}) == 2
+
 if __name__ == '__main__':
     for bnd in ('hdf5', 'netcdf4'):
         test_regular_2D(bnd, False)
@@ -37,5 +37,34 @@ def test_lagrangian_particles():
     assert np.allclose(lp.x, np.array([[0.53986228], [0.74811753]]), 1e-6)
     assert np.allclose(lp.up, np.array([[0.99115526], [-0.09409196]]), 1e-6)
 
+@pytest.mark.parametrize('integrator', ('rk2', 'rk4'))
+def test_lagrangian_particles_distributed(integrator):
+    N = (20, 20)
+    F0 = FunctionSpace(N[0], 'C', bc=(0, 0), domain=(0., 1.))
+    F1 = FunctionSpace(N[1], 'F', dtype='d', domain=(0., 1.))
+    T = TensorProductSpace(comm, (F0, F1))
+    TV = VectorSpace(T)
+
+    x, y = sp.symbols("x,y")
+    psi = 1./np.pi*sp.sin(np.pi*x)**2*sp.sin(2*np.pi*y) # Streamfunction
+    uv = Function(TV, buffer=(-psi.diff(y, 1), psi.diff(x, 1)))
+
+    points = None
+    if comm.Get_rank() == 0:
+        points = 0.2+0.6*np.random.random((2, 20))
+    points = comm.bcast(points)
+    lp0 = LagrangianParticles(points.copy(), 0.01, uv, integrator=integrator)
+    local = np.array_split(np.arange(20), comm.Get_size())[comm.Get_rank()]
+    lp1 = LagrangianParticles(points[:, local].copy(), 0.01, uv, integrator=integrator,
+                              distribute=True, periodic=True, blocksize=7)
+    for i in range(10):
+        lp0.step()
+        lp1.step()
+    assert np.all(lp1.owner() == comm.Get_rank())
+    x1 = np.zeros_like(points)
+    x1[:, np.hstack(comm.allgather(lp1.ids))] = np.hstack(comm.allgather(lp1.x))
+    assert np.allclose(lp0.x, x1)
+
 if __name__ == '__main__':
     test_lagrangian_particles()
+    test_lagrangian_particles_distributed('rk4')
@@ -1,3 +1,4 @@
+import os
 from copy import copy, deepcopy
 import functools
 from itertools import product
@@ -634,6 +635,60 @@ def test_biharmonic3D(family, axis):
 
     assert np.linalg.norm(f-(g0+g1+g2)) < 1e-8, np.linalg.norm(f-(g0+g1+g2))
 
+@pytest.mark.skipif(os.environ.get('SHENFUN_OPTIMIZATION', 'cython').lower() == 'python',
+                    reason='Threads are only used by the Cython and Numba kernels')
+@pytest.mark.parametrize('axis', (0, 1, 2))
+def test_threads(axis):
+    from shenfun.optimization import set_num_threads, get_num_threads
+    N = (16, 18, 20)
+    results = []
+    for bc, op in (((0, 0), lambda u: div(grad(u))), ('Biharmonic', lambda u: div(grad(div(grad(u)))))):
+        SD = FunctionSpace(N[allaxes3D[axis][0]], family='chebyshev', bc=bc)
+        K1 = FunctionSpace(N[allaxes3D[axis][1]], family='F', dtype='D')
+        K2 = FunctionSpace(N[allaxes3D[axis][2]], family='F', dtype='d')
+        subcomms = mpi4py_fft.pencil.Subcomm(MPI.COMM_WORLD, [0, 1, 1])
+        bases = [0]*3
+        bases[allaxes3D[axis][0]] = SD
+        bases[allaxes3D[axis][1]] = K1
+        bases[allaxes3D[axis][2]] = K2
+        T = TensorProductSpace(subcomms, bases, axes=allaxes3D[axis])
+        mat = inner(shenfun.TestFunction(T), op(shenfun.TrialFunction(T)))
+        H = (cla.Helmholtz if bc == (0, 0) else cla.Biharmonic)(*mat)
+        u = Function(T)
+        u[:] = np.random.random(u.shape) + 1j*np.random.random(u.shape)
+        # Results must be identical for any number of threads
+        nthreads = get_num_threads()
+        try:
+            for n in (1, 3):
+                set_num_threads(n)
+                results.append((H.matvec(u, Function(T)), H(Function(T), u.copy())))
+        finally:
+            set_num_threads(nthreads)
+    for r1, r3 in zip(results[::2], results[1::2]):
+        assert np.array_equal(r1[0], r3[0])
+        assert np.array_equal(r1[1], r3[1])
+
+@pytest.mark.parametrize('key, mat', [(k, v) for k, v in list(cmatrices.mat.items())+list(lmatrices.mat.items())
+                                      if len(k) == 2])
+def test_numba_matvec(key, mat, monkeypatch):
+    """Test that the Numba matrix-vector products equal the Cython ones"""
+    pytest.importorskip('numba')
+    from importlib import import_module
+    from shenfun.optimization.cython import Matvec
+    from shenfun.optimization.numba import matvec
+    m = mat((key[0][0](N), key[0][1]), (key[1][0](N), key[1][1]))
+    if 'cython' not in m._matvec_methods:
+        return
+    mod = import_module(type(m).matvec.__module__)
+    for v in (a+1j*a[::-1], work[3][0]):
+        c0, c1 = np.zeros_like(v), np.zeros_like(v)
+        for axis in range(v.ndim):
+            monkeypatch.setattr(mod, 'Matvec', Matvec)
+            c0 = m.matvec(v, c0, format='cython', axis=axis)
+            monkeypatch.setattr(mod, 'Matvec', matvec)
+            c1 = m.matvec(v, c1, format='cython', axis=axis)
+            assert np.allclose(c0, c1)
+
 @pytest.mark.parametrize('axis', (0, 1))
 @pytest.mark.parametrize('family', ('chebyshev', 'legendre', 'jacobi'))
 def test_biharmonic2D(family, axis):
@@ -0,0 +1,102 @@
+import io
+import os
+import numpy as np
+import pytest
+import sympy as sp
+import shenfun
+from shenfun import optimization
+from shenfun.optimization import autotune
+from shenfun.utilities import apply_mask
+
+def test_registry():
+    key = 'shenfun.utilities.apply_mask'
+    d = optimization.registry[key]
+    backend = os.environ.get('SHENFUN_OPTIMIZATION', 'cython').lower()
+    assert d.requested == backend
+    profiling = optimization.profiling
+    try:
+        optimization.enable_profiling(False)
+        optimization.set_backend('apply_mask', 'python')
+        assert d.backend == 'python'
+        assert d.fun is d.func
+        calls = d.calls
+        u = np.ones((4, 4))
+        mask = np.array([1, 0, 1, 0])
+        u = apply_mask(u, mask)
+        assert np.all(u[:, 1] == 0) and np.all(u[:, 0] == 1)
+        assert d.calls == calls+int(d.fallback)
+        rows = optimization.report(file=io.StringIO())
+        assert (key in [row[0] for row in rows]) is d.fallback
+        # Calls of optimized functions are only counted when profiling
+        optimization.set_backend('apply_mask', backend)
+        calls = d.calls
+        u = apply_mask(u, mask)
+        assert d.calls == calls+int(d.fallback)
+        optimization.enable_profiling()
+        u = apply_mask(u, mask)
+        assert d.calls == calls+1+int(d.fallback)
+        rows = optimization.report(all=True, file=io.StringIO())
+        assert key in [row[0] for row in rows]
+    finally:
+        optimization.enable_profiling(profiling)
+        optimization.set_backend(key, backend)
+    with pytest.raises(KeyError):
+        optimization.set_backend('nonexisting', 'python')
+
+@pytest.fixture
+def tuning(tmp_path, monkeypatch):
+    monkeypatch.setenv('SHENFUN_AUTOTUNE_CACHE', str(tmp_path / 'autotune.json'))
+    autotune.clear()
+    autotune.enable()
+    yield autotune
+    autotune.enable(False)
+    autotune.clear()
+
+def test_autotune_select(tuning):
+    calls = []
+    def run(name):
+        calls.append(name)
+        if name == 'b':
+            raise RuntimeError
+    assert tuning.select(('f', 1), ['a', 'b'], run) == 'a'
+    n = len(calls)
+    assert tuning.select(('f', 1), ['a', 'b'], run) == 'a'
+    assert len(calls) == n
+    with open(tuning.cache_file()) as f:
+        assert repr(('f', 1)) in f.read()
+
+def test_autotune_select_comm(tuning):
+    comm = shenfun.comm
+    def run(name):
+        comm.Barrier()
+        # Candidate 'a' fails on one process only
+        if name == 'a' and comm.Get_rank() == comm.Get_size()-1:
+            raise RuntimeError
+    assert tuning.select(('g', 1), ['a', 'b'], run, comm=comm) == 'b'
+    assert os.path.exists(tuning.cache_file()) == (comm.Get_rank() == 0)
+
+def test_autotune(tuning):
+    x = sp.Symbol('x', real=True)
+    N = 12
+    D = shenfun.FunctionSpace(N, 'C', bc=(0, 0))
+    F = shenfun.FunctionSpace(N, 'F', dtype='d')
+    T = shenfun.TensorProductSpace(shenfun.comm, (D, F))
+    u = shenfun.Function(T, buffer=(1-x**2)*sp.sin(sp.Symbol('y', real=True)))
+    tuning.enable(False)
+    ub = u.backward()
+    points = np.random.random((2, 5))
+    ue = T.eval(points, u)
+    v = shenfun.TestFunction(D)
+    B = shenfun.inner(v, shenfun.TrialFunction(D))
+    c0 = B.matvec(u, np.zeros_like(u))
+    tuning.enable()
+    assert np.allclose(u.backward(), ub)
+    assert np.allclose(ub.forward(), u)
+    assert np.allclose(T.eval(points, u), ue)
+    assert np.allclose(B.matvec(u, np.zeros_like(u)), c0)
+    assert len(tuning.decisions()) >= 4
+    assert os.path.exists(tuning.cache_file())
+    T.destroy()
+
+if __name__ == '__main__':
+    test_registry()
@@ -497,6 +497,10 @@ def test_eval_tensor(typecode, dim, ST, quad):
             result = fft.eval(points, u_hat, method=2)
             t_2 += time()-t0
             assert np.allclose(uq, result, 0, 1e-3), uq/result
+            result = fft.eval(points, u_hat, method=3)
+            assert np.allclose(uq, result, 0, 1e-3)
+            result = fft.eval(points, u_hat, method=4)
+            assert np.allclose(uq, result, 0, 1e-3)
             result = u_hat.eval(points)
             assert np.allclose(uq, result, 0, 1e-3)
 
@@ -549,11 +553,55 @@ def test_eval_fourier(typecode, dim):
         result = fft.eval(points, u_hat, method=2)
         t_2 += time() - t0
         assert allclose(uq, result), print(uq, result)
+        result = fft.eval(points, u_hat, method=3)
+        assert allclose(uq, result)
+        result = fft.eval(points, u_hat, method=4)
+        assert allclose(uq, result)
 
     print('method=0', t_0)
     print('method=1', t_1)
     print('method=2', t_2)
 
+@pytest.mark.parametrize('backend', ('cython', 'numba'))
+@pytest.mark.parametrize('dim', (1, 2, 3))
+def test_nufft_interp(backend, dim):
+    from shenfun.optimization import registry
+    funs = registry['shenfun.utilities.nufft_interp'].implementations()
+    if backend not in funs:
+        return
+    M = np.array([16, 12, 10][:dim])
+    offset = np.array([0, 3, 4][:dim])
+    h = random_like(np.zeros((8, 7, 6)[:dim]+(3,), dtype=complex))
+    x = 2*np.pi*np.random.random((dim, 20))
+    tau = np.pi*4/(3*M**2/4)
+    out = np.zeros((20, 3), dtype=complex)
+    u0 = funs['python'](h, x, M, offset, tau, 4, out.copy())
+    u1 = funs[backend](h, x, M, offset, tau, 4, out.copy())
+    assert np.allclose(u0, u1)
+
+@pytest.mark.parametrize('family', ('C', 'L', 'F'))
+@pytest.mark.parametrize('dim', (2, 3))
+def test_probe(family, dim):
+    bases = [FunctionSpace(8+i, 'F', dtype='D') for i in range(dim-1)]
+    bases.append(FunctionSpace(10, 'F', dtype='d'))
+    bases[0] = FunctionSpace(12, family, dtype='D') if family == 'F' else FunctionSpace(12, family, bc=(0, 0))
+    T = TensorProductSpace(comm, bases)
+    V = VectorSpace(T)
+    points = None
+    if comm.Get_rank() == 0:
+        points = np.random.random((dim, 9))
+    points = comm.bcast(points)
+    u_hat = Function(V)
+    u_hat[:] = random_like(u_hat)
+    u_hat = u_hat.backward().forward()
+    probe = V.get_probe(points, blocksize=4, store=True)
+    for t in range(2):
+        result = probe(u_hat, t=t)
+        assert np.allclose(result, V.eval(points, u_hat, method=2))
+        assert np.allclose(T.get_probe(points, memory=0)(u_hat[0]), result[0])
+    assert probe.series.shape == (2, dim, 9)
+    assert np.allclose(probe.times, [0, 1])
+
 @pytest.mark.parametrize('f0,f1', product(*([('C', 'L', 'F')])*2))
 def test_inner(f0, f1):
     if f0 == 'F' and f1 == 'F':
@@ -665,6 +713,38 @@ def test_eval_expression():
     assert np.allclose(f0, f1, 1e-7)
     assert np.allclose(f1, f2, 1e-7)
 
+def test_memory_report():
+    import io
+    from shenfun import TestFunction, TrialFunction, div, grad, la
+    from shenfun.utilities import memory_report
+    D = FunctionSpace(12, 'C', bc=(0, 0))
+    F = FunctionSpace(10, 'F', dtype='d')
+    T = TensorProductSpace(comm, (D, F))
+    r, rr = T.memory_report(file=io.StringIO())
+    assert set(r) == set(['bases[0]', 'bases[1]', 'coors', 'total'])
+    assert r['total'][0] == sum(v[0] for k, v in r.items() if k != 'total')
+    assert r['bases[0]'][0] >= D.forward.input_array.nbytes+D.forward.output_array.nbytes
+    assert rr['total'][0] == comm.allreduce(r['total'][0])
+    V = VectorSpace(T)
+    assert V.memory_report(file=io.StringIO())[0]['total'] == r['total']
+    A = inner(TestFunction(T), div(grad(TrialFunction(T))))
+    B = A[0].mats[0]
+    assert B.memory_report(file=io.StringIO(), comm=None)[0]['total'][0] == sum(d.nbytes for d in B.values())
+    sol = la.SolverGeneric1ND(A)
+    sol(Function(T))
+    assert 'MM' in memory_report(sol, file=io.StringIO())[1]
+    class Shared:
+        def __init__(self):
+            self.a = np.zeros(10)
+            self.b = self.a[::2]
+    r, rr = memory_report(Shared(), comm, file=io.StringIO())
+    assert r['total'] == (80, 40)
+    assert rr['total'] == (80*comm.Get_size(), 40*comm.Get_size())
+    f = io.StringIO()
+    memory_report(Shared(), comm, file=f)
+    assert bool(f.getvalue()) == (comm.Get_rank() == 0)
+    T.destroy()
+
 if __name__ == '__main__':
     #test_transform('f', 3)
     #test_transform('d', 2)
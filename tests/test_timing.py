@@ -0,0 +1,64 @@
+import io
+import numpy as np
+import shenfun
+from shenfun.utilities import timing
+from shenfun.matrixbase import SparseMatrix
+
+def test_timing():
+    D = shenfun.FunctionSpace(12, 'C', bc=(0, 0))
+    F = shenfun.FunctionSpace(12, 'F', dtype='d')
+    T = shenfun.TensorProductSpace(shenfun.comm, (D, F))
+    matvec = SparseMatrix.__dict__['matvec']
+    timing.reset()
+    timing.enable()
+    try:
+        u = shenfun.Function(T)
+        u[:] = np.random.random(u.shape)
+        ub = u.backward()
+        v = shenfun.TestFunction(T)
+        A = shenfun.inner(v, shenfun.div(shenfun.grad(shenfun.TrialFunction(T))))
+        sol = shenfun.la.SolverGeneric1ND(A)
+        u0 = sol(shenfun.inner(v, ub))
+        B = shenfun.inner(shenfun.TestFunction(D), shenfun.TrialFunction(D))
+        c = B.matvec(u0, np.zeros_like(u0))
+        with timing.region('region'):
+            pass
+    finally:
+        timing.enable(False)
+    assert SparseMatrix.__dict__['matvec'] is matvec
+    t = timing.timings()
+    assert t['transform'][0] == 2
+    assert t['transform 1D'][0] == 4
+    assert t['transform MPI'][0] == 2
+    assert t['inner'][0] == 3
+    assert t['solve SolverGeneric1ND'][0] == 1
+    assert t['matvec BDDmat'][0] == 1
+    assert t['region'][0] == 1
+    assert np.allclose(c, B.matvec(u0, np.zeros_like(u0)))
+    rows = timing.report(file=io.StringIO())
+    assert len(rows) == len(t)
+    timing.reset()
+    assert timing.timings() == {}
+    T.destroy()
+
+def test_timing_new_matrix():
+    # Matrices of families imported after enable, like Laguerre, are timed
+    timing.reset()
+    timing.enable()
+    try:
+        class Mmat(SparseMatrix):
+            def matvec(self, v, c, format='self', axis=0):
+                c[:] = self[0]*v
+                return c
+        M = Mmat({0: 2}, (4, 4))
+        c = M.matvec(np.ones(4), np.zeros(4))
+    finally:
+        timing.enable(False)
+    assert np.allclose(c, 2)
+    assert timing.timings()['matvec Mmat'][0] == 1
+    M.matvec(np.ones(4), c)
+    assert timing.timings()['matvec Mmat'][0] == 1
+    timing.reset()
+
+if __name__ == '__main__':
+    test_timing()
@@ -152,6 +152,21 @@ def test_eval(ST, quad):
     f = ST.eval(points, fk)
     assert np.allclose(fj, f, rtol=1e-5, atol=1e-6)
 
+@pytest.mark.parametrize('family', ('chebyshev', 'legendre', 'jacobi', 'laguerre'))
+def test_eval_clenshaw(family):
+    """Test eval with Clenshaw's algorithm against basis matrix"""
+    from shenfun.spectralbase import SpectralBase
+    for bc in (None, (0, 0)):
+        ST = shenfun.FunctionSpace(N, family, bc=bc)
+        assert ST._get_recurrence(np.zeros(N))[1] is not None
+        fk = shenfun.Function(ST)
+        fk[:] = np.random.random(fk.shape)
+        points = np.linspace(0.2, 0.9, 5)
+        f = SpectralBase.eval(ST, points, fk)
+        fj = np.zeros_like(f)
+        ST.evaluate_expansion_all(fk, fj, ST.map_reference_domain(points), False)
+        assert np.allclose(f, fj)
+
 @pytest.mark.parametrize('basis, quad', cl_nonortho)
 #@pytest.mark.xfail(raises=AssertionError)
 def test_to_ortho(basis, quad):